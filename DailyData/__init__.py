@@ -1,6 +1,17 @@
-from .config import load_config
+def __getattr__(name):
+    # The configuration and version are only found when they are first used,
+    # since loading the configuration may ask the user to set it up, and
+    # finding the version may run git. Neither should slow down importing
+    # the package.
+    if name == 'master_config':
+        from .config import load_config
+        value = load_config()
+    elif name == '__version__':
+        from . import _version
+        value = _version.get_versions()['version']
+    else:
+        raise AttributeError(
+            'module {!r} has no attribute {!r}'.format(__name__, name))
 
-from . import _version
-__version__ = _version.get_versions()['version']
-
-master_config = load_config()
+    globals()[name] = value
+    return value
@@ -0,0 +1,32 @@
+from importlib import import_module
+from pathlib import Path
+
+# The module that reads and writes journals with each file extension.
+# Journals with other extensions are plain text. The modules are only
+# imported when they are used, since this package is imported with the
+# configuration on every timelog command.
+JOURNAL_FORMATS = {
+    '.docx': 'parse_docx',
+}
+
+
+def journal_format(journal_path):
+    """
+    Returns the module that reads and writes the journal at `journal_path`,
+    chosen by its file extension, such as `.docx`.
+
+    Journals that already exist as docx files are always docx, whatever their
+    extension, since journals used to be written as docx files even when they
+    were named `.md`, and appending text to them would corrupt them.
+    """
+
+    import zipfile
+
+    path = Path(journal_path)
+
+    if path.is_file() and zipfile.is_zipfile(path):
+        name = 'parse_docx'
+    else:
+        name = JOURNAL_FORMATS.get(path.suffix.lower(), 'parse_md')
+
+    return import_module('.' + name, __name__)
@@ -1,20 +1,30 @@
 import json
+import os
 import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Dict, Iterable, List, Tuple
 
 import pandas as pd
 
-from .parse_docx import get_lines
+from ..tracker.config import TrackerConfig
+from . import journal_format
+
+_WHITESPACE = re.compile('\\s+')
 
 
 def load_journal_entries(
-    journal_path, parser=get_lines,
+    journal_path, parser=None,
     output='./output.xlsx',
     word_count_cutoff=100,
     word_counts='./counts.json',
     pd_output=pd.DataFrame.to_excel
 ):
+    if parser is None:
+        parser = journal_format(journal_path).iter_entries
+
     if output.startswith('.') or word_counts.startswith('.'):
         path = Path(journal_path)
         parent_dir = path.parent
@@ -27,6 +37,144 @@ def load_journal_entries(
 
     entries = parser(journal_path)
 
+    save_entries(entries, output_path, word_count_cutoff,
+                 word_counts_path, pd_output)
+
+
+def load_journal_folder(
+    journal_folder, parser=None,
+    journal_suffix=TrackerConfig.journal_suffix,
+    output='./output.xlsx',
+    word_count_cutoff=100,
+    word_counts='./counts.json',
+    pd_output=pd.DataFrame.to_excel,
+    cache='./.parse_cache.json',
+    max_workers=None
+):
+    """
+    Compiles every monthly journal in a folder, as written by the tracker, the
+    same as `load_journal_entries` does for one journal.
+
+    The journals that changed since they were last compiled are parsed at
+    once on a pool of processes, and the entries of every journal are cached,
+    so that journals that haven't changed aren't parsed again.
+
+    Args:
+        journal_folder: The folder of journals, named by month
+        parser: Optional; the function to read the entries of a journal with,
+            which must be defined at the top level of a module, so that the
+            processes can run it. By default, chosen by the format of each
+            journal
+        journal_suffix: Optional; the file extension of the journals. By
+            default, the same as the default of `TrackerConfig.journal_suffix`
+        output: Optional; the file to save the entries to. Relative paths
+            starting with `.` are relative to `journal_folder`
+        word_count_cutoff: Optional; how many of the most common words to save
+        word_counts: Optional; the file to save the most common words to
+        pd_output: Optional; the function to save the entries with
+        cache: Optional; the file to cache the parsed entries in, or `None` to
+            parse every journal
+        max_workers: Optional; the most journals to parse at once. By default,
+            uses the default of ProcessPoolExecutor.
+    """
+
+    folder = Path(journal_folder)
+
+    output_path = _in_folder(folder, output)
+    word_counts_path = _in_folder(folder, word_counts)
+
+    journals = []
+
+    for path in folder.glob('*' + journal_suffix):
+        try:
+            month = datetime.strptime(path.name[:-len(journal_suffix)], '%Y-%m')
+        except ValueError:
+            # Not a monthly journal
+            continue
+
+        journals.append((month, path))
+
+    # Compile the journals in order of month, so the entries come out in order
+    paths = [path for _, path in sorted(journals)]
+
+    cached = read_parse_cache(_in_folder(folder, cache)) if cache is not None else dict()
+
+    # Journals are read with the parser for their format, unless one is given,
+    # since older journals may be docx files named like newer text journals
+    parsers = [parser or journal_format(path).iter_entries for path in paths]
+
+    # The key of each journal in the cache, and what it must be cached with
+    # for the cached entries to still be right
+    keys = [str(path.resolve()) for path in paths]
+    stats = [{'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+              'parser': journal_parser.__module__ + '.' + journal_parser.__qualname__}
+             for stat, journal_parser in zip((path.stat() for path in paths), parsers)]
+
+    stale = [i for i, (key, stat) in enumerate(zip(keys, stats))
+             if cached.get(key, dict()).get('stat') != stat]
+
+    if len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            parsed = list(executor.map(
+                _parse_journal, [parsers[i] for i in stale], [paths[i] for i in stale]))
+    else:
+        parsed = [_parse_journal(parsers[i], paths[i]) for i in stale]
+
+    for i, entries in zip(stale, parsed):
+        cached[keys[i]] = {'stat': stats[i], 'entries': entries}
+
+    if cache is not None and stale:
+        write_parse_cache(_in_folder(folder, cache), {key: cached[key] for key in keys})
+
+    entries = [tuple(entry) for key in keys for entry in cached[key]['entries']]
+
+    save_entries(entries, output_path, word_count_cutoff,
+                 word_counts_path, pd_output)
+
+
+def _in_folder(folder: Path, file_path) -> Path:
+    return folder.joinpath(file_path) if str(file_path).startswith('.') else Path(file_path)
+
+
+def _parse_journal(parser: Callable, path: Path) -> List[Tuple[str, str]]:
+    return list(parser(path))
+
+
+def read_parse_cache(file_path) -> Dict:
+    """
+    Reads the cache of parsed journals written by `write_parse_cache`, or an
+    empty cache if it doesn't exist or can't be read.
+    """
+
+    try:
+        with open(file_path, mode='r') as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return dict()
+
+    return cache if isinstance(cache, dict) else dict()
+
+
+def write_parse_cache(file_path, cache: Dict):
+    """
+    Writes the cache of parsed journals, replacing the old cache only once
+    the new one is written, so that it is never left half written.
+    """
+
+    path = Path(file_path)
+    temp_path = path.with_name(path.name + '.tmp')
+
+    with open(temp_path, mode='w') as file:
+        json.dump(cache, file)
+
+    os.replace(temp_path, path)
+
+
+def save_entries(entries, output_path, word_count_cutoff, word_counts_path, pd_output):
+    """
+    Saves journal entries, and the words that are most common in them.
+    """
+
     data = pd.DataFrame.from_records(entries, columns=['date', 'entry'])
     data['date'] = pd.to_datetime(data['date'])
     data.set_index('date')
@@ -37,44 +185,42 @@ def load_journal_entries(
 
 
 def count_words(lines: Iterable[str]):
-    counts = dict()
-    order = []
+    """
+    Counts how many times each word appears in some text.
+
+    Args:
+        lines: A string or an iterable of strings to count words in. Words are
+            separated by whitespace.
+
+    Returns:
+        A tuple of a list of every word, ordered from most to least frequent,
+        and a dictionary mapping each word to the number of times it appears.
+        Words that appear the same number of times are in the order that they
+        last appear.
+    """
+
+    counts = Counter()
+
+    # The position of the last appearance of each word, used to order words
+    # that appear the same number of times
+    last_seen = dict()
+    position = 0
 
     if type(lines) == str:
         lines = [lines]
 
-    # Iterate through each word in each line, incrementing a counter for each word
+    # Count each word in each line, splitting lines on whitespace character
+    # groups
     for line in lines:
-        # Split lines on whitespace character groups
-        for w in re.split('\\s+', line):
-            if w not in order:
-                counts.update({w: 1})
-                order.append(w)
-            else:
-                counts[w] += 1
-
-                while True:
-                    # Keep words ordered by frequency so we don't have to loop through
-                    # them again later to sort them.
-
-                    # We need a loop in case a letter becomes more frequent than
-                    # two words of the same frequency
-
-                    rank = order.index(w)
-
-                    # If the current word has a greater frequency than the word that has
-                    # a higher frequency ranking, switch them
-                    if rank == 0:  # If
-                        break
-                    elif counts[order[rank]] > counts[order[rank-1]]:
-                        # Swap positions
-                        tmp = order[rank-1]
-                        order[rank-1] = order[rank]
-                        order[rank] = tmp
-                    else:  # When the list is in the right order, break
-                        break
-
-    return order, counts
+        words = _WHITESPACE.split(line)
+
+        counts.update(words)
+        last_seen.update(zip(words, range(position, position + len(words))))
+        position += len(words)
+
+    order = sorted(counts, key=lambda w: (-counts[w], last_seen[w]))
+
+    return order, dict(counts)
 
 
 def save_most_common_words(order, counts, file_path):
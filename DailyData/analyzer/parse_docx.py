@@ -1,7 +1,34 @@
-from docx import Document
+import os
+import posixpath
+import zipfile
+from typing import Callable, Iterator, Tuple
+from xml.etree.ElementTree import iterparse
+from xml.sax.saxutils import escape
+
+# python-docx is only needed to create journals, or to read them with
+# `get_lines`. `iter_entries` and `add_header` work on the XML in the file
+# directly.
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_RELS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+_OFFICE_DOCUMENT = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+_STYLES = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles'
+
+# The text that each element of a run stands for, the same as python-docx
+_RUN_TEXT = {
+    _W + 'cr': '\n',
+    _W + 'noBreakHyphen': '-',
+    _W + 'ptab': '\t',
+    _W + 'tab': '\t',
+}
+
+_ON = {'1', 'true', 'on'}
 
 
 def get_lines(file_path):
+    from docx import Document
+
     doc = Document(file_path)
     paragraph_iter = iter(doc.paragraphs)
 
@@ -37,7 +64,232 @@ def get_lines(file_path):
         pass
 
 
+def iter_entries(file_path) -> Iterator[Tuple[str, str]]:
+    """
+    Reads the entries of a journal, the same as `get_lines`, but by streaming
+    the XML of the document out of the file instead of loading all of it with
+    python-docx.
+
+    Each heading starts an entry, which is the text of every paragraph up to
+    the next heading, in lower case. Only paragraphs directly in the body of
+    the document are read, as with python-docx, so text in tables is left
+    out, and so is any text before the first heading. A heading at the very
+    end of the document, without even an empty paragraph after it, is left
+    out too, as `get_lines` does.
+
+    Args:
+        file_path: The path to the journal
+
+    Yields:
+        Tuples of the text of each heading and its entry, with the lines of
+        the entry separated by newlines.
+    """
+
+    heading = None
+    lines = []
+    followed = False
+
+    with zipfile.ZipFile(file_path) as docx:
+        document = _part(docx, '', _OFFICE_DOCUMENT)
+        is_heading = _heading_styles(docx, _part(docx, document, _STYLES))
+
+        with docx.open(document) as xml:
+            for style, text in _body_paragraphs(xml):
+                if is_heading(style):
+                    if heading is not None:
+                        yield heading, '\n'.join(lines)
+
+                    heading, lines, followed = text, [], False
+                elif heading is not None:
+                    lines.append(text.lower())
+                    followed = True
+
+    if followed:
+        yield heading, '\n'.join(lines)
+
+
+def _part(docx: zipfile.ZipFile, source: str, rel_type: str) -> str:
+    """
+    Returns the name of the part of a docx file that the part `source` (or
+    the package, for `''`) refers to with a relationship of type `rel_type`,
+    or `None` if it doesn't.
+    """
+
+    folder, name = posixpath.split(source)
+    rels = posixpath.join(folder, '_rels', name + '.rels')
+
+    try:
+        with docx.open(rels) as xml:
+            for _, rel in iterparse(xml):
+                if rel.tag == _RELS + 'Relationship' and rel.get('Type') == rel_type:
+                    target = rel.get('Target')
+
+                    if target.startswith('/'):
+                        return target[1:]
+
+                    return posixpath.normpath(posixpath.join(folder, target))
+    except KeyError:
+        # The part has no relationships
+        pass
+
+    # Fall back on where Word saves each part
+    return {_OFFICE_DOCUMENT: 'word/document.xml', _STYLES: None}[rel_type]
+
+
+def _heading_styles(docx: zipfile.ZipFile, styles: str) -> Callable[[str], bool]:
+    """
+    Finds which paragraph styles are headings, the way `get_lines` does, by
+    whether the id of the style python-docx resolves starts with `Heading`.
+
+    Returns:
+        A function of the id of the style of a paragraph, or `None` if it has
+        none, which returns whether the paragraph is a heading.
+    """
+
+    if styles is None or styles not in docx.namelist():
+        # python-docx uses its own default styles, where only the Heading
+        # styles are headings
+        return lambda style_id: style_id is not None and style_id.startswith('Heading')
+
+    paragraph_styles = set()
+    default = None
+
+    with docx.open(styles) as xml:
+        for _, style in iterparse(xml):
+            if style.tag != _W + 'style':
+                continue
+
+            if style.get(_W + 'type', 'paragraph') == 'paragraph':
+                style_id = style.get(_W + 'styleId')
+                paragraph_styles.add(style_id)
+
+                # The last default style is the one used
+                if style.get(_W + 'default') in _ON:
+                    default = style_id
+
+            style.clear()
+
+    headings = {style_id for style_id in paragraph_styles
+                if style_id is not None and style_id.startswith('Heading')}
+
+    # Paragraphs without a style, or with one that isn't a paragraph style,
+    # use the default style
+    default_is_heading = default in headings
+
+    return lambda style_id: style_id in headings if style_id in paragraph_styles else default_is_heading
+
+
+def _body_paragraphs(xml) -> Iterator[Tuple[str, str]]:
+    """
+    Reads the paragraphs directly in the body of `word/document.xml`, one at
+    a time, discarding each after it is read.
+
+    Yields:
+        Tuples of the id of the style of each paragraph, or `None` if it
+        doesn't have one, and its text, as in python-docx.
+    """
+
+    depth = 0
+    body = None
+
+    for event, element in iterparse(xml, events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+
+            if depth == 2 and element.tag == _W + 'body':
+                body = element
+
+            continue
+
+        depth -= 1
+
+        if body is None or depth != 2:
+            continue
+
+        if element.tag == _W + 'p':
+            yield _paragraph_style(element), _paragraph_text(element)
+
+        # Everything directly in the body has been read, so forget it
+        body.remove(element)
+
+
+def _paragraph_style(p) -> str:
+    ppr = p.find(_W + 'pPr')
+    style = ppr.find(_W + 'pStyle') if ppr is not None else None
+
+    return style.get(_W + 'val') if style is not None else None
+
+
+def _paragraph_text(p) -> str:
+    text = []
+
+    for child in p:
+        if child.tag == _W + 'r':
+            _run_text(child, text)
+        elif child.tag == _W + 'hyperlink':
+            for run in child.iterfind(_W + 'r'):
+                _run_text(run, text)
+
+    return ''.join(text)
+
+
+def _run_text(run, text: list):
+    for child in run:
+        if child.tag == _W + 't':
+            text.append(child.text or '')
+        elif child.tag == _W + 'br':
+            # Page and column breaks have no text
+            if child.get(_W + 'type', 'textWrapping') == 'textWrapping':
+                text.append('\n')
+        elif child.tag in _RUN_TEXT:
+            text.append(_RUN_TEXT[child.tag])
+
+
 def add_header(file_path, header: str):
+    """
+    Adds a heading to the end of a journal, followed by an empty paragraph to
+    write the entry in, the same as python-docx would.
+
+    Only `word/document.xml` is rewritten; every other part of the document is
+    copied as it is, without being parsed. Documents whose XML isn't laid out
+    the way Word and python-docx write it are updated with python-docx.
+
+    Args:
+        file_path: The path to the journal
+        header: The text of the heading
+    """
+
+    temp_path = '{}.tmp'.format(file_path)
+
+    with zipfile.ZipFile(file_path) as docx:
+        document = _part(docx, '', _OFFICE_DOCUMENT)
+        style = _heading_style_id(docx, _part(docx, document, _STYLES))
+
+        xml = docx.read(document)
+        at = _append_position(xml)
+
+        if at is not None:
+            paragraphs = b'<w:p/>'
+            if style is not None:
+                paragraphs = _heading_xml(style, header) + paragraphs
+
+            with zipfile.ZipFile(temp_path, mode='w') as new_docx:
+                for info in docx.infolist():
+                    if info.filename == document:
+                        new_docx.writestr(info, xml[:at] + paragraphs + xml[at:])
+                    else:
+                        new_docx.writestr(info, docx.read(info))
+
+    if at is None:
+        _add_header_with_document(file_path, header)
+    else:
+        # Only replace the journal once the new one is written
+        os.replace(temp_path, file_path)
+
+
+def _add_header_with_document(file_path, header: str):
+    from docx import Document
+
     doc = Document(file_path)
 
     try:
@@ -49,5 +301,72 @@ def add_header(file_path, header: str):
     doc.save(file_path)
 
 
+def _heading_style_id(docx: zipfile.ZipFile, styles: str) -> str:
+    """
+    Returns the id of the `Heading 1` paragraph style, which python-docx uses
+    for headings, or `None` if the document doesn't have it.
+    """
+
+    if styles is None or styles not in docx.namelist():
+        # python-docx uses its own default styles, which include it
+        return 'Heading1'
+
+    with docx.open(styles) as xml:
+        for _, style in iterparse(xml):
+            if style.tag != _W + 'style':
+                continue
+
+            name = style.find(_W + 'name')
+
+            if (style.get(_W + 'type', 'paragraph') == 'paragraph' and name is not None
+                    and name.get(_W + 'val', '').lower() == 'heading 1'):
+                return style.get(_W + 'styleId')
+
+            style.clear()
+
+    return None
+
+
+def _append_position(xml: bytes) -> int:
+    """
+    Finds where python-docx would add a paragraph to the body of
+    `word/document.xml`, which is just before the properties of the last
+    section, or the end of the body if there are none.
+
+    Returns:
+        The position in `xml`, or `None` if it can't be found without parsing
+        the XML.
+    """
+
+    end = xml.rfind(b'</w:body>')
+
+    if end == -1:
+        return None
+
+    section = xml.rfind(b'<w:sectPr', 0, end)
+
+    if section != -1:
+        rest = xml[section:end]
+
+        # The properties belong to the body, and not to the last paragraph
+        if b'</w:p>' not in rest and b'</w:tbl>' not in rest and b'</w:sdt>' not in rest:
+            return section
+
+    return end
+
+
+def _heading_xml(style_id: str, text: str) -> bytes:
+    attributes = ' xml:space="preserve"' if text != text.strip() else ''
+
+    return '<w:p><w:pPr><w:pStyle w:val={}/></w:pPr><w:r><w:t{}>{}</w:t></w:r></w:p>'.format(
+        _quote(style_id), attributes, escape(text)).encode('utf-8')
+
+
+def _quote(value: str) -> str:
+    return '"{}"'.format(escape(value, {'"': '&quot;'}))
+
+
 def new_doc(file_path):
+    from docx import Document
+
     Document().save(file_path)
@@ -0,0 +1,111 @@
+"""
+Plain text journals, where each entry starts with a Markdown heading of its
+date, and can be written in any text editor.
+"""
+
+import mmap
+import re
+from typing import Iterator, Tuple
+
+# An ATX heading, with up to three spaces before it, and an optional closing
+# sequence of #s
+_HEADING = re.compile(r' {0,3}#{1,6}(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*')
+_FENCE = re.compile(r' {0,3}(`{3,}|~{3,})')
+
+_BOM = '\ufeff'
+
+
+def iter_entries(file_path) -> Iterator[Tuple[str, str]]:
+    """
+    Reads the entries of a journal, one line at a time from the memory mapped
+    file.
+
+    Each heading, of any level, starts an entry, which is every line up to
+    the next heading, in lower case, without the blank lines at its start and
+    end. Lines starting with `#` in fenced code blocks aren't headings, and
+    any text before the first heading is left out, as in docx journals.
+
+    Args:
+        file_path: The path to the journal
+
+    Yields:
+        Tuples of the text of each heading and its entry, with the lines of
+        the entry separated by newlines.
+    """
+
+    heading = None
+    lines = []
+    fence = None
+
+    with open(file_path, mode='rb') as file:
+        try:
+            journal = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return
+
+        with journal:
+            for i, raw in enumerate(iter(journal.readline, b'')):
+                line = raw.decode('utf-8').rstrip('\r\n')
+
+                if i == 0:
+                    line = line.lstrip(_BOM)
+
+                if fence is None:
+                    match = _HEADING.fullmatch(line)
+
+                    if match is not None:
+                        if heading is not None:
+                            yield heading, _join(lines)
+
+                        heading, lines = match.group(1) or '', []
+                        continue
+
+                    match = _FENCE.match(line)
+                    if match is not None:
+                        fence = match.group(1)
+                elif line.lstrip(' ').startswith(fence):
+                    fence = None
+
+                if heading is not None:
+                    lines.append(line.lower())
+
+    if heading is not None:
+        yield heading, _join(lines)
+
+
+def _join(lines) -> str:
+    start, end = 0, len(lines)
+
+    while start < end and not lines[start].strip():
+        start += 1
+    while end > start and not lines[end - 1].strip():
+        end -= 1
+
+    return '\n'.join(lines[start:end])
+
+
+def add_header(file_path, header: str):
+    """
+    Adds a heading to the end of a journal, followed by an empty line to write
+    the entry on, by appending to the file.
+
+    Args:
+        file_path: The path to the journal
+        header: The text of the heading
+    """
+
+    with open(file_path, mode='ab+') as file:
+        # Start the heading on a line of its own, looking only at the end of
+        # the file
+        separator = b''
+        if file.tell() > 0:
+            file.seek(-1, 2)
+            if file.read(1) != b'\n':
+                separator = b'\n'
+
+        file.write(separator + '# {}\n\n'.format(header).encode('utf-8'))
+
+
+def new_doc(file_path):
+    open(file_path, mode='x').close()
@@ -1,15 +1,13 @@
 import json
 import os
 from dataclasses import dataclass, asdict
-from importlib import resources
 from pathlib import Path
 
 from .analyzer.config import AnalyzerConfig
+from .io.config import DatabaseConfig
 from .time_management.config import TimeManagementConfig
 from .tracker.config import TrackerConfig
 
-import ConsoleQuestionPrompts as questions
-
 cfg_file_location = None
 
 cwd_config = Path(os.getcwd()).joinpath('config.json')
@@ -23,6 +21,7 @@ class MasterConfig:
     analyzer: AnalyzerConfig = AnalyzerConfig()
     time_management: TimeManagementConfig = TimeManagementConfig()
     tracker: TrackerConfig = TrackerConfig()
+    database: DatabaseConfig = DatabaseConfig()
 
     def __post_init__(self):
         self.data_folder = Path(self.data_folder)
@@ -36,6 +35,9 @@ class MasterConfig:
         if not isinstance(self.tracker, TrackerConfig):
             self.tracker = TrackerConfig(**self.tracker)
 
+        if not isinstance(self.database, DatabaseConfig):
+            self.database = DatabaseConfig(**self.database)
+
     def __enter__(self):
         pass
 
@@ -52,9 +54,11 @@ def load_config(cfg_file: Path = None):
 
     # Try to find a configuration file. First check the directory where the script is, then check the working directory, then the user directory
     # Along with creating the configuration, also set the save location for the config file when the program exits
-    if resources.is_resource('DailyData', 'config.json'):
+    bundled_config = _bundled_config()
+
+    if bundled_config is not None:
         cfg_file_location = None
-        return MasterConfig(**json.loads(resources.read_text(__name__, 'config.json')))
+        return MasterConfig(**json.loads(bundled_config))
 
     elif cwd_config.exists():
         cfg_file_location = cwd_config
@@ -68,6 +72,23 @@ def load_config(cfg_file: Path = None):
         return initial_setup()
 
 
+def _bundled_config() -> bytes:
+    """
+    Returns the contents of the configuration file in the package, or `None`
+    if there isn't one.
+    """
+
+    # pkgutil reads the file with the package's loader, the same as
+    # importlib.resources, which imports zipfile, shutil and tempfile among
+    # others, slowing down every `timelog` command
+    import pkgutil
+
+    try:
+        return pkgutil.get_data('DailyData', 'config.json')
+    except OSError:
+        return None
+
+
 def save_config(config: MasterConfig, save_location: Path = None):
     if save_location is None:
         save_location = cfg_file_location
@@ -94,6 +115,8 @@ def __json_encoder(value):
 
 
 def initial_setup(current: MasterConfig = MasterConfig(), first_time=True) -> MasterConfig:
+    import ConsoleQuestionPrompts as questions
+
     new_config = MasterConfig()
 
     if first_time:
@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+from datetime import timedelta
+
+JOURNAL_MODES = ['DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF']
+SYNCHRONOUS = ['OFF', 'NORMAL', 'FULL', 'EXTRA']
+
+
+@dataclass
+class DatabaseConfig:
+    # Write-ahead logging lets activities be read while another process is
+    # recording one, and makes committing cheaper
+    journal_mode: str = 'WAL'
+    # NORMAL is safe from corruption in WAL mode, and only risks losing the
+    # last activities recorded if the computer loses power
+    synchronous: str = 'NORMAL'
+    # How long to wait for another process to finish writing before giving up
+    busy_timeout: timedelta = timedelta(seconds=30)
+    # Pages if positive, or KiB if negative, as in PRAGMA cache_size
+    cache_size: int = -8192
+
+    def __post_init__(self):
+        self.journal_mode = self.journal_mode.upper()
+        self.synchronous = self.synchronous.upper()
+
+        # Pragmas don't accept parameters, so only allow known values
+        if self.journal_mode not in JOURNAL_MODES:
+            raise ValueError(
+                'Unknown journal mode {}'.format(self.journal_mode))
+        if self.synchronous not in SYNCHRONOUS:
+            raise ValueError(
+                'Unknown synchronous setting {}'.format(self.synchronous))
+
+        if isinstance(self.busy_timeout, (int, float)):
+            self.busy_timeout = timedelta(seconds=self.busy_timeout)
+
+        self.cache_size = int(self.cache_size)
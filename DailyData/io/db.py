@@ -1,20 +1,69 @@
-from distutils.util import execute
+from __future__ import annotations
+
 import sqlite3
+from contextlib import contextmanager
 from datetime import datetime, timedelta, tzinfo
-from importlib import resources
 from pathlib import Path
-from sqlite3.dbapi2 import OperationalError, Row
-from typing import Any, Dict, List
+from sqlite3.dbapi2 import Row
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Tuple
 
-import numpy as np
-import pandas as pd
-from DailyData import __version__
+from DailyData.io import migrations
+from DailyData.io.config import DatabaseConfig
 from DailyData.io.timelog_io import TimelogIO
 from DailyData.time_management.recorded_activity import RecordedActivity
 from dateutil import tz
-from pandas.core import series
 
-SCHEMA = 'schema.sql'
+# pandas and numpy take a while to import, so they are only imported by the
+# functions that need them. Recording an activity doesn't.
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Times are saved as integer microseconds since the epoch, in UTC
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+DAY_US = timedelta(days=1) // MICROSECOND
+
+# Activities lasting longer than this are left out of the per-day summary,
+# the same as the default for `timelog.parse_timestamps`
+SUMMARY_MAX_TIME = timedelta(hours=12)
+
+TIMESTAMP_COLUMNS = ['time', 'timezone_offset',
+                     'timezone_name', 'activity_id']
+
+INSERT_TIMELOG = '''INSERT INTO timelog (time, timezone_name, timezone_offset, activity_id, user_id, backdated)
+VALUES(:time, :tz_name, :tz_offset, :act, :user, :backdated);
+'''
+
+# Selects records of the timelog table along with the names of their activity
+# and user, as used by `recorded_activity`
+SELECT_RECORD = '''SELECT timelog.id, time, timezone_offset, timezone_name, activity_id,
+    activity.name AS activity, user.username AS user, backdated
+FROM timelog
+    JOIN activity ON activity.id = timelog.activity_id
+    LEFT JOIN user ON user.id = timelog.user_id
+'''
+
+
+def to_epoch_us(time: datetime) -> int:
+    """
+    Converts a time to microseconds since the epoch, the way it is saved in the
+    timelog table. Timezone-aware times are converted to UTC, and naive times
+    are saved as they are.
+    """
+
+    if time.tzinfo is not None:
+        time = time.replace(tzinfo=None) - time.utcoffset()
+
+    return (time - EPOCH) // MICROSECOND
+
+
+def from_epoch_us(time: int) -> datetime:
+    """
+    Converts microseconds since the epoch, as saved in the timelog table, to a
+    naive datetime.
+    """
+
+    return EPOCH + time * MICROSECOND
 
 
 def apply_tz(row: pd.Series,
@@ -22,6 +71,8 @@ def apply_tz(row: pd.Series,
              tzname_col_name='timezone_name',
              time_col_name='time'
              ) -> datetime:
+    import numpy as np
+
     if np.isfinite(row[offset_col_name]):
         return apply_tz_single(row, offset_col_name, tzname_col_name, time_col_name)
     else:
@@ -40,6 +91,146 @@ def apply_tz_single(row,
     return non_naive_datetime
 
 
+def apply_tz_vectorized(frame: pd.DataFrame,
+                        offset_col_name='timezone_offset',
+                        tzname_col_name='timezone_name',
+                        time_col_name='time'
+                        ) -> pd.Series:
+    """
+    Vectorized equivalent of `frame.apply(apply_tz, axis=1)`.
+
+    Rows are grouped by their timezone name and offset, and each group is
+    converted from UTC in a single operation. Rows without an offset are
+    localized to the local timezone as a group, just like `apply_tz` does.
+
+    Args:
+        frame: A DataFrame with a column of naive UTC times and columns with
+            the name and offset (in seconds) of the timezone each time was
+            recorded in.
+
+    Returns:
+        A Series, with the same index as `frame`, of timezone-aware times.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    times = pd.DatetimeIndex(frame[time_col_name])
+    offsets = frame[offset_col_name].to_numpy(dtype=float)
+    names = frame[tzname_col_name].to_numpy(dtype=object)
+
+    has_offset = np.isfinite(offsets)
+
+    # Split the rows into groups that share a timezone, so that each group
+    # can be converted at once
+    groups = []
+
+    if not has_offset.all():
+        groups.append((np.flatnonzero(~has_offset),
+                       times[~has_offset].tz_localize(tz.tzlocal())))
+
+    if has_offset.any():
+        keys = pd.MultiIndex.from_arrays(
+            [names[has_offset], offsets[has_offset]])
+        codes, uniques = pd.factorize(keys)
+        positions = np.flatnonzero(has_offset)
+
+        for code, (tz_name, tz_offset) in enumerate(uniques):
+            in_group = positions[codes == code]
+            tz_inst = tz.tzoffset(tz_name, timedelta(seconds=tz_offset))
+
+            groups.append((in_group,
+                           times[in_group].tz_localize(tz.UTC).tz_convert(tz_inst)))
+
+    if len(groups) == 1:
+        return pd.Series(groups[0][1], index=frame.index)
+
+    # With more than one timezone, let pandas infer the resulting dtype in the
+    # same way that it does for the results of `DataFrame.apply`
+    result = np.empty(len(frame), dtype=object)
+    for in_group, converted in groups:
+        result[in_group] = converted.astype(object)
+
+    return pd.Series(result, index=frame.index)
+
+
+def timestamp_frame(fetch: List[Tuple], activity_names: Dict[int, str]) -> pd.DataFrame:
+    """
+    Creates the DataFrame returned by `get_timestamps` from rows of the
+    `TIMESTAMP_COLUMNS` columns of the timelog table.
+
+    Args:
+        fetch: The rows of the timelog table
+        activity_names: A dictionary mapping the id of every activity to its
+            name, used as the categories of the `activity` column
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    if len(fetch) == 0:
+        return pd.DataFrame(columns=['time', 'activity'])
+
+    frame = pd.DataFrame(fetch, columns=TIMESTAMP_COLUMNS)
+
+    # Look up the position of each activity id in the categories
+    ids = np.fromiter(activity_names.keys(), dtype=np.int64,
+                      count=len(activity_names))
+    codes = np.full(ids.max() + 1, -1)
+    codes[ids] = np.arange(len(ids))
+
+    frame['activity'] = pd.Categorical.from_codes(
+        codes[frame['activity_id'].to_numpy()], categories=list(activity_names.values()))
+
+    # The times are integers, so they can be converted all at once instead of
+    # parsing each one
+    frame['time'] = pd.to_datetime(frame['time'], unit='us')
+    frame['time'] = apply_tz_vectorized(frame)
+    return frame.drop(columns=['timezone_name', 'timezone_offset', 'activity_id'])
+
+
+def timelog_row(activity_id: int, user_id: int, timestamp: datetime, backdated=False) -> Dict[str, Any]:
+    """
+    Creates the parameters used with `INSERT_TIMELOG` to record an activity.
+    """
+
+    # Make sure any values given with pandas datatypes can be recorded. This
+    # doesn't check for pandas.Timestamp directly, since importing pandas
+    # would slow down recording an activity.
+    if hasattr(timestamp, 'to_pydatetime'):
+        timestamp = timestamp.to_pydatetime()
+
+    return {
+        # Convert the time to UTC if there is timezone information
+        'time': to_epoch_us(timestamp),
+        'tz_name': timestamp.tzinfo.tzname(timestamp) if timestamp.tzinfo else None,
+        'tz_offset': timestamp.tzinfo.utcoffset(timestamp) // timedelta(seconds=1) if timestamp.tzinfo else None,
+        'act': activity_id,
+        'user': user_id,
+        'backdated': backdated
+    }
+
+
+def recorded_activity(record: Row, until: datetime) -> RecordedActivity:
+    """
+    Creates a RecordedActivity from a row of the timelog table, lasting until
+    the given time.
+    """
+
+    dict_rec = {key: record[key] for key in record.keys()}
+    dict_rec['time'] = from_epoch_us(dict_rec['time'])
+
+    if dict_rec['timezone_offset'] is not None:
+        dict_rec['time'] = apply_tz_single(dict_rec)
+
+    return RecordedActivity(name=dict_rec['activity'],
+                            time=dict_rec['time'],
+                            duration=until-dict_rec['time'],
+                            user=dict_rec['user'],
+                            backdated=dict_rec['backdated'],
+                            id=dict_rec['id'])
+
+
 def dict_factory(cursor: sqlite3.Cursor, row):
     d = {}
 
@@ -54,30 +245,86 @@ class DatabaseWrapper(TimelogIO):
     A Handler that performs common timelog operations on a sqlite3 database.
     """
 
-    def __init__(self, db_path: Path = None):
+    def __init__(self, db_path: Path = None, config: DatabaseConfig = None, source: sqlite3.Connection = None):
+        """
+        Args:
+            db_path: Optional; the database file to open. By default, a new
+                database is created in memory.
+            config: Optional; the settings to open the database with
+            source: Optional; a connection to a database to copy into this
+                one before it is opened, replacing anything already in it.
+                See `from_snapshot`.
+        """
 
         if not db_path:
             db_path = ':memory:'
 
+        if config is None:
+            config = DatabaseConfig()
+
+        # In-memory copy of the activity table, loaded the first time an
+        # activity is looked up. See `activities`.
+        self._activities = None
+        self._activity_ids = None
+        self._recorded_as = None
+
+        # The ids of users that have been looked up. See `_user_id`.
+        self._user_ids = dict()
+
+        # The last value of `PRAGMA data_version`. See `clear_cache_if_changed`.
+        self._data_version = None
+
+        # Wait for other processes recording activities at the same time,
+        # rather than failing because the database is locked
         self.db = sqlite3.connect(
-            db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+            db_path, detect_types=sqlite3.PARSE_DECLTYPES,
+            timeout=config.busy_timeout.total_seconds())
         self.db.row_factory = sqlite3.Row
 
-        n_tables = self.db.execute(
-            'SELECT COUNT(name) FROM sqlite_master WHERE type="table" AND name NOT LIKE "sqlite_%";').fetchone()[0]
-
-        try:
-            if n_tables == 0 or self.db.execute('SELECT version FROM metadata').fetchone()[0] != __version__:
-                # Run the schema script to create/update the tables if they do not exist, or are not the same version as the current program.
-                print('Updating database')
-                self.run_schema()
-        except (
-            sqlite3.OperationalError,
-            TypeError
-        )as err:
-            if isinstance(err, TypeError) or 'no such table: metadata' in ';'.join(err.args):
-                print('Updating database')
-                self.run_schema()
+        # Pragmas don't accept parameters, but the settings are checked by
+        # DatabaseConfig. In-memory databases stay in memory journal mode.
+        self.db.execute('PRAGMA journal_mode = {}'.format(config.journal_mode))
+        self.db.execute('PRAGMA synchronous = {}'.format(config.synchronous))
+        self.db.execute('PRAGMA cache_size = {:d}'.format(config.cache_size))
+
+        if source is not None:
+            source.backup(self.db)
+
+        # Create or upgrade the tables if the database hasn't had every
+        # migration run on it. When it has, this is the only query run on
+        # opening the database.
+        if migrations.schema_version(self.db) < migrations.LATEST_VERSION:
+            print('Updating database')
+            self.run_schema()
+
+    @classmethod
+    def from_snapshot(cls, source: sqlite3.Connection, db_path: Path = None,
+                      config: DatabaseConfig = None) -> DatabaseWrapper:
+        """
+        Creates a DatabaseWrapper for a copy of the database that `source` is
+        connected to, made with the SQLite backup API, which copies the
+        database page by page instead of replaying its statements.
+
+        The copy is migrated if the source is out of date, and the source is
+        left unchanged.
+
+        Args:
+            source: A connection to the database to copy
+            db_path: Optional; the file to copy the database to. By default,
+                the copy is kept in memory.
+            config: Optional; the settings to open the copy with
+        """
+
+        return cls(db_path, config, source=source)
+
+    def snapshot(self, db_path: Path = None) -> DatabaseWrapper:
+        """
+        Returns a copy of the database, in memory by default, which can be
+        changed without changing this one, for example to see how the
+        summary would look with some activities changed.
+        """
+
+        return type(self).from_snapshot(self.db, db_path)
 
     def __enter__(self, *args, **kwargs):
         pass
@@ -89,18 +336,59 @@ class DatabaseWrapper(TimelogIO):
         if ex_val is not None:
             return False
 
+    @contextmanager
+    def _write_transaction(self):
+        """
+        Runs the statements in the block in a single transaction, which is
+        committed when the block exits, or rolled back if it raises.
+
+        The transaction takes the write lock before anything is read, so that
+        another process can't record an activity between this one reading the
+        records around a time and writing its own. Taking the lock later, as
+        SQLite does by default, would fail instead of waiting if another
+        process had written in the meantime.
+        """
+
+        if self.db.in_transaction:
+            # Already part of a larger transaction
+            yield
+            return
+
+        self.db.execute('BEGIN IMMEDIATE')
+
+        with self.db:
+            yield
+
     def new_user(self, user: str):
-        self.db.execute('INSERT INTO user VALUES (:usr)', {'usr': user})
+        self.db.execute(
+            'INSERT INTO user (username) VALUES (:usr)', {'usr': user})
         self.db.commit()
 
+    def _user_id(self, user: str) -> int:
+        """
+        Returns the id of a user, adding the user if they don't exist yet, the
+        same as recording a time with an unknown user always has.
+        """
+
+        if user is None:
+            return None
+
+        if user not in self._user_ids:
+            self.db.execute(
+                'INSERT OR IGNORE INTO user (username) VALUES (:usr)', {'usr': user})
+            self._user_ids[user] = self.db.execute(
+                'SELECT id FROM user WHERE username = :usr', {'usr': user}).fetchone()['id']
+
+        return self._user_ids[user]
+
     def new_activity(self, activity: str, parent: str = None, is_alias: bool = None):
 
         if parent is not None:
-            if not self.db.execute('SELECT * FROM activity WHERE name=:parent', {'parent': parent}).fetchone():
+            if not isinstance(parent, str):
+                raise TypeError('parent must be a string')
+            elif parent not in self.activities:
                 raise ValueError(
                     'Parent activity {} does not exist'.format(parent))
-            elif not isinstance(parent, str):
-                raise TypeError('parent must be a string')
 
         if is_alias is not None and parent is None:
             raise ValueError(
@@ -108,37 +396,116 @@ class DatabaseWrapper(TimelogIO):
         elif is_alias is not None and not isinstance(is_alias, bool):
             raise TypeError('is_alias must be a boolean')
 
-        self.db.execute('INSERT INTO activity VALUES (:act, :parent, :alias)',
-                        {'act': activity,
-                         'parent': parent,
-                         'alias': is_alias})
+        cursor = self.db.execute(
+            'INSERT INTO activity (name, parent_id, alias) VALUES (:act, :parent, :alias)',
+            {'act': activity,
+             'parent': self._activity_ids[parent] if parent is not None else None,
+             'alias': is_alias})
         self.db.commit()
 
-    def get_activity_or_parent(self, activity):
-        activity_exists = self.db.execute(
-            'SELECT * FROM activity WHERE name=:activity',
-            {'activity': activity}).fetchone()
+        # Keep the cached activities up to date, now that the new activity
+        # has been saved
+        self._cache_activity(cursor.lastrowid, activity, parent, is_alias)
+
+    @property
+    def activities(self) -> Dict[str, Tuple[str, bool]]:
+        """
+        A dictionary mapping the name of every activity to a tuple of the name
+        of its parent activity (or `None`) and whether it is an alias for its
+        parent.
+
+        The activities are read from the database once per connection, and
+        are afterwards kept up to date by `new_activity`. If the activity
+        table is modified some other way, call `clear_activity_cache`.
+        """
+
+        if self._activities is None:
+            self._activities = dict()
+            self._activity_ids = dict()
+            self._recorded_as = dict()
+
+            hierarchy = {row['name']: (row['id'], row['parent'], row['alias'])
+                         for row in self.db.execute(
+                             '''SELECT activity.id, activity.name, parent.name AS parent, activity.alias
+                             FROM activity LEFT JOIN activity AS parent ON parent.id = activity.parent_id''')}
+
+            # Parents have to be cached before their children, so that aliases
+            # can be resolved to whatever their parent is recorded as
+            def cache(name):
+                id, parent, alias = hierarchy[name]
+
+                if parent in hierarchy and parent not in self._activities:
+                    cache(parent)
+
+                self._cache_activity(id, name, parent, alias)
+
+            for name in hierarchy:
+                if name not in self._activities:
+                    cache(name)
+
+        return self._activities
+
+    def clear_activity_cache(self):
+        """
+        Forget the cached activities, so that they are read from the database
+        the next time they are needed.
+        """
+
+        self._activities = None
+        self._activity_ids = None
+        self._recorded_as = None
+
+    def clear_cache_if_changed(self):
+        """
+        Forget the cached activities if another connection has changed the
+        database since this was last called, for connections that are kept
+        open for a long time, such as the timelog daemon's.
+        """
+
+        # The data version only changes when other connections commit, so it
+        # doesn't change when this connection records an activity
+        version = self.db.execute('PRAGMA data_version').fetchone()[0]
+
+        if version != self._data_version:
+            self._data_version = version
+            self.clear_activity_cache()
+
+    def _cache_activity(self, id: int, activity: str, parent: str, is_alias: bool):
+        if self._activities is None:
+            # Nothing is cached yet, so the activity will be read with the rest
+            # of them when they are needed
+            return
+
+        self._activities[activity] = (parent, bool(is_alias))
+        self._activity_ids[activity] = id
+
+        # Aliases are recorded as the activity their parent is recorded as, so
+        # that chains of aliases resolve to the non-alias activity
+        if parent is not None and is_alias:
+            self._recorded_as[activity] = self._recorded_as.get(parent, parent)
+        else:
+            self._recorded_as[activity] = activity
 
-        if not activity_exists:
-            return None
+    def get_activity_or_parent(self, activity):
+        if self._recorded_as is None:
+            # Load the activities
+            self.activities
 
-        if activity_exists['parent'] is not None and activity_exists['alias']:
-            return activity_exists['parent']
-        else:
-            return activity
+        return self._recorded_as.get(activity)
 
-    def record_time(self, activity: str, user: str, timestamp: datetime, backdated=False):
-        super().record_time(activity, user, timestamp, backdated)
+    def _activity_names(self) -> Dict[int, str]:
+        """
+        Returns a dictionary mapping the id of every activity to its name.
+        """
 
-        last = self.get_last_record(before=timestamp)
+        if self._activity_ids is None:
+            # Load the activities
+            self.activities
 
-        insert_cmd = '''INSERT INTO timelog (time, timezone_name, timezone_offset, activity, user, backdated)
-        VALUES(:time, :tz_name, :tz_offset, :act, :user, :backdated);
-        '''
+        return {id: name for name, id in self._activity_ids.items()}
 
-        # Make sure any values given with pandas datatypes can be recorded
-        if isinstance(timestamp, pd.Timestamp):
-            timestamp = timestamp.to_pydatetime()
+    def record_time(self, activity: str, user: str, timestamp: datetime, backdated=False):
+        super().record_time(activity, user, timestamp, backdated)
 
         old_act = activity
         activity = self.get_activity_or_parent(activity)
@@ -147,83 +514,120 @@ class DatabaseWrapper(TimelogIO):
             raise ValueError(
                 'Activity {} not found'.format(old_act))
 
-        self.db.execute(insert_cmd, {
-            # Convert the time to UTC if there is timezone information
-            'time': timestamp - (timestamp.tzinfo.utcoffset(timestamp) if timestamp.tzinfo else timedelta(0)),
-            'tz_name': timestamp.tzinfo.tzname(timestamp) if timestamp.tzinfo else None,
-            'tz_offset': timestamp.tzinfo.utcoffset(timestamp).total_seconds() if timestamp.tzinfo else None,
-            'activity': activity,
-            'act': activity,
-            'user': user,
-            'backdated': backdated
-        })
+        activity_id = self._activity_ids[activity]
 
-        self.db.commit()
+        with self._write_transaction():
+            row = timelog_row(activity_id, self._user_id(user),
+                              timestamp, backdated)
+            time = row['time']
+
+            before, after = self._neighbours(time)
+
+            # The activity done before this one, which is now finished
+            last = recorded_activity(before, timestamp) if before else None
+
+            # The new record splits the time between the records before and
+            # after it, so update the summary to match. Recording what is
+            # being done now has no record after it, so only the activity
+            # before it is added to the summary.
+
+            if before is not None and after is not None:
+                self._add_to_summary(before['time'], after['time'],
+                                     before['activity_id'], sign=-1)
+            if before is not None:
+                self._add_to_summary(before['time'], time, before['activity_id'])
+            if after is not None:
+                self._add_to_summary(time, after['time'], activity_id)
+
+            self.db.execute(INSERT_TIMELOG, row)
 
         return last
 
+    def record_many(self, events: Iterable[Tuple]) -> int:
+        rows = []
+
+        for activity, user, timestamp, *backdated in events:
+            backdated = backdated[0] if backdated else False
+
+            super().record_time(activity, user, timestamp, backdated)
+
+            recorded_as = self.get_activity_or_parent(activity)
+
+            if recorded_as is None:
+                raise ValueError(
+                    'Activity {} not found'.format(activity))
+
+            rows.append((self._activity_ids[recorded_as], user,
+                         timestamp, backdated))
+
+        # Insert all of the events in a single transaction, so that they are
+        # only committed (and synced to disk) once
+        with self._write_transaction():
+            rows = [timelog_row(activity_id, self._user_id(user), timestamp, backdated)
+                    for activity_id, user, timestamp, backdated in rows]
+
+            self.db.executemany(INSERT_TIMELOG, rows)
+
+            if rows:
+                self._rebuild_summary(since=min(row['time'] for row in rows))
+
+        return len(rows)
+
     def get_timestamps(self, earliest: datetime, latest: datetime) -> pd.DataFrame:
-        columns = ['time', 'timezone_offset',
-                   'timezone_name', 'activity']
+        cursor = self._select_timestamps(earliest, latest)
 
-        cmd = '''SELECT :cols FROM timelog WHERE time >= :min AND time < :max
-        '''.replace(':cols', ', '.join(columns))
+        return timestamp_frame(cursor.fetchall(), self._activity_names())
+
+    def iter_timestamps(self, earliest: datetime, latest: datetime, chunk_rows: int = 10000) -> Iterator[pd.DataFrame]:
+        cursor = self._select_timestamps(earliest, latest, ordered=True)
+        activity_names = self._activity_names()
 
-        old_row_factory = self.db.row_factory
-        self.db.row_factory = None
+        # Only hold one chunk of rows in memory at a time
+        while True:
+            fetch = cursor.fetchmany(chunk_rows)
 
-        fetch = self.db.execute(cmd, {
-            'min': earliest,
-            'max': latest
-        }).fetchall()
+            if len(fetch) == 0:
+                break
 
-        self.db.row_factory = old_row_factory
+            yield timestamp_frame(fetch, activity_names)
 
-        if len(fetch) == 0:
-            return pd.DataFrame(columns=['time', 'activity'])
+    def _select_timestamps(self, earliest: datetime, latest: datetime, ordered=False) -> sqlite3.Cursor:
+        cmd = '''SELECT :cols FROM timelog WHERE time >= :min AND time < :max
+        '''.replace(':cols', ', '.join(TIMESTAMP_COLUMNS))
+
+        if ordered:
+            cmd += 'ORDER BY time, id'
 
-        frame = pd.DataFrame(fetch, columns=columns)
-        frame['time'] = frame.apply(apply_tz, axis=1)
-        return frame.drop(columns=['timezone_name', 'timezone_offset'])
+        # Fetch plain tuples, which can be passed straight to pandas
+        cursor = self.db.cursor()
+        cursor.row_factory = None
+
+        return cursor.execute(cmd, {
+            'min': to_epoch_us(earliest),
+            'max': to_epoch_us(latest)
+        })
 
     def get_last_record(self, before=datetime.now(), as_entered=False) -> Dict[str, Any]:
         if as_entered:
-            cmd = '''SELECT *
-            FROM
-                timelog
-            WHERE time <= ?
+            cmd = SELECT_RECORD + '''WHERE time <= ?
             ORDER BY
-                id DESC
+                timelog.id DESC
             LIMIT 1;
             '''
         else:
-            cmd = '''SELECT *
-            FROM
-                timelog
-            WHERE time <= ?
+            cmd = SELECT_RECORD + '''WHERE time <= ?
             ORDER BY
                 time DESC
             LIMIT 1;
             '''
 
-        record: Row = self.db.execute(cmd, (before,)).fetchone()
+        record: Row = self.db.execute(
+            cmd, (to_epoch_us(before),)).fetchone()
 
         if record is None:
             return None
 
-        dict_rec = {key: record[key] for key in record.keys()}
-
-        if dict_rec['timezone_offset'] is not None:
-            dict_rec['time'] = apply_tz_single(dict_rec)
-
-        del dict_rec['timezone_name'], dict_rec['timezone_offset']
-
-        return RecordedActivity(name=dict_rec['activity'],
-                                time=dict_rec['time'],
-                                duration=before-dict_rec['time'],
-                                user=dict_rec['user'],
-                                backdated=dict_rec['backdated'],
-                                id=dict_rec['id'])
+        return recorded_activity(record, before)
 
     def update_last_record(self, activity: str, search_by_id=False):
         old_act = activity
@@ -250,27 +654,292 @@ class DatabaseWrapper(TimelogIO):
             LIMIT 1;
             '''
 
-        last_id = self.db.execute(cmd).fetchone()['id']
-        self.db.execute('UPDATE timelog SET activity=:act, backdated=True WHERE id=:id', {
-            'id': last_id,
-            'act': activity
-        })
-        self.db.commit()
+        activity_id = self._activity_ids[activity]
+
+        with self._write_transaction():
+            last = self.db.execute(cmd).fetchone()
+
+            # Move the time spent on the record to the new activity
+            after = self.db.execute(
+                'SELECT time FROM timelog WHERE (time, id) > ((SELECT time FROM timelog WHERE id = :id), :id) ORDER BY time, id LIMIT 1;',
+                {'id': last['id']}).fetchone()
+
+            if after is not None:
+                self._add_to_summary(last['time'], after['time'],
+                                     last['activity_id'], sign=-1)
+                self._add_to_summary(last['time'], after['time'], activity_id)
+
+            self.db.execute('UPDATE timelog SET activity_id=:act, backdated=True WHERE id=:id', {
+                'id': last['id'],
+                'act': activity_id
+            })
+
+    def summarize(self, earliest: datetime, latest: datetime, max_time: timedelta = SUMMARY_MAX_TIME) -> pd.DataFrame:
+        """
+        Returns the total time spent doing each activity started between two
+        times, the same as `timelog.parse_timestamps` does for the times from
+        `get_timestamps`, but computed by SQLite so that only one row per
+        activity is read.
+
+        Each activity lasts until the next one recorded between `earliest` and
+        `latest`, so the last activity has no duration. Activities lasting
+        longer than `max_time` are left out.
+
+        When `max_time` is `SUMMARY_MAX_TIME`, the time spent on days in the
+        middle of the range is read from the per-day summary, so only the
+        activities near `earliest` and `latest` are read from the timelog.
+
+        Args:
+            earliest: The earliest time to include activities from
+            latest: The time to include activities until, exclusive
+            max_time: Optional; the longest an activity can last and still be
+                included
+
+        Returns:
+            A pandas DataFrame with an index `activity` with each activity
+            once, and a column `duration` with the total time spent doing each
+            activity as a `timedelta`.
+        """
+
+        import pandas as pd
+
+        start, end = to_epoch_us(earliest), to_epoch_us(latest)
+        max_duration = max_time // MICROSECOND
+
+        # Ranges of times to summarize from the timelog
+        edges = [(start, end)]
+        totals = dict()
+
+        if max_time == SUMMARY_MAX_TIME:
+            # Use the per-day summary for whole days in the range, where every
+            # activity that started on the day and was short enough to be
+            # summarized also ended before `latest`
+            first_day = -(-start // DAY_US)
+            last_day = (end - max_duration) // DAY_US - 1
+
+            if first_day <= last_day:
+                edges = [(start, first_day * DAY_US),
+                         ((last_day + 1) * DAY_US, end)]
+
+                totals.update(self.db.execute(
+                    """SELECT activity_id, SUM(duration) FROM activity_day_summary
+                    WHERE day >= :first AND day <= :last AND duration != 0
+                    GROUP BY activity_id
+                    """, {'first': first_day, 'last': last_day}))
+
+                # The last activity between `earliest` and `latest` has no
+                # duration, but is still included, which the summary can't
+                # show when it is on one of the summarized days
+                last = self.db.execute(
+                    """SELECT time, activity_id FROM timelog WHERE time >= :start AND time < :end
+                    ORDER BY time DESC, id DESC LIMIT 1
+                    """, {'start': start, 'end': end}).fetchone()
+
+                if last is not None and last['time'] < (last_day + 1) * DAY_US:
+                    totals.setdefault(last['activity_id'], 0)
+
+        for low, high in edges:
+            # Each activity lasts until the next one, which may be after
+            # `high`, but has to be before `end`. The last activity before
+            # `end` has no duration, but is still included.
+            fetch = self.db.execute(
+                """SELECT activity_id, IFNULL(SUM(duration), 0) FROM (
+                    SELECT time, activity_id,
+                        LEAD(time) OVER (ORDER BY time, id) - time AS duration
+                    FROM timelog
+                    WHERE time >= :low AND time < :end AND time <= IFNULL(
+                        (SELECT time FROM timelog WHERE time >= :high ORDER BY time LIMIT 1), :high)
+                )
+                WHERE time < :high AND (duration IS NULL OR duration <= :max)
+                GROUP BY activity_id
+                """, {
+                    'low': low,
+                    'high': high,
+                    'end': end,
+                    'max': max_duration
+                })
+
+            for activity_id, duration in fetch:
+                totals[activity_id] = totals.get(activity_id, 0) + duration
+
+        names = self._activity_names()
+
+        durations = pd.DataFrame.from_records(
+            [(names[activity_id], duration)
+             for activity_id, duration in totals.items()],
+            columns=['activity', 'duration'], index='activity')
+        durations['duration'] = pd.to_timedelta(
+            durations['duration'], unit='us')
+
+        return durations
+
+    def time_series(self, earliest: datetime, latest: datetime, freq: str = 'D', max_time: timedelta = SUMMARY_MAX_TIME) -> pd.DataFrame:
+        """
+        Returns how much time was spent doing each activity in each day or
+        week, the same as `timelog.parse_time_series` does for the times from
+        `get_timestamps`, but without converting the times to timestamps
+        first.
+
+        Args:
+            earliest: The earliest time to include activities from
+            latest: The time to include activities until, exclusive
+            freq: Optional; `'D'` to split activities by day, or `'W'` to
+                split them by week
+            max_time: Optional; the longest an activity can last and still be
+                included
+
+        Returns:
+            The DataFrame returned by `time_series.split_by_period`.
+        """
+
+        import numpy as np
+
+        from DailyData.time_management.time_series import split_by_period
+
+        names = self._activity_names()
+
+        # Fetch plain tuples, which can be passed straight to NumPy
+        cursor = self.db.cursor()
+        cursor.row_factory = None
+
+        fetch = cursor.execute(
+            """SELECT time, IFNULL(timezone_offset, 0), activity_id FROM timelog
+            WHERE time >= :min AND time < :max
+            ORDER BY time, id
+            """, {
+                'min': to_epoch_us(earliest),
+                'max': to_epoch_us(latest)
+            }).fetchall()
+
+        rows = np.array(fetch, dtype=np.int64).reshape(-1, 3)
+
+        # Only list the activities that were recorded, as
+        # `timelog.parse_time_series` does
+        ids, codes = np.unique(rows[:, 2], return_inverse=True)
+
+        return split_by_period(rows[:, 0] * 1000, rows[:, 1] * 10**9, codes,
+                               [names[activity_id] for activity_id in ids], freq, max_time)
+
+    def rebuild_summary(self, since: datetime = None):
+        """
+        Recomputes the per-day summary used by `summarize` from the recorded
+        times.
+
+        Args:
+            since: Optional; only recompute the summary for the days affected
+                by times recorded at or after `since`. By default, the whole
+                summary is recomputed.
+        """
+
+        with self._write_transaction():
+            self._rebuild_summary(
+                to_epoch_us(since) if since is not None else None)
+
+    def _rebuild_summary(self, since: int = None):
+        if since is None:
+            first_day = None
+        else:
+            # The time spent on the record before `since` may have changed,
+            # so start on the day of that record
+            before = self.db.execute(
+                'SELECT time FROM timelog WHERE time < :since ORDER BY time DESC LIMIT 1;',
+                {'since': since}).fetchone()
+
+            first_day = (before['time'] if before else since) // DAY_US
+
+        if first_day is None:
+            self.db.execute('DELETE FROM activity_day_summary')
+            records = self.db.execute(
+                'SELECT time, activity_id FROM timelog ORDER BY time, id')
+        else:
+            self.db.execute('DELETE FROM activity_day_summary WHERE day >= :first',
+                            {'first': first_day})
+            records = self.db.execute(
+                'SELECT time, activity_id FROM timelog WHERE time >= :first ORDER BY time, id',
+                {'first': first_day * DAY_US})
+
+        max_duration = SUMMARY_MAX_TIME // MICROSECOND
+        summary = dict()
+        last = None
+
+        for record in records:
+            if last is not None:
+                duration = record['time'] - last['time']
+
+                if duration <= max_duration:
+                    key = (last['time'] // DAY_US, last['activity_id'])
+                    summary[key] = summary.get(key, 0) + duration
+
+            last = record
+
+        self.db.executemany('INSERT INTO activity_day_summary VALUES (?, ?, ?)',
+                            ((day, act, duration) for (day, act), duration in summary.items()))
+
+    def _neighbours(self, time: int):
+        """
+        Returns the records immediately before (or at the same time as) and
+        after `time`, given in microseconds since the epoch, or `None` where
+        there is no such record.
+
+        Both are found with a single query, each with one lookup in the index
+        on `time`.
+        """
+
+        before, after = None, None
+
+        for record in self.db.execute(
+                'SELECT * FROM (' + SELECT_RECORD +
+                'WHERE time <= :time ORDER BY time DESC, timelog.id DESC LIMIT 1) '
+                'UNION ALL SELECT * FROM (' + SELECT_RECORD +
+                'WHERE time > :time ORDER BY time, timelog.id LIMIT 1);',
+                {'time': time}):
+            if record['time'] <= time:
+                before = record
+            else:
+                after = record
+
+        return before, after
+
+    def _add_to_summary(self, start: int, end: int, activity_id: int, sign=1):
+        """
+        Adds (or with `sign=-1`, removes) the time spent doing an activity from
+        `start` until `end`, in microseconds since the epoch, to the per-day
+        summary.
+        """
+
+        if end - start > SUMMARY_MAX_TIME // MICROSECOND:
+            return
+
+        self.db.execute(
+            """INSERT INTO activity_day_summary VALUES (:day, :act, :duration)
+            ON CONFLICT (day, activity_id) DO UPDATE SET duration = duration + :duration
+            """, {
+                'day': start // DAY_US,
+                'act': activity_id,
+                'duration': sign * (end - start)
+            })
 
     def run_schema(self) -> None:
-        with resources.open_text(package='DailyData.io', resource=SCHEMA, encoding='utf8') as f:
-            try:
-                self.db.executescript(f.read())
-            except OperationalError as err:
-                if 'duplicate column name' in '; '.join(err.args):
-                    pass
-                else:
-                    raise err
+        """
+        Runs any migrations that have not yet been run on the database.
+        """
+
+        old_version, new_version = migrations.migrate(self.db)
+
+        if old_version < new_version:
+            # Summarize any times recorded before the summary table existed,
+            # or before the migrations changed how they are recorded
+            self.rebuild_summary()
 
-        self.db.execute('UPDATE metadata SET version = ?', (__version__, ))
 
+def convert_text_folder(path: Path):
+    """
+    Copies the activities and times recorded with `TextIO` in the
+    `activities` folder in `path` into the database `dailydata.db` in `path`.
+    Times written without a timezone are taken to be in the local timezone.
+    """
 
-def __main(path: Path):
+    import pandas as pd
     from DailyData.io.text import TextIO
 
     text_io = TextIO(path.joinpath('./activities'))
@@ -280,19 +949,25 @@ def __main(path: Path):
         for line in list_file:
             db_io.new_activity(line.strip())
 
-    for row in text_io.get_timestamps(pd.Timestamp.min, pd.Timestamp.max).iterrows():
-        db_io.record_time(row[1]['activity'], None,
-                          row[1]['time'].tz_localize(tz.tzlocal()), backdated=None)
+    timestamps = text_io.get_timestamps(pd.Timestamp.min, pd.Timestamp.max)
+
+    # Months with more than one UTC offset have a column of datetimes rather
+    # than Timestamps, so the times are localized one at a time
+    db_io.record_many((row.activity, None,
+                       row.time if row.time.tzinfo else row.time.replace(tzinfo=tz.tzlocal()), None)
+                      for row in timestamps.itertuples(index=False))
 
     n_converted = db_io.db.execute(
         'SELECT COUNT(*) FROM timelog').fetchone()[0]
     print('{} timelogs converted'.format(n_converted))
 
     last_converted = db_io.db.execute(
-        'SELECT activity, time FROM timelog ORDER BY time DESC').fetchone()
+        SELECT_RECORD + 'ORDER BY time DESC').fetchone()
     print('Last converted log: {} at {}'.format(
-        last_converted[0], last_converted[1]))
+        last_converted['activity'], from_epoch_us(last_converted['time'])))
+
+    return db_io
 
 
 if __name__ == '__main__':
-    __main(Path('.'))
+    convert_text_folder(Path('.'))
@@ -0,0 +1,289 @@
+"""
+Numbered migrations that create and upgrade the schema of the timelog
+database.
+
+The schema version of a database is the number of migrations that have been
+run on it, and is saved in the database with `PRAGMA user_version`, so that
+checking whether a database is up to date only costs reading that pragma. Each
+migration is run once, in its own transaction, along with updating the
+version.
+
+Databases created before the migrations existed have a version of 0 but may
+already have some of the tables, so every migration must be idempotent.
+
+New migrations must be appended to `MIGRATIONS`, never inserted or removed,
+since the position of each migration in the list is its version number.
+"""
+
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Tuple
+
+# The time that times in the timelog table are counted from
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _create_tables(db: sqlite3.Connection):
+    """
+    Creates the user, activity and timelog tables.
+    """
+
+    db.execute('CREATE TABLE IF NOT EXISTS user (username TEXT PRIMARY KEY)')
+    db.execute('''CREATE TABLE IF NOT EXISTS activity (
+        name TEXT PRIMARY KEY,
+        parent TEXT,
+        alias INT,
+        FOREIGN KEY (parent) REFERENCES activity (name)
+    )''')
+    db.execute('''CREATE TABLE IF NOT EXISTS timelog (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        time TIMESTAMP NOT NULL,
+        timezone_offset FLOAT,
+        timezone_name TEXT,
+        activity TEXT NOT NULL,
+        user TEXT,
+        backdated BOOLEAN,
+        FOREIGN KEY (user) REFERENCES user (username) FOREIGN KEY (activity) REFERENCES activity (name)
+    )''')
+
+
+def _add_device_name(db: sqlite3.Connection):
+    """
+    Adds the device_name column to the timelog table.
+    """
+
+    columns = [row[1] for row in db.execute('PRAGMA table_info(timelog)')]
+
+    if 'device_name' not in columns:
+        db.execute('ALTER TABLE timelog ADD device_name TEXT')
+
+
+def _index_timelog(db: sqlite3.Connection):
+    """
+    Indexes the timelog table, so that looking up records by time does not
+    scan the whole table.
+    """
+
+    db.execute('CREATE INDEX IF NOT EXISTS timelog_time_idx ON timelog (time)')
+    db.execute(
+        'CREATE INDEX IF NOT EXISTS timelog_user_time_idx ON timelog (user, time)')
+    db.execute(
+        'CREATE INDEX IF NOT EXISTS timelog_activity_idx ON timelog (activity)')
+
+
+def _create_summary(db: sqlite3.Connection):
+    """
+    Creates the table of time spent on each activity per day.
+    """
+
+    db.execute('''CREATE TABLE IF NOT EXISTS activity_day_summary (
+        day DATE NOT NULL,
+        activity TEXT NOT NULL,
+        duration INTEGER NOT NULL,
+        PRIMARY KEY (day, activity)
+    )''')
+
+
+def _text_to_epoch_us(text: str) -> int:
+    """
+    Converts a time saved as text by the sqlite3 timestamp adapter to
+    microseconds since the epoch.
+
+    Like the sqlite3 timestamp converter, any UTC offset at the end of the text
+    is ignored, since times were converted to UTC before they were saved.
+    """
+
+    day, time = text.split(' ')
+    time, _, fraction = re.split('[+-]', time)[0].partition('.')
+
+    year, month, day = map(int, day.split('-'))
+    hours, minutes, seconds = map(int, time.split(':'))
+    microseconds = int('{:0<6.6}'.format(fraction)) if fraction else 0
+
+    time = datetime(year, month, day, hours, minutes, seconds, microseconds)
+
+    return (time - _EPOCH) // timedelta(microseconds=1)
+
+
+def _epoch_times(db: sqlite3.Connection):
+    """
+    Saves times in the timelog table as integer microseconds since the epoch in
+    UTC and timezone offsets as integer seconds, instead of as text that has to
+    be parsed for every row read. Days in the summary are saved as days since
+    the epoch to match.
+    """
+
+    db.create_function('text_to_epoch_us', 1, _text_to_epoch_us)
+
+    # SQLite can't change the type of a column, so copy the times into a new
+    # table in place of the old one
+    db.execute('''CREATE TABLE timelog_epoch (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        time INTEGER NOT NULL,
+        timezone_offset INTEGER,
+        timezone_name TEXT,
+        activity TEXT NOT NULL,
+        user TEXT,
+        backdated BOOLEAN,
+        device_name TEXT,
+        FOREIGN KEY (user) REFERENCES user (username) FOREIGN KEY (activity) REFERENCES activity (name)
+    )''')
+    db.execute('''INSERT INTO timelog_epoch
+        SELECT id, text_to_epoch_us(time), CAST(round(timezone_offset) AS INTEGER),
+            timezone_name, activity, user, backdated, device_name
+        FROM timelog''')
+    db.execute('DROP TABLE timelog')
+    db.execute('ALTER TABLE timelog_epoch RENAME TO timelog')
+
+    # The indexes were dropped with the old table
+    _index_timelog(db)
+
+    # The summary is recomputed from the timelog after migrating
+    db.execute('DROP TABLE activity_day_summary')
+    db.execute('''CREATE TABLE activity_day_summary (
+        day INTEGER NOT NULL,
+        activity TEXT NOT NULL,
+        duration INTEGER NOT NULL,
+        PRIMARY KEY (day, activity)
+    )''')
+
+
+def _dimension_ids(db: sqlite3.Connection):
+    """
+    Gives activities and users integer ids, and refers to them by id in the
+    timelog table and summary instead of repeating their names on every row.
+    """
+
+    # Foreign keys were never enforced, so activities and users may have been
+    # recorded without being added first
+    db.execute('''INSERT INTO activity (name)
+        SELECT DISTINCT activity FROM timelog
+        WHERE activity NOT IN (SELECT name FROM activity)''')
+    db.execute('''INSERT INTO user (username)
+        SELECT DISTINCT user FROM timelog
+        WHERE user IS NOT NULL AND user NOT IN (SELECT username FROM user)''')
+
+    # Build the new tables alongside the old ones, and then swap them in.
+    # The new tables already refer to each other by their final names.
+    db.execute('''CREATE TABLE activity_ids (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        parent_id INTEGER,
+        alias INT,
+        FOREIGN KEY (parent_id) REFERENCES activity (id)
+    )''')
+    db.execute('''INSERT INTO activity_ids (name, alias)
+        SELECT name, alias FROM activity ORDER BY rowid''')
+    db.execute('''UPDATE activity_ids SET parent_id = (
+        SELECT parent.id
+        FROM activity JOIN activity_ids AS parent ON parent.name = activity.parent
+        WHERE activity.name = activity_ids.name
+    )''')
+
+    db.execute('''CREATE TABLE user_ids (
+        id INTEGER PRIMARY KEY,
+        username TEXT NOT NULL UNIQUE
+    )''')
+    db.execute(
+        'INSERT INTO user_ids (username) SELECT username FROM user ORDER BY rowid')
+
+    db.execute('''CREATE TABLE timelog_ids (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        time INTEGER NOT NULL,
+        timezone_offset INTEGER,
+        timezone_name TEXT,
+        activity_id INTEGER NOT NULL,
+        user_id INTEGER,
+        backdated BOOLEAN,
+        device_name TEXT,
+        FOREIGN KEY (activity_id) REFERENCES activity (id) FOREIGN KEY (user_id) REFERENCES user (id)
+    )''')
+    db.execute('''INSERT INTO timelog_ids
+        SELECT timelog.id, time, timezone_offset, timezone_name, activity_ids.id,
+            user_ids.id, backdated, device_name
+        FROM timelog
+            JOIN activity_ids ON activity_ids.name = timelog.activity
+            LEFT JOIN user_ids ON user_ids.username = timelog.user''')
+
+    # The summary is recomputed from the timelog after migrating
+    db.execute('''CREATE TABLE activity_day_summary_ids (
+        day INTEGER NOT NULL,
+        activity_id INTEGER NOT NULL,
+        duration INTEGER NOT NULL,
+        PRIMARY KEY (day, activity_id)
+    )''')
+
+    for table in ['timelog', 'activity_day_summary', 'activity', 'user']:
+        db.execute('DROP TABLE {}'.format(table))
+        db.execute('ALTER TABLE {0}_ids RENAME TO {0}'.format(table))
+
+    # The indexes were dropped with the old table
+    db.execute('CREATE INDEX timelog_time_idx ON timelog (time)')
+    db.execute('CREATE INDEX timelog_user_time_idx ON timelog (user_id, time)')
+    db.execute('CREATE INDEX timelog_activity_idx ON timelog (activity_id)')
+
+
+MIGRATIONS = [
+    _create_tables,
+    _add_device_name,
+    _index_timelog,
+    _create_summary,
+    _epoch_times,
+    _dimension_ids,
+]
+
+# The schema version of a database with every migration
+LATEST_VERSION = len(MIGRATIONS)
+
+
+def schema_version(db: sqlite3.Connection) -> int:
+    """
+    Returns the number of migrations that have been run on the database.
+    """
+
+    return db.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(db: sqlite3.Connection, target: int = LATEST_VERSION) -> Tuple[int, int]:
+    """
+    Runs the migrations that have not yet been run on the database.
+
+    Args:
+        db: The connection to the database to migrate
+        target: Optional; the schema version to migrate the database to. By
+            default, every migration is run.
+
+    Returns:
+        A tuple of the schema version of the database before and after the
+        migrations were run.
+    """
+
+    old_version = version = schema_version(db)
+
+    while version < target:
+        # Take the write lock straight away, in case another process is
+        # migrating the database at the same time
+        db.execute('BEGIN IMMEDIATE')
+
+        try:
+            # ...and only run the migration if it didn't already
+            version = schema_version(db)
+
+            if version >= target:
+                db.rollback()
+                break
+
+            MIGRATIONS[version](db)
+
+            version += 1
+
+            # PRAGMA doesn't accept parameters, but version is always an int
+            db.execute('PRAGMA user_version = {:d}'.format(version))
+        except BaseException:
+            db.rollback()
+            raise
+
+        db.commit()
+
+    return old_version, version
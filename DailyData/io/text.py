@@ -1,49 +1,223 @@
-from datetime import datetime, timedelta
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
 from os import PathLike
 from pathlib import Path
-from typing import List
+from typing import List, Set
 from .timelog_io import TimelogIO
 
 import pandas as pd
 
+# The formats of naive and timezone-aware times written by record_time, which
+# always writes microseconds
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+AWARE_TIME_FORMAT = TIME_FORMAT + '%z'
+
+# The length of the local time in a time written by record_time, and the UTC
+# offset written after it
+_LOCAL_LENGTH = len('2000-01-01 00:00:00.000000')
+_OFFSET = re.compile(r'([+-])(\d\d):(\d\d)')
+
+
+def month_after(month: datetime) -> datetime:
+    """
+    Returns the first day of the month after `month`.
+    """
+
+    # Day 28 exists in every month, and four days later is always the next one
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def format_time(timestamp: datetime) -> str:
+    """
+    Formats a time the way record_time writes it, always with microseconds,
+    and with the UTC offset of timezone-aware times.
+    """
+
+    # Through datetime, since not every version of pandas' Timestamp accepts
+    # timespec
+    return datetime.isoformat(timestamp, sep=' ', timespec='microseconds')
+
+
+def parse_times(times: pd.Series) -> pd.Series:
+    """
+    Parses times written by record_time, without inferring their format.
+    """
+
+    # Aware times are tried first, since some versions of pandas parse them
+    # with the naive format, but much more slowly
+    for parse in (parse_aware_times, partial(pd.to_datetime, format=TIME_FORMAT)):
+        try:
+            return parse(times)
+        except ValueError:
+            pass
+
+    # Files written before every time had microseconds, as str() formats a
+    # datetime, or with both naive and aware times, can't be parsed with one
+    # format, which pandas 2 no longer falls back from, so parse each time
+    return pd.Series([datetime.fromisoformat(t) for t in times],
+                     index=times.index, dtype=object).infer_objects()
+
+
+def parse_aware_times(times: pd.Series) -> pd.Series:
+    """
+    Parses timezone-aware times written by record_time.
+
+    The local times are parsed apart from their UTC offsets, which are the
+    same for many times, since pandas parses times with `%z` in the format
+    much more slowly.
+
+    Returns:
+        A Series of times in their timezone, if they all have the same offset,
+        and of objects otherwise.
+    """
+
+    local = pd.to_datetime(times.str[:_LOCAL_LENGTH], format=TIME_FORMAT)
+    offsets = times.str[_LOCAL_LENGTH:]
+
+    groups = []
+
+    for offset in offsets.unique():
+        match = _OFFSET.fullmatch(offset)
+
+        if match is None:
+            raise ValueError('Unknown UTC offset {!r}'.format(offset))
+
+        sign = -1 if match.group(1) == '-' else 1
+        zone = timezone(sign * timedelta(hours=int(match.group(2)), minutes=int(match.group(3))))
+
+        in_offset = offsets == offset
+        groups.append(local[in_offset].dt.tz_localize(zone))
+
+    if len(groups) == 1:
+        return groups[0]
+
+    return pd.concat([group.astype(object) for group in groups]).reindex(times.index)
+
+
+def utc_naive(time: datetime) -> datetime:
+    """
+    Converts a timezone-aware time to naive UTC, and leaves naive times as
+    they are, the way the database compares times.
+    """
+
+    if time.tzinfo is not None:
+        time = time.replace(tzinfo=None) - time.utcoffset()
+
+    return time
+
+
+def read_month(csv_path: Path, earliest: datetime, latest: datetime) -> pd.DataFrame:
+    """
+    Reads the times in a monthly activity file between `earliest` and
+    `latest`, which must be naive.
+    """
+
+    df = pd.read_csv(csv_path, names=['activity', 'time'], usecols=[0, 1])
+    df['time'] = parse_times(df['time'])
+
+    # Aware times are compared in UTC, and naive times as they are
+    compared = pd.to_datetime(df['time'], utc=True).dt.tz_localize(None)
+
+    return df[(compared >= earliest) & (compared <= latest)]
+
 
 class TextIO(TimelogIO):
-    def __init__(self, act_folder: Path):
+    def __init__(self, act_folder: Path, max_workers: int = None):
+        """
+        Args:
+            act_folder: The folder containing the activity list and a CSV file
+                of times for each month
+            max_workers: Optional; the most monthly files to read at once. By
+                default, uses the default of ThreadPoolExecutor.
+        """
+
         self.activity_folder = act_folder
         self.act_list_path = self.activity_folder.joinpath('list.txt')
+        self.max_workers = max_workers
 
-    def record_time(self, activity: str, user: str, timestamp: datetime, backdated=False):
-        if not self.activity_folder.exists():
-            self.activity_folder.mkdir()
+        # The activities in the activity list, and the modification time and
+        # size of the list when they were read
+        self._activities = None
+        self._list_stat = None
+
+    @property
+    def activities(self) -> Set[str]:
+        """
+        The set of activities in the activity list.
 
-        if not self.act_list_path.exists():
-            open(self.act_list_path, mode='w').close()
+        The list is only reread if it has changed since it was last read, for
+        example if it was edited by hand.
+        """
 
-        with open(self.act_list_path, mode='r+') as act_list:
-            if (activity + '\n') not in act_list:
-                raise ValueError('Unknown activity {}'.format(activity))
+        try:
+            stat = self.act_list_path.stat()
+            stat = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stat = None
+
+        if self._activities is None or stat != self._list_stat:
+            if stat is None:
+                self._activities = set()
+            else:
+                with open(self.act_list_path, mode='r') as act_list:
+                    self._activities = {line.rstrip('\n') for line in act_list}
+
+            self._list_stat = stat
+
+        return self._activities
+
+    def record_time(self, activity: str, user: str, timestamp: datetime, backdated=False):
+        if activity not in self.activities:
+            raise ValueError('Unknown activity {}'.format(activity))
 
         with open(self.activity_folder.joinpath(timestamp.strftime('%Y-%m') + '.csv'), mode='a') as file:
-            file.write(','.join([activity, str(timestamp), '\n']))
+            file.write(','.join([activity, format_time(timestamp), '\n']))
 
     def get_timestamps(self, earliest: datetime, latest: datetime) -> List:
-        all = pd.DataFrame(columns=['activity', 'time'])
+        earliest, latest = utc_naive(earliest), utc_naive(latest)
+
+        months = []
 
         for csv_path in self.activity_folder.glob('*.csv'):
-            file_date = datetime.strptime(csv_path.stem, '%Y-%m')
+            try:
+                file_date = datetime.strptime(csv_path.stem, '%Y-%m')
+            except ValueError:
+                # Not a monthly activity file
+                continue
+
+            # Only read files for months that overlap the requested times
+            if file_date <= latest and month_after(file_date) > earliest:
+                months.append((file_date, csv_path))
+
+        if not months:
+            return pd.DataFrame(columns=['activity', 'time'])
+
+        # Read the files in order of month, so the times come out in order
+        paths = [csv_path for _, csv_path in sorted(months)]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            frames = list(executor.map(
+                lambda path: read_month(path, earliest, latest), paths))
+
+        return pd.concat(frames, ignore_index=True)
+
+    def new_activity(self, activity: str, parent: str = None, is_alias: bool = None):
+        if parent is not None or is_alias is not None:
+            raise NotImplementedError(
+                'Parent activities and aliases are not supported by TextIO')
 
-            if earliest <= file_date < latest:
-                with open(csv_path) as file:
-                    df = pd.read_csv(
-                        file, names=['activity', 'time'], usecols=[0, 1])
-                    df['time'] = pd.to_datetime(df['time'])
+        if activity in self.activities:
+            raise ValueError('Activity {} already exists'.format(activity))
 
-                    df.drop(df[df['time'] > latest].index, inplace=True)
-                    df.drop(df[df['time'] < earliest].index, inplace=True)
+        self.activity_folder.mkdir(parents=True, exist_ok=True)
 
-                    all = all.append(df, ignore_index=True)
+        with open(self.act_list_path, mode='a') as act_list:
+            act_list.write(activity + '\n')
 
-        return all
+        # Keep the cached activities up to date without rereading the list
+        self._activities.add(activity)
 
-    def new_activity(self, activity: str, parent: str, is_alias: bool):
-        raise NotImplementedError()
+        stat = self.act_list_path.stat()
+        self._list_stat = (stat.st_mtime_ns, stat.st_size)
@@ -1,11 +1,14 @@
+from __future__ import annotations
+
 from DailyData.time_management.recorded_activity import RecordedActivity
 import abc
 from datetime import datetime
-from typing import List
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Tuple
 
 from dateutil import tz
 
-from pandas import DataFrame
+if TYPE_CHECKING:
+    from pandas import DataFrame
 
 
 class TimelogIO(abc.ABC):
@@ -82,6 +85,35 @@ class TimelogIO(abc.ABC):
 
         return None
 
+    def record_many(self, events: Iterable[Tuple]) -> int:
+        """
+        Records many activities at once.
+
+        By default this simply calls `record_time` for each event, but
+        extending classes are encouraged to override it with something faster,
+        for example by writing all of the events at once.
+
+        Args:
+            events: An iterable of `(activity, user, timestamp)` or
+                `(activity, user, timestamp, backdated)` tuples, where each
+                item has the same meaning as the corresponding argument of
+                `record_time`.
+
+        Returns:
+            The number of activities recorded.
+
+        Raises:
+            ValueError: Activity not found
+        """
+
+        n_recorded = 0
+
+        for event in events:
+            self.record_time(*event)
+            n_recorded += 1
+
+        return n_recorded
+
     def get_timestamps(self, earliest: datetime, latest: datetime) -> DataFrame:
         """
         Returns from file all of the recorded activities within a given range.
@@ -103,6 +135,41 @@ class TimelogIO(abc.ABC):
 
         pass
 
+    def iter_timestamps(self, earliest: datetime, latest: datetime, chunk_rows: int = 10000) -> Iterator[DataFrame]:
+        """
+        Returns from file all of the recorded activities within a given range,
+        a few at a time.
+
+        This is the same as `get_timestamps`, except that the recorded
+        activities are sorted by time, and split between several DataFrames
+        so that they do not all have to be held in memory at once. By default
+        this just splits up the results of `get_timestamps`, but extending
+        classes are encouraged to override it to read from file in chunks.
+
+        Args:
+            earliest: The time before which activities are not included in the
+                results, as in `get_timestamps`.
+            latest: The time after which activities are not included in
+                results, as in `get_timestamps`.
+            chunk_rows: Optional; The greatest number of recorded activities
+                in each DataFrame.
+
+        Returns:
+            An iterator of pandas DataFrames, each with at most `chunk_rows`
+            rows and the same columns as `get_timestamps`. Taken together,
+            the rows are in chronological order.
+        """
+
+        from pandas import to_datetime
+
+        timestamps = self.get_timestamps(earliest, latest)
+
+        timestamps = timestamps.iloc[to_datetime(
+            timestamps['time'], utc=True).argsort(kind='stable')]
+
+        for start in range(0, len(timestamps), chunk_rows):
+            yield timestamps.iloc[start:start + chunk_rows]
+
 
 class DebugTimelogIO(TimelogIO):
     """
@@ -169,5 +236,11 @@ class DebugTimelogIO(TimelogIO):
     def record_time(self, *args, **kwargs):
         return self.__update('record_time', args, kwargs)
 
+    def record_many(self, *args, **kwargs):
+        return self.__update('record_many', args, kwargs)
+
     def get_timestamps(self, *args, **kwargs):
         return self.__update('get_timestamps', args, kwargs)
+
+    def iter_timestamps(self, *args, **kwargs):
+        return self.__update('iter_timestamps', args, kwargs)
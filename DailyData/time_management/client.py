@@ -0,0 +1,111 @@
+"""
+The thin client used by the `timelog` command, which forwards its arguments
+to the timelog daemon when it is running, and otherwise runs them itself.
+
+Nothing but the standard library is imported until the client knows that the
+daemon isn't running, so that forwarding a command costs little more than
+starting the interpreter. See `daemon` for the server.
+
+Requests and responses are each a single line of JSON. The client sends
+`{"argv": [...]}` and the daemon replies with
+`{"status": 0, "stdout": "...", "stderr": "..."}`.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+# The environment variable that overrides where the daemon listens
+SOCKET_ENV = 'DAILYDATA_TIMELOG_SOCKET'
+
+# Next to the user configuration file, see `DailyData.config`
+DEFAULT_SOCKET = Path.home().joinpath('.dailydata_timelog.sock')
+
+
+def socket_path() -> Path:
+    """
+    Returns the path of the socket the daemon listens on.
+    """
+
+    return Path(os.environ.get(SOCKET_ENV, DEFAULT_SOCKET))
+
+
+def forward(argv, path: Path = None) -> dict:
+    """
+    Sends timelog arguments to the daemon and waits for it to run them.
+
+    Args:
+        argv: The arguments to the `timelog` command
+        path: Optional; the socket the daemon listens on. By default, the one
+            returned by `socket_path`.
+
+    Returns:
+        The response from the daemon, or `None` if the daemon isn't running,
+        in which case the command was not run.
+
+    Raises:
+        ConnectionError: The daemon stopped before it responded, so the
+            command may or may not have been run.
+    """
+
+    if path is None:
+        path = socket_path()
+
+    # The daemon isn't running if it hasn't created its socket, which is
+    # checked before importing socket, so that running the command directly
+    # doesn't pay for it
+    if not os.path.exists(path):
+        return None
+
+    import socket
+
+    # Unix domain sockets aren't available everywhere
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except (FileNotFoundError, ConnectionRefusedError):
+            # Either the daemon was never started, or it left its socket
+            # behind when it stopped
+            return None
+
+        sock.sendall(json.dumps({'argv': list(argv)}).encode() + b'\n')
+        sock.shutdown(socket.SHUT_WR)
+
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+
+            if not chunk:
+                break
+
+            chunks.append(chunk)
+
+    if not chunks:
+        raise ConnectionError('The timelog daemon stopped without responding')
+
+    return json.loads(b''.join(chunks))
+
+
+def client_entry_point():
+    """
+    The entry point used for the `timelog` command. Forwards the command to
+    the daemon when it is running, and otherwise runs it the same way as
+    `timelog.timelog_entry_point`.
+    """
+
+    response = forward(sys.argv[1:])
+
+    if response is None:
+        from .timelog import timelog_entry_point
+
+        return timelog_entry_point()
+
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+
+    if response['status']:
+        sys.exit(response['status'])
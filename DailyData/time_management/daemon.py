@@ -0,0 +1,184 @@
+"""
+A long-running timelog server, which keeps the configuration, the database
+connection, its cached activities and pandas loaded between commands, so that
+`timelog` commands don't have to load them every time they are run.
+
+The daemon listens on a Unix domain socket, and runs the arguments sent to it
+by `client.forward` exactly as `timelog.take_args` would, returning whatever
+they printed. Commands are run one at a time, in the order they arrive.
+
+Start the daemon with the `timelogd` command. Once it is running, the
+`timelog` command forwards everything to it, and when it isn't, the `timelog`
+command runs commands itself as before.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import signal
+import socket
+import sys
+import traceback
+from io import StringIO
+from pathlib import Path
+from typing import Any, Dict, List
+
+from DailyData.io.db import DatabaseWrapper
+from DailyData.io.timelog_io import TimelogIO
+
+from .client import socket_path
+from .config import TimeManagementConfig
+from .timelog import take_args
+
+
+class TimelogDaemon:
+    """
+    Runs timelog commands sent over a Unix domain socket against a single
+    `TimelogIO` that is kept open.
+    """
+
+    def __init__(self, time_management_cfg: TimeManagementConfig, io: TimelogIO):
+        self.time_management_cfg = time_management_cfg
+        self.io = io
+
+    def run_command(self, argv: List[str]) -> Dict[str, Any]:
+        """
+        Runs the arguments to the `timelog` command, and returns the response
+        sent to the client, with the exit status of the command and what it
+        printed.
+        """
+
+        # Other programs may have changed the activities while the daemon was
+        # waiting
+        if isinstance(self.io, DatabaseWrapper):
+            self.io.clear_cache_if_changed()
+
+        stdout, stderr = StringIO(), StringIO()
+        status = 0
+
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                take_args(self.time_management_cfg, self.io, argv=argv)
+            except SystemExit as exit:
+                # argparse exits after printing help or usage errors
+                if exit.code is None or isinstance(exit.code, int):
+                    status = exit.code or 0
+                else:
+                    print(exit.code, file=sys.stderr)
+                    status = 1
+            except Exception:
+                # Keep serving other commands, but don't leave half of this
+                # one waiting to be committed with the next
+                if isinstance(self.io, DatabaseWrapper):
+                    self.io.db.rollback()
+
+                traceback.print_exc()
+                status = 1
+
+        return {'status': status, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Responds to a single request from `client.forward`.
+        """
+
+        try:
+            request = json.loads(await reader.readline())
+            response = self.run_command(list(request['argv']))
+        except (ValueError, KeyError, TypeError) as e:
+            response = {'status': 2, 'stdout': '',
+                        'stderr': 'Bad request to timelog daemon: {}\n'.format(e)}
+
+        writer.write(json.dumps(response).encode() + b'\n')
+
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def start(self, path: Path) -> asyncio.AbstractServer:
+        """
+        Starts listening on the socket at `path`.
+
+        Raises:
+            RuntimeError: Another daemon is already listening on the socket
+        """
+
+        if path.exists():
+            # Only remove the socket if it was left behind by a daemon that
+            # didn't stop cleanly, and not if a daemon is still using it
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                try:
+                    sock.connect(str(path))
+                except ConnectionRefusedError:
+                    path.unlink()
+                else:
+                    raise RuntimeError(
+                        'The timelog daemon is already running at {}'.format(path))
+
+        # Only the user running the daemon should be able to record their
+        # activities, so the socket is created without permissions for anyone
+        # else, rather than changing them after others could connect
+        umask = os.umask(0o077)
+        try:
+            server = await asyncio.start_unix_server(self.handle, path=str(path))
+        finally:
+            os.umask(umask)
+
+        return server
+
+    async def serve(self, path: Path):
+        """
+        Serves commands on the socket at `path` until interrupted or
+        terminated, and then removes the socket.
+        """
+
+        server = await self.start(path)
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, server.close)
+
+        print('Listening on {}'.format(path))
+
+        try:
+            async with server:
+                await server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                path.unlink()
+
+
+def daemon_entry_point(argv=sys.argv[1:]):
+    """
+    The entry point used for the `timelogd` command, which runs the daemon in
+    the foreground until it is interrupted or terminated.
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Keep timelog running in the background, so that timelog commands run faster')
+    parser.add_argument('--socket', type=Path, default=None,
+                        help='The socket to listen on. By default, the one the timelog command uses.')
+    args = parser.parse_args(argv)
+
+    from .. import master_config
+
+    # Import pandas now instead of during the first summary
+    import pandas  # noqa: F401
+
+    with master_config:
+        db = DatabaseWrapper(master_config.data_folder.joinpath('dailydata.db'),
+                             master_config.database)
+        daemon = TimelogDaemon(master_config.time_management, db)
+
+        try:
+            asyncio.run(daemon.serve(args.socket or socket_path()))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            db.db.close()
+
+
+if __name__ == '__main__':
+    daemon_entry_point()
@@ -0,0 +1,130 @@
+"""
+Splits recorded activities into how long was spent on each activity in each
+day or week, so that trends over time can be shown.
+
+The arrays passed around in this module are all in integer nanoseconds, so
+that everything can be done with NumPy in a single pass over the activities,
+no matter how many days they cover.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+# Nanoseconds in one day
+DAY = 24 * 60 * 60 * 10**9
+
+# The length of each period, and when the first period at or before the epoch
+# started. 1970-01-01 was a Thursday, so weeks start three days earlier, on
+# Monday.
+PERIODS = {
+    'D': (DAY, 0, 'day'),
+    'W': (7 * DAY, -3 * DAY, 'week'),
+}
+
+
+def exact_bincount(codes: np.ndarray, values: np.ndarray, length: int) -> np.ndarray:
+    """
+    Sums non-negative int64 `values` by their integer `codes`, like
+    `numpy.bincount` does with weights, but without rounding.
+
+    `numpy.bincount` sums weights as float64, which can't hold large sums of
+    nanoseconds exactly, so the values are summed in 21 bit parts, each of
+    which sums exactly for up to 2**32 values.
+    """
+
+    totals = np.zeros(length, dtype=np.int64)
+
+    for shift in (0, 21, 42):
+        part = (values >> shift) & ((1 << 21) - 1)
+        totals += np.bincount(codes, weights=part, minlength=length) \
+            .astype(np.int64) << shift
+
+    return totals
+
+
+def split_by_period(times: np.ndarray, offsets: np.ndarray, codes: np.ndarray, activities,
+                    freq: str = 'D', max_time=timedelta(hours=12)) -> pd.DataFrame:
+    """
+    Calculates how much time was spent on each activity in each day or week.
+
+    Each activity lasts until the next one starts, as in
+    `timelog.parse_timestamps`, and activities lasting longer than `max_time`
+    are ignored. Activities are split at midnight in the timezone they were
+    recorded in, so an activity from 10pm until 2am counts two hours towards
+    each day.
+
+    Args:
+        times: The UTC time each activity started, in nanoseconds since the
+            epoch
+        offsets: The UTC offset of the timezone each activity was recorded in,
+            in nanoseconds
+        codes: The position of each activity in `activities`
+        activities: The names of the activities
+        freq: Optional; `'D'` to split activities by day, or `'W'` to split
+            them by week, starting on Monday
+        max_time: Optional; the longest an activity can last and still be
+            included
+
+    Returns:
+        A pandas DataFrame with an index of the local date each day or week
+        starts on, with every day or week between the first and last activity,
+        and a column for each activity, in order of their names, with the time
+        spent doing that activity in each day or week as a `timedelta`.
+    """
+
+    if freq not in PERIODS:
+        raise ValueError('Unknown frequency {}'.format(freq))
+
+    length, origin, name = PERIODS[freq]
+
+    order = np.argsort(times, kind='stable')
+    times, offsets, codes = times[order], offsets[order], codes[order]
+
+    # Each activity lasts until the next one, so the last one doesn't count
+    included = (codes[:-1] >= 0) & \
+        (np.diff(times) <= pd.Timedelta(max_time).value)
+
+    # The local time each activity started and ended, in the timezone it was
+    # started in
+    starts = times[:-1][included] + offsets[:-1][included]
+    ends = times[1:][included] + offsets[:-1][included]
+    codes = codes[:-1][included]
+
+    # The periods each activity starts and ends in, and how many periods each
+    # one is split across. Activities that last no time aren't split at all.
+    first = (starts - origin) // length
+    last = (ends - origin - 1) // length
+    pieces = np.maximum(last - first + 1, 0)
+
+    # Repeat each activity once for every period it is split across, and clip
+    # each piece to its period
+    activity = np.repeat(np.arange(len(starts)), pieces)
+    period = first[activity] + np.arange(len(activity)) - \
+        np.repeat(np.cumsum(pieces) - pieces, pieces)
+
+    period_start = origin + period * length
+    amounts = np.minimum(ends[activity], period_start + length) - \
+        np.maximum(starts[activity], period_start)
+
+    columns = pd.Index(np.asarray(activities), dtype=object, name='activity')
+
+    if len(period) == 0:
+        return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name=name),
+                            dtype='timedelta64[ns]').sort_index(axis='columns')
+
+    first_period = period.min()
+    n_periods = period.max() - first_period + 1
+
+    totals = exact_bincount((period - first_period) * len(columns) + codes[activity],
+                            amounts, n_periods * len(columns))
+
+    index = pd.DatetimeIndex(
+        (origin + (first_period + np.arange(n_periods)) * length).view('datetime64[ns]'),
+        name=name)
+
+    periods = pd.DataFrame(totals.reshape(n_periods, len(columns)).view('timedelta64[ns]'),
+                           index=index, columns=columns)
+
+    return periods.sort_index(axis='columns')
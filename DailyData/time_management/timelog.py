@@ -1,21 +1,26 @@
+from __future__ import annotations
+
 import argparse
 import re
 import sys
 from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Iterable, List
 
-import pandas as pd
 from DailyData import time_management
 from DailyData.config import MasterConfig
 from DailyData.io.db import DatabaseWrapper
 from DailyData.io.timelog_io import DebugTimelogIO, TimelogIO
-from dateutil import parser as time_parser
 from dateutil import tz
 
 from .config import TimeManagementConfig
 
+# pandas takes a while to import, so it is only imported when summarizing
+# activities, and not when recording them
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 def take_args(time_management_cfg: TimeManagementConfig, io: TimelogIO, argv=sys.argv[1:]):
     """
@@ -54,6 +59,15 @@ def take_args(time_management_cfg: TimeManagementConfig, io: TimelogIO, argv=sys
         `-u`/`--update`: Instead of recording a new time, alter the activity
             that was last recorded with the new activity that was performed.
 
+    `summary`: Prints how much time you have spent doing each activity.
+
+        `--by [day|week]`: Instead of the total time, prints how much time
+            you spent doing each activity on each day or in each week.
+
+    `rebuild-summary`: Recomputes the summary of how you spend your time that
+        is saved alongside your recorded activities, in case it has become
+        out of date, for example, if the database was edited by hand.
+
     `--list`: Prints a summary of how you have spent your time, including the
     total time spent doing each activity, what percentage time you spend doing
     each activity, and how much time per day you spend on average doing each
@@ -97,6 +111,13 @@ def take_args(time_management_cfg: TimeManagementConfig, io: TimelogIO, argv=sys
     parser_summary = subparsers.add_parser(
         'summary', help='Summarizes how you spend your time')
     parser_summary.set_defaults(func=summary)
+    parser_summary.add_argument('--by', choices=['day', 'week'],
+                                help='Show how you spent your time each day or week')
+
+    parser_rebuild = subparsers.add_parser(
+        'rebuild-summary',
+        help='Recompute the saved summary of how you spend your time')
+    parser_rebuild.set_defaults(func=rebuild_summary)
 
     # Add all the subcommands for the "timelog --list" command
     # TODO: This needs to be better fleshed out. ideally, "list" would be it's
@@ -128,14 +149,13 @@ def record(io, **kwargs: List[str]):
         io.new_activity(kwargs['event'])
 
     if kwargs.get('time'):
+        # dateutil's parser takes a while to import, so it is only imported
+        # when it is needed
+        from dateutil import parser as time_parser
+
         # Use the user-specified time if they have given one
-        #
-        # Yes, the 1 microsecond is necessary so that the time is entered
-        # into the database correctly, so that it is then parsed correctly
-        # when read back by sqlite3. This is why people hate programming.
-        # It took me over an hour to figure this out. （｀Δ´）！
         time = time_parser.parse(kwargs['time']).replace(
-            second=0, microsecond=1)
+            second=0, microsecond=0)
     else:
         # Otherwise use the current time
         time = datetime.now()
@@ -192,8 +212,35 @@ def summary(time_management_cfg: TimeManagementConfig, io: TimelogIO, **kwargs:
     print(
         'Between {:%Y-%m-%d} and {:%Y-%m-%d}, you have spent your time as follows:'.format(first, last))
 
+    if kwargs.get('by') is not None:
+        freq = {'day': 'D', 'week': 'W'}[kwargs['by']]
+
+        # Print a table of how much time is spent on each activity per period
+        if isinstance(io, DatabaseWrapper):
+            print(io.time_series(first, last, freq=freq))
+        else:
+            print(parse_time_series(io.get_timestamps(first, last), freq=freq))
+
+        return
+
     # Print a table of activities and how much time is spent for each
-    print(parse_timestamps(io.get_timestamps(first, last))[:kwargs['num']])
+    if isinstance(io, DatabaseWrapper):
+        # Let the database add up the durations when the file system is one,
+        # so that only the totals are read
+        durations = summarize_durations(io.summarize(first, last))
+    else:
+        durations = parse_timestamps(io.get_timestamps(first, last))
+
+    print(durations[:kwargs['num']])
+
+
+def rebuild_summary(io: TimelogIO, **kwargs: List[str]):
+    # Only if the file system supports it
+    if isinstance(io, DatabaseWrapper):
+        io.rebuild_summary()
+        print('Rebuilt summary')
+    else:
+        print('Summary not supported by data storage system')
 
 
 def parse_timestamps(time_table: pd.DataFrame, max_time=timedelta(hours=12)) -> pd.DataFrame:
@@ -213,7 +260,7 @@ def parse_timestamps(time_table: pd.DataFrame, max_time=timedelta(hours=12)) ->
         `time_table`: A pandas DataFrame containing a column of `datetime`s or
             `Timestamps`s with the name `time with an index of strings with
             the activity corresponding to each recorded time, the index's name
-            is `activity`.
+            is `activity`. The DataFrame is not modified.
 
         `max_time`: Optional; Specifies the maximum duration for an activity,
             activities with durations exceeding `max_time` are ignored for the
@@ -229,27 +276,217 @@ def parse_timestamps(time_table: pd.DataFrame, max_time=timedelta(hours=12)) ->
         activity per day.
     """
 
-    # Get the UTC time of each timestamp
-    time_table['utc_time'] = pd.to_datetime(time_table['time'], utc=True)
+    return summarize_durations(total_durations(time_table, max_time))
 
-    # Sort the values by their time, so that the differences are calculated
-    # in the right order
-    time_table.sort_values(by=['utc_time'], inplace=True)
 
-    # Calculate the duration of each activity
-    #
-    # This works by using the pandas difference function to find the difference
-    # function between the current record in the next, i.e. current - next,
-    # which is a negative duration, but it associates the difference with the
-    # current activity. All we have to do is negate this value to get the
-    # time spent for each activity starting at the listed time
-    time_table['duration'] = -time_table['utc_time'].diff(periods=-1)
+def total_durations(time_table: pd.DataFrame, max_time=timedelta(hours=12), last_finished=False) -> pd.DataFrame:
+    """
+    Calculates the total time spent doing each activity, as `parse_timestamps`
+    does, before the statistics are added.
+
+    Args:
+        `time_table`: A pandas DataFrame like the one passed to
+            `parse_timestamps`.
+
+        `max_time`: Optional; as in `parse_timestamps`.
+
+        `last_finished`: Optional; whether the last activity is left out,
+            because it lasts until an activity that isn't in `time_table`,
+            rather than being listed without a duration.
+
+    Returns:
+        A pandas DataFrame with an index `activity` and a column `duration`,
+        with each listed activity once, in alphabetical order.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    from .time_series import exact_bincount
+
+    # Work on arrays of the UTC time of each timestamp, in integer nanoseconds
+    # since the epoch, and of integer codes for each activity, rather than
+    # adding columns to the caller's DataFrame. The codes are in the order of
+    # the sorted activities, which is the order they are listed in before
+    # being sorted by duration.
+    times = pd.to_datetime(time_table['time'], utc=True).dt.tz_convert(None) \
+        .to_numpy(dtype='datetime64[ns]').view(np.int64)
+    codes, activities = pd.factorize(time_table['activity'], sort=True)
+
+    # Sort by time, so that the differences are calculated in the right order.
+    # Missing times are sorted last.
+    missing = np.isnat(times.view('datetime64[ns]'))
+    order = np.argsort(np.where(missing, np.iinfo(np.int64).max, times),
+                       kind='stable')
+    times, codes, missing = times[order], codes[order], missing[order]
+
+    # Calculate the duration of each activity by subtracting its start time
+    # from the start time of the next one. The last activity, and activities
+    # next to missing times, have no duration.
+    durations = np.zeros(len(times), dtype=np.int64)
+    has_duration = np.zeros(len(times), dtype=bool)
+
+    durations[:-1] = np.diff(times)
+    has_duration[:-1] = ~missing[:-1] & ~missing[1:]
+    durations[~has_duration] = 0
+
+    # Ignore activities with duration greater than max_time, but still list
+    # activities without a duration
+    included = (codes >= 0) & \
+        ~(has_duration & (durations > pd.Timedelta(max_time).value))
+
+    if last_finished and len(included) > 0:
+        included[-1] = False
+
+    totals = exact_bincount(
+        codes[included], durations[included], len(activities))
+    listed = np.bincount(codes[included], minlength=len(activities)) > 0
+
+    durations = pd.DataFrame(
+        {'duration': pd.to_timedelta(totals[listed], unit='ns')},
+        index=pd.Index(np.asarray(activities)[listed], dtype=object, name='activity'))
+
+    return durations
+
+
+def parse_time_series(time_table: pd.DataFrame, freq: str = 'D', max_time=timedelta(hours=12)) -> pd.DataFrame:
+    """
+    Calculates how much time was spent doing each activity in each day or
+    week, rather than in total as `parse_timestamps` does.
+
+    Activities that span midnight, or the start of a week, are split between
+    the days or weeks they span, using the timezone each activity was recorded
+    in.
+
+    Args:
+        `time_table`: A pandas DataFrame like the one passed to
+            `parse_timestamps`. Times with timezones are split at midnight in
+            their own timezone, and times without timezones are treated as
+            local times.
+
+        `freq`: Optional; `'D'` to split activities by day, or `'W'` to split
+            them by week, starting on Monday.
+
+        `max_time`: Optional; Specifies the maximum duration for an activity,
+            as in `parse_timestamps`.
+
+    Returns:
+        A pandas DataFrame with an index of the date each day or week starts,
+        and a column of type `timedelta` for each activity, with the time
+        spent doing that activity in each day or week, as returned by
+        `time_series.split_by_period`.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    from .time_series import split_by_period
+
+    time_table = time_table[time_table['time'].notna()]
+
+    times = pd.to_datetime(time_table['time'], utc=True).dt.tz_convert(None)
+    times = times.to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+    # Find the UTC offset of each time, which is the same for every time in a
+    # column with a single timezone, and has to be looked up time by time for
+    # a column of mixed timezones
+    local = time_table['time']
+    if isinstance(local.dtype, pd.DatetimeTZDtype):
+        offsets = (local.dt.tz_localize(None) - local.dt.tz_convert(None)) \
+            .to_numpy(dtype='timedelta64[ns]').view(np.int64)
+    elif local.dtype == object:
+        offsets = np.array([pd.Timedelta(pd.Timestamp(t).utcoffset() or 0).value
+                            for t in local], dtype=np.int64)
+    else:
+        offsets = np.zeros(len(times), dtype=np.int64)
+
+    codes, activities = pd.factorize(time_table['activity'], sort=True)
+
+    return split_by_period(times, offsets, codes, activities, freq, max_time)
+
+
+def parse_timestamp_chunks(chunks: Iterable[pd.DataFrame], max_time=timedelta(hours=12)) -> pd.DataFrame:
+    """
+    Does the same as `parse_timestamps`, but for activities that are split
+    between several DataFrames, such as those from
+    `TimelogIO.iter_timestamps`, so that they do not all have to be held in
+    memory at once.
+
+    Args:
+        `chunks`: An iterable of pandas DataFrames like those passed to
+            `parse_timestamps`. Taken together, the rows of the DataFrames
+            must be in chronological order.
+
+        `max_time`: Optional; Specifies the maximum duration for an activity,
+            as in `parse_timestamps`.
+
+    Returns:
+        The same DataFrame as `parse_timestamps` would for all of the chunks
+        together.
+    """
+
+    import pandas as pd
+
+    # The total nanoseconds spent doing each activity so far, so that only one
+    # number per activity is kept, however many chunks there are
+    totals = dict()
+
+    def add_to_totals(durations: pd.DataFrame):
+        for activity, duration in durations['duration'].items():
+            totals[activity] = totals.get(activity, 0) + duration.value
+
+    # The last activity of each chunk lasts until the first activity of the
+    # next chunk, so it is carried over to be included with the next chunk
+    last = None
+
+    for chunk in chunks:
+        chunk = chunk[['time', 'activity']]
+
+        if last is not None:
+            chunk = pd.concat([last, chunk], ignore_index=True)
+
+        if len(chunk) == 0:
+            continue
+
+        add_to_totals(total_durations(chunk, max_time, last_finished=True))
+        last = chunk.iloc[-1:]
+
+    if last is None:
+        return parse_timestamps(pd.DataFrame(columns=['time', 'activity']))
+
+    # The very last activity doesn't have a duration, but is still listed
+    add_to_totals(total_durations(last, max_time))
+
+    # List the activities in alphabetical order, as total_durations does
+    activities = sorted(totals)
+
+    durations = pd.DataFrame(
+        {'duration': pd.to_timedelta([totals[activity] for activity in activities], unit='ns')},
+        index=pd.Index(activities, dtype=object, name='activity'))
+
+    return summarize_durations(durations)
+
+
+def summarize_durations(durations: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calculates statistics for the total time spent doing each activity.
+
+    Args:
+        `durations`: A pandas DataFrame with an index `activity` and a column
+            `duration` with the total time spent doing each activity.
+
+    Returns:
+        The same DataFrame with the columns `percent` and `per_day` added and
+        sorted by `duration`, as described in `parse_timestamps`.
+    """
 
-    # Ignore activities with duration greater than max_time
-    time_table.mask(time_table['duration'] > max_time, inplace=True)
+    import numpy as np
+    import pandas as pd
 
-    # Create a table of total durations for each activity
-    durations = time_table.groupby(['activity']).sum()
+    # There are only a few activities, so there's nothing to gain from keeping
+    # them categorical, and a plain index is simpler to work with
+    if isinstance(durations.index.dtype, pd.CategoricalDtype):
+        durations.index = durations.index.astype(object)
 
     # Calculate the percentage of time spent on each activity
     durations['percent'] = durations['duration'] / durations['duration'].sum()
@@ -259,9 +496,12 @@ def parse_timestamps(time_table: pd.DataFrame, max_time=timedelta(hours=12)) ->
 
     # Remove the microseconds on the activities, because they add clutter to
     # the screen.
-    # TODO I don't think this is working right now
-    durations['per_day'] = durations['per_day'].apply(
-        lambda td: td - timedelta(microseconds=td.microseconds))
+    # TODO I don't think this is working right now, the nanoseconds are left
+    per_day = durations['per_day'].to_numpy(dtype='timedelta64[ns]')
+    nanoseconds = per_day.view(np.int64)
+    durations['per_day'] = np.where(
+        np.isnat(per_day), per_day,
+        (nanoseconds - (nanoseconds // 1000 % 10**6) * 1000).view('timedelta64[ns]'))
 
     # Sort so that the activities with the greatest time spent come first
     durations.sort_values(by=['duration'], ascending=False, inplace=True)
@@ -336,9 +576,9 @@ def parse_time_duration(txt: str) -> timedelta:
 
 def timelog_entry_point():
     """
-    The entry point used for the `timelog` command. This method is referenced
-    in `setup.py` so that when the package is built, the `timelog` script is
-    built and it links to this method.
+    Runs the `timelog` command in this process. The `timelog` script built
+    from `setup.py` calls this through `client.client_entry_point` when the
+    timelog daemon isn't running.
     """
     from .. import master_config
 
@@ -351,7 +591,8 @@ def timelog_entry_point():
         # TODO use a context manager for DatabaseWrapper so the db gets closed
         # properly
         take_args(master_config.time_management,
-                  DatabaseWrapper(master_config.data_folder.joinpath('dailydata.db')))
+                  DatabaseWrapper(master_config.data_folder.joinpath('dailydata.db'),
+                                  master_config.database))
 
 
 if __name__ == '__main__':
@@ -1 +1,9 @@
-from .journaller import Journaller
+def __getattr__(name):
+    # Journaller imports the modules used to ask questions and write journals,
+    # which aren't needed just to load the configuration
+    if name == 'Journaller':
+        from .journaller import Journaller
+        return Journaller
+
+    raise AttributeError(
+        'module {!r} has no attribute {!r}'.format(__name__, name))
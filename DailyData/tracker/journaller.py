@@ -16,7 +16,7 @@ from pathlib import Path as PathObject
 from sys import argv
 
 import ConsoleQuestionPrompts as questions
-from DailyData.analyzer import parse_docx
+from DailyData.analyzer import journal_format
 
 from .. import tracker
 
@@ -204,14 +204,18 @@ class Journaller:
         # Return the user's responses
         return entry
 
-    def open_journal(self, date: date, create_file=parse_docx.new_doc, header_func=parse_docx.add_header):
+    def open_journal(self, date: date, create_file=None, header_func=None):
         """
         Open the user's desired journal program
 
         Arguments
 
-            date    The current date so to open the corresponding journal file for
-                    the month
+            date        The current date so to open the corresponding journal file for
+                        the month
+            create_file Optional; the function to create a new journal with. By
+                        default, chosen by the journal's suffix and contents
+            header_func Optional; the function to add a header to the journal
+                        with. By default, chosen by the journal's suffix and contents
 
         Returns
 
@@ -223,6 +227,10 @@ class Journaller:
         journal_path = self.cfg.journal_folder.joinpath(
             date.strftime('%Y-%m') + self.cfg.journal_suffix)
 
+        writer = journal_format(journal_path)
+        create_file = create_file or writer.new_doc
+        header_func = header_func or writer.add_header
+
         # Create the file if it does not exist
         self.cfg.journal_folder.mkdir(
             parents=True, exist_ok=True)
@@ -1,6 +1,9 @@
 import sqlite3
 import json
 import random
+from pathlib import Path
+
+from DailyData.io.db import DatabaseWrapper
 
 
 def get_activities(con: sqlite3.Connection):
@@ -10,7 +13,9 @@ def get_activities(con: sqlite3.Connection):
         json.dump({row[0]: "" for row in fetch}, json_file)
 
 
-def scramble_activities(con: sqlite3.Connection):
+def scramble_activities(db: DatabaseWrapper):
+    con = db.db
+
     acts = ['petting_doge', 'global_thermonuclear_warfare', 'commiting_mild_treason',
             'eating_one_peanut', 'dancing_the_night_away', 'sleeping', 'writing_buggy_code', 'speedwalking']
 
@@ -18,18 +23,23 @@ def scramble_activities(con: sqlite3.Connection):
     con.executemany(
         'INSERT INTO activity (name) VALUES (:act)', ((i,) for i in acts))
 
+    act_ids = [row[0] for row in con.execute('SELECT id FROM activity')]
+
     ids = map(lambda row: row[0], con.execute(
         'SELECT id FROM timelog').fetchall())
 
-    for id in ids:
-        con.execute('UPDATE timelog SET activity=:new_act WHERE id=:id', {
-            'new_act': random.choice(acts),
-            'id': id
-        })
+    con.executemany('UPDATE timelog SET activity_id=:new_act WHERE id=:id', ({
+        'new_act': random.choice(act_ids),
+        'id': id
+    } for id in ids))
+
+    # The per-day summary is kept by activity, so it would still have the
+    # totals of the old activities
+    db.rebuild_summary()
 
 
 if __name__ == '__main__':
-    with sqlite3.connect('./tests/sample.db') as con:
-        scramble_activities(con)
+    db = DatabaseWrapper(Path('./tests/sample.db'))
 
-        con.commit()
+    with db.db:
+        scramble_activities(db)
@@ -0,0 +1,100 @@
+"""
+Measures the throughput of several processes recording activities in the same
+database at once, and fails if any activity is lost or any process fails.
+
+Each process records its activities one at a time with
+`DatabaseWrapper.record_time`, each in its own transaction, as separate
+`timelog doing` commands would. The times recorded by each process are
+interleaved with those of the others, so every process also updates the
+summary around the others' records.
+
+Run from the root of the repository:
+
+    python benchmarks/concurrent_writers.py [--workers N] [--events N]
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dateutil import tz  # noqa: E402
+
+from DailyData.io.config import DatabaseConfig  # noqa: E402
+from DailyData.io.db import DatabaseWrapper  # noqa: E402
+
+START = datetime(2021, 1, 1, tzinfo=tz.UTC)
+
+
+def record(path: Path, config: DatabaseConfig, worker: int, workers: int, events: int):
+    """
+    Records `events` activities, interleaved in time with those recorded by
+    the other workers.
+    """
+
+    db = DatabaseWrapper(path, config)
+
+    for i in range(events):
+        time = START + timedelta(minutes=15) * (i * workers + worker)
+        db.record_time(['foo', 'bar'][(i + worker) % 2], 'user{}'.format(worker), time)
+
+    db.db.close()
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=8,
+                        help='The number of processes recording at once')
+    parser.add_argument('--events', type=int, default=500,
+                        help='The number of activities each process records')
+    parser.add_argument('--journal-mode', default=DatabaseConfig.journal_mode,
+                        help='The journal mode to open the database in')
+    parser.add_argument('--synchronous', default=DatabaseConfig.synchronous,
+                        help='How often SQLite syncs the database to disk')
+    args = parser.parse_args(argv)
+
+    config = DatabaseConfig(journal_mode=args.journal_mode,
+                            synchronous=args.synchronous)
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = Path(folder).joinpath('dailydata.db')
+
+        db = DatabaseWrapper(path, config)
+        db.new_activity('foo')
+        db.new_activity('bar')
+
+        processes = [multiprocessing.Process(target=record,
+                                             args=(path, config, worker, args.workers, args.events))
+                     for worker in range(args.workers)]
+
+        start = time.perf_counter()
+
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        seconds = time.perf_counter() - start
+
+        recorded = db.db.execute('SELECT COUNT(*) FROM timelog').fetchone()[0]
+        db.db.close()
+
+    expected = args.workers * args.events
+    failed = sum(process.exitcode != 0 for process in processes)
+
+    print('{} workers recorded {} of {} activities in {:.2f} s ({:.0f} activities/s, {} failed workers)'.format(
+        args.workers, recorded, expected, seconds, recorded / seconds, failed))
+
+    return {'workers': args.workers, 'events': expected, 'recorded': recorded,
+            'failed_workers': failed, 'seconds': seconds,
+            'events_per_second': recorded / seconds,
+            'ok': recorded == expected and failed == 0}
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main()['ok'] else 1)
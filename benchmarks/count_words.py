@@ -0,0 +1,81 @@
+"""
+Measures the throughput of `compile_journal.count_words` on a synthetic
+journal corpus of several megabytes.
+
+The corpus is generated deterministically, with word frequencies following
+Zipf's law like real text, so that results are comparable between runs. The
+benchmark fails if counting takes longer than the target.
+
+Run from the root of the repository:
+
+    python benchmarks/count_words.py [--megabytes MB] [--target S]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+TARGET_SECONDS = 5
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from DailyData.analyzer.compile_journal import count_words  # noqa: E402
+
+
+def synthetic_corpus(megabytes: float, vocabulary: int = 50000, seed: int = 0):
+    """
+    Returns a list of journal entries adding up to about `megabytes` of text,
+    using `vocabulary` different words.
+    """
+
+    rand = random.Random(seed)
+
+    words = ['w{}'.format(i) for i in range(vocabulary)]
+    weights = [1 / rank for rank in range(1, vocabulary + 1)]
+
+    entries = []
+    size = 0
+
+    while size < megabytes * 1e6:
+        entry = ' '.join(rand.choices(words, weights, k=rand.randint(50, 500)))
+        entries.append(entry)
+        size += len(entry)
+
+    return entries
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--megabytes', type=float, default=5,
+                        help='The size of the corpus in megabytes')
+    parser.add_argument('--vocabulary', type=int, default=50000,
+                        help='The number of different words in the corpus')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='The number of times to count the corpus')
+    parser.add_argument('--target', type=float, default=TARGET_SECONDS,
+                        help='The target for the fastest run in seconds')
+    args = parser.parse_args(argv)
+
+    corpus = synthetic_corpus(args.megabytes, args.vocabulary)
+    megabytes = sum(len(entry) for entry in corpus) / 1e6
+
+    times = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        order, counts = count_words(corpus)
+        times.append(time.perf_counter() - start)
+
+    best = min(times)
+
+    print('count_words: {:.1f} MB, {} entries, {} distinct words in {:.3f} s ({:.1f} MB/s, target {:.1f} s)'.format(
+        megabytes, len(corpus), len(order), best, megabytes / best, args.target))
+
+    return {'megabytes': megabytes, 'entries': len(corpus), 'distinct_words': len(order),
+            'seconds': best, 'megabytes_per_second': megabytes / best,
+            'target_seconds': args.target, 'ok': best <= args.target}
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main()['ok'] else 1)
@@ -0,0 +1,119 @@
+"""
+Measures the latency of `timelog doing` when it is forwarded to the timelog
+daemon, and fails if the median is over the target.
+
+The daemon is started in a fresh process against a scratch data folder. Each
+request is timed from sending the arguments over the socket to receiving what
+the command printed, which is what the daemon saves compared to running the
+command directly. The latency of the whole `timelog` client process, which
+also has to start the interpreter, is printed for comparison with
+`record_latency.py`.
+
+Run from the root of the repository:
+
+    python benchmarks/daemon_latency.py [--target MS] [--runs N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+TARGET_MS = 10
+
+ROOT = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(ROOT))
+
+from DailyData.time_management.client import SOCKET_ENV, forward  # noqa: E402
+
+
+def forwarded(path: Path, *argv: str) -> float:
+    """
+    Sends the arguments to the daemon listening at `path`, and returns how
+    long it took to respond in milliseconds.
+    """
+
+    start = time.perf_counter()
+    response = forward(argv, path)
+    latency = (time.perf_counter() - start) * 1000
+
+    if response is None or response['status']:
+        raise RuntimeError('timelog {} failed: {}'.format(' '.join(argv), response))
+
+    return latency
+
+
+def client_process(folder: Path, env, *argv: str) -> float:
+    """
+    Runs the timelog client in a new process, and returns how long it took in
+    milliseconds.
+    """
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'DailyData.time_management', *argv],
+                   cwd=str(folder), env=env, stdout=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--target', type=float, default=TARGET_MS,
+                        help='The median latency target in milliseconds')
+    parser.add_argument('--runs', type=int, default=100,
+                        help='The number of activities to record')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as folder:
+        folder = Path(folder)
+        path = folder.joinpath('timelog.sock')
+
+        # Use a configuration in the working directory, so that the user's
+        # configuration and data aren't touched
+        with open(folder.joinpath('config.json'), mode='w') as cfg:
+            json.dump({'configured': True, 'data_folder': str(folder)}, cfg)
+
+        env = dict(os.environ, PYTHONPATH=str(ROOT), **{SOCKET_ENV: str(path)})
+
+        daemon = subprocess.Popen([sys.executable, '-m', 'DailyData.time_management.daemon'],
+                                  cwd=str(folder), env=env, stdout=subprocess.DEVNULL)
+
+        try:
+            deadline = time.monotonic() + 30
+            while forward(['--help'], path) is None:
+                if daemon.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError('The timelog daemon did not start')
+
+                time.sleep(0.05)
+
+            forwarded(path, 'doing', 'foo', '--new')
+            forwarded(path, 'doing', 'bar', '--new')
+
+            latencies = [forwarded(path, 'doing', ['foo', 'bar'][i % 2])
+                         for i in range(args.runs)]
+
+            processes = [client_process(folder, env, 'doing', ['foo', 'bar'][i % 2])
+                         for i in range(10)]
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+    median = statistics.median(latencies)
+
+    print('timelog doing (forwarded): median {:.2f} ms, min {:.2f} ms, max {:.2f} ms over {} runs (target {:.1f} ms)'.format(
+        median, min(latencies), max(latencies), len(latencies), args.target))
+    print('timelog doing (client process): median {:.1f} ms over {} runs'.format(
+        statistics.median(processes), len(processes)))
+
+    return {'median_ms': median, 'min_ms': min(latencies), 'max_ms': max(latencies),
+            'runs': len(latencies), 'client_process_median_ms': statistics.median(processes),
+            'target_ms': args.target, 'ok': median <= args.target}
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main()['ok'] else 1)
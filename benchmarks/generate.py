@@ -0,0 +1,270 @@
+"""
+Generates a deterministic synthetic history of recorded activities, for
+benchmarking the timelog with far more activities than `tests/real_data.sql`.
+
+The activities follow a Zipf-like distribution, including children and aliases
+of other activities, last from a few minutes to a few hours with the
+occasional gap of a day or more, and are recorded mostly in one timezone with
+daylight saving time, with trips to others. Any number of activities, from a
+thousand to a hundred million, can be generated in chunks, so that they never
+all have to be held in memory.
+
+The same seed always generates the same activities, which can be written to a
+database, or to a folder of monthly files for `TextIO`.
+
+Run from the root of the repository:
+
+    python benchmarks/generate.py EVENTS (--database PATH | --text FOLDER) [--seed N]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from DailyData.io.db import DatabaseWrapper, to_epoch_us  # noqa: E402
+from DailyData.io.text import TIME_FORMAT, format_time  # noqa: E402
+
+START = datetime(2000, 1, 1)
+
+# The name, parent, whether it is an alias of its parent, and relative
+# frequency of each activity. Parents come before their children.
+ACTIVITIES = [
+    ('sleep', None, None, 30),
+    ('work', None, None, 20),
+    ('eat', None, None, 12),
+    ('commute', None, None, 8),
+    ('read', None, None, 6),
+    ('exercise', None, None, 4),
+    ('cook', None, None, 4),
+    ('clean', None, None, 3),
+    ('shop', None, None, 2),
+    ('study', None, None, 2),
+    ('meeting', 'work', False, 6),
+    ('email', 'work', False, 5),
+    ('programming', 'work', False, 5),
+    ('nap', 'sleep', True, 2),
+    ('zzz', 'sleep', True, 1),
+    ('lunch', 'eat', True, 3),
+    ('gym', 'exercise', True, 1),
+    ('running', 'exercise', False, 1),
+]
+
+# The timezone activities are usually recorded in, and the timezones of trips
+# away, which each last a week
+HOME = 'America/Los_Angeles'
+TRIPS = ['America/New_York', 'America/Denver', 'Europe/London', 'Asia/Tokyo', 'UTC']
+TRIP_PROBABILITY = 0.08
+
+WEEK_US = 7 * 24 * 60 * 60 * 10**6
+
+# The average time between activities, and the longest history to generate,
+# which keeps every time within the range of pandas timestamps. The time
+# between activities is shortened to fit very many activities in.
+MEAN_GAP_US = 30 * 60 * 10**6
+MAX_SPAN_US = 100 * 365 * 24 * 60 * 60 * 10**6
+
+# How often the user stops recording for a while, and for how much longer
+LONG_GAP_PROBABILITY = 0.01
+LONG_GAP_FACTOR = 40
+
+
+def recorded_as() -> Dict[str, str]:
+    """
+    Returns the activity each activity is recorded as, which is the parent of
+    an alias, and the activity itself otherwise.
+    """
+
+    recorded = dict()
+
+    for name, parent, is_alias, _ in ACTIVITIES:
+        recorded[name] = recorded[parent] if is_alias else name
+
+    return recorded
+
+
+def generate_events(events: int, seed: int = 0, chunk_size: int = 10**6) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Generates `events` activities in chronological order.
+
+    Yields:
+        Dictionaries of arrays of up to `chunk_size` activities, with the
+        UTC time each activity was recorded in microseconds since the epoch
+        (`time`), the UTC offset (`timezone_offset`) and name
+        (`timezone_name`) of the timezone it was recorded in, the position of
+        the activity in `ACTIVITIES` (`activity`), and whether it was
+        backdated (`backdated`).
+    """
+
+    rand = np.random.default_rng(seed)
+
+    weights = np.array([weight for *_, weight in ACTIVITIES], dtype=float)
+    weights /= weights.sum()
+
+    # Scale the gaps so that their mean, including long gaps, fits the span
+    mean_gap = min(MEAN_GAP_US, MAX_SPAN_US // max(events, 1))
+    gap_scale = mean_gap / (1 + LONG_GAP_PROBABILITY * (LONG_GAP_FACTOR - 1))
+
+    start = to_epoch_us(START)
+
+    # Choose the timezone for every week up front, from its own generator, so
+    # that the same weeks are trips however the activities are chunked
+    weeks = MAX_SPAN_US // WEEK_US + 1
+    zones = np.array([HOME] + TRIPS, dtype=object)
+    week_zones = np.where(np.random.default_rng([seed, 1]).random(weeks) < TRIP_PROBABILITY,
+                          np.random.default_rng([seed, 2]).integers(1, len(zones), size=weeks), 0)
+
+    last = start
+
+    for first in range(0, events, chunk_size):
+        n = min(chunk_size, events - first)
+
+        gaps = rand.gamma(2, gap_scale / 2, size=n)
+        gaps[rand.random(n) < LONG_GAP_PROBABILITY] *= LONG_GAP_FACTOR
+        times = last + np.cumsum(np.maximum(gaps.astype(np.int64), 10**6))
+        last = times[-1]
+
+        offsets = np.zeros(n, dtype=np.int64)
+        names = np.empty(n, dtype=object)
+
+        zone_codes = week_zones[(times - start) // WEEK_US]
+
+        for code in np.unique(zone_codes):
+            in_zone = zone_codes == code
+            utc = pd.DatetimeIndex(times[in_zone] * 1000).tz_localize('UTC')
+            local = utc.tz_convert(zones[code])
+
+            zone_offsets = (local.tz_localize(None) - utc.tz_localize(None)) \
+                .to_numpy(dtype='timedelta64[s]').astype(np.int64)
+            offsets[in_zone] = zone_offsets
+
+            # There are only a couple of names in each timezone, for standard
+            # and daylight saving time, so look each up once
+            zone_names = np.empty(in_zone.sum(), dtype=object)
+            for offset in np.unique(zone_offsets):
+                with_offset = zone_offsets == offset
+                zone_names[with_offset] = local[np.argmax(with_offset)].tzname()
+            names[in_zone] = zone_names
+
+        yield {
+            'time': times,
+            'timezone_offset': offsets,
+            'timezone_name': names,
+            'activity': rand.choice(len(ACTIVITIES), size=n, p=weights),
+            'backdated': rand.random(n) < 0.05,
+        }
+
+
+def write_database(path: Path, events: int, seed: int = 0, chunk_size: int = 10**6) -> DatabaseWrapper:
+    """
+    Writes `events` generated activities to a new database at `path`, as if
+    they had been recorded by `timelog doing`, and returns it.
+    """
+
+    db = DatabaseWrapper(path)
+
+    for name, parent, is_alias, _ in ACTIVITIES:
+        db.new_activity(name, parent, is_alias)
+
+    ids = {row['name']: row['id'] for row in db.db.execute('SELECT id, name FROM activity')}
+    recorded = recorded_as()
+    activity_ids = np.array([ids[recorded[name]] for name, *_ in ACTIVITIES])
+
+    db.new_user('default_usr')
+    user_id = db.db.execute('SELECT id FROM user').fetchone()['id']
+
+    with db.db:
+        for chunk in generate_events(events, seed, chunk_size):
+            db.db.executemany(
+                '''INSERT INTO timelog (time, timezone_offset, timezone_name, activity_id, user_id, backdated)
+                VALUES (?, ?, ?, ?, ?, ?)''',
+                zip(chunk['time'].tolist(), chunk['timezone_offset'].tolist(), chunk['timezone_name'],
+                    activity_ids[chunk['activity']].tolist(), [user_id] * len(chunk['time']),
+                    chunk['backdated'].tolist()))
+
+    db.rebuild_summary()
+
+    return db
+
+
+def format_offset(seconds: int) -> str:
+    """
+    Formats a UTC offset in seconds the way `datetime.isoformat` does.
+    """
+
+    return format_time(datetime(2000, 1, 1, tzinfo=timezone(timedelta(seconds=int(seconds)))))[-6:]
+
+
+def write_text(folder: Path, events: int, seed: int = 0, chunk_size: int = 10**6):
+    """
+    Writes `events` generated activities to a file for each month in `folder`,
+    in local time with their UTC offset, as `TextIO.record_time` would.
+    """
+
+    recorded = recorded_as()
+
+    # TextIO has no parents or aliases, so only the activities they are
+    # recorded as are listed
+    listed = [name for name, *_ in ACTIVITIES if recorded[name] == name]
+    names = np.array([recorded[name] for name, *_ in ACTIVITIES], dtype=object)
+
+    with open(folder.joinpath('list.txt'), mode='w') as act_list:
+        act_list.write('\n'.join(listed) + '\n')
+
+    for chunk in generate_events(events, seed, chunk_size):
+        local = (chunk['time'] + chunk['timezone_offset'] * 10**6).view('datetime64[us]')
+        times = pd.Index(pd.DatetimeIndex(local).strftime(TIME_FORMAT), dtype=object)
+        months = times.str[:7]
+
+        # Format each of the few different offsets once, as `format_time` does
+        offsets = pd.Series(chunk['timezone_offset'])
+        offset_text = offsets.map({offset: format_offset(offset) for offset in offsets.unique()})
+        times = times + offset_text.to_numpy(dtype=object)
+
+        lines = pd.Series(names[chunk['activity']] + ',' + np.asarray(times, dtype=object) + ',\n')
+
+        for month, month_lines in lines.groupby(np.asarray(months), sort=False):
+            with open(folder.joinpath(month + '.csv'), mode='a') as file:
+                file.write(''.join(month_lines))
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('events', type=int,
+                        help='The number of activities to generate')
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument('--database', type=Path,
+                        help='The database to write the activities to, which must not exist')
+    output.add_argument('--text', type=Path,
+                        help='The folder to write monthly activity files to')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='The seed to generate activities from')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+
+    if args.database is not None:
+        if args.database.exists():
+            parser.error('{} already exists'.format(args.database))
+
+        write_database(args.database, args.events, args.seed).db.close()
+    else:
+        args.text.mkdir(parents=True, exist_ok=True)
+        write_text(args.text, args.events, args.seed)
+
+    seconds = time.perf_counter() - start
+
+    print('Generated {} activities in {:.1f} s'.format(args.events, seconds))
+
+    return {'events': args.events, 'seconds': seconds, 'ok': True}
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main()['ok'] else 1)
@@ -0,0 +1,81 @@
+"""
+Measures the cold-start import time of the `timelog` command using the
+import times reported by `python -X importtime`, and fails if it is over
+budget.
+
+Run from the root of the repository:
+
+    python benchmarks/import_time.py [--budget MS] [--runs N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# The module imported by the `timelog` console script
+MODULE = 'DailyData.time_management.timelog'
+
+# Modules that take a long time to import, and should not be imported just to
+# record an activity
+HEAVY_MODULES = ['pandas', 'numpy', 'docx', 'ConsoleQuestionPrompts']
+
+BUDGET_MS = 200
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def import_times(module: str = MODULE):
+    """
+    Imports `module` in a new interpreter and returns a dictionary mapping the
+    name of each module that was imported to its cumulative import time in
+    microseconds.
+    """
+
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+                            env=env, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+
+    times = dict()
+
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--budget', type=float, default=BUDGET_MS,
+                        help='The import time budget in milliseconds')
+    parser.add_argument('--runs', type=int, default=5,
+                        help='The number of times to import, the fastest is kept')
+    args = parser.parse_args(argv)
+
+    runs = [import_times() for _ in range(args.runs)]
+    best = min(runs, key=lambda times: times[MODULE])
+
+    print('Slowest imports:')
+    for name, cumulative in sorted(best.items(), key=lambda item: item[1], reverse=True)[:10]:
+        print('  {:>8.1f} ms  {}'.format(cumulative / 1000, name))
+
+    total_ms = best[MODULE] / 1000
+    heavy = [name for name in HEAVY_MODULES if name in best]
+
+    print('import {}: {:.1f} ms (budget {:.1f} ms)'.format(
+        MODULE, total_ms, args.budget))
+
+    if heavy:
+        print('Heavy modules imported: {}'.format(', '.join(heavy)))
+
+    return {'module': MODULE, 'import_ms': total_ms, 'budget_ms': args.budget,
+            'heavy_modules': heavy, 'ok': total_ms <= args.budget and not heavy}
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main()['ok'] else 1)
@@ -0,0 +1,139 @@
+"""
+Measures the throughput of reading journal entries from Markdown journals
+with `parse_md.iter_entries`, against docx journals with
+`parse_docx.iter_entries`, on the same synthetic corpus.
+
+The corpus is generated as in `count_words.py`, split into entries of a few
+paragraphs each under a heading of its date, and written as one journal of
+each format. The benchmark fails if the two parsers read different entries,
+or if reading the Markdown journal takes longer than the target.
+
+Run from the root of the repository:
+
+    python benchmarks/parse_journals.py [--megabytes MB] [--target S]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+TARGET_SECONDS = 1
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from count_words import synthetic_corpus  # noqa: E402
+from DailyData.analyzer import parse_docx, parse_md  # noqa: E402
+
+
+def journal_entries(megabytes: float, seed: int = 0):
+    """
+    Returns a list of tuples of the date and the paragraphs of each entry of
+    a journal of about `megabytes` of text.
+    """
+
+    rand = random.Random(seed)
+    start = date(2000, 1, 1)
+
+    entries = []
+
+    for day, text in enumerate(synthetic_corpus(megabytes, seed=seed)):
+        words = text.split(' ')
+        breaks = sorted(rand.sample(range(1, len(words)), k=min(3, len(words) - 1)))
+
+        paragraphs = [' '.join(words[i:j]) for i, j in zip([0] + breaks, breaks + [len(words)])]
+        entries.append(((start + timedelta(days=day)).isoformat(), paragraphs))
+
+    return entries
+
+
+def write_markdown(path: Path, entries):
+    with open(path, mode='w') as file:
+        for heading, paragraphs in entries:
+            file.write('# {}\n\n{}\n\n'.format(heading, '\n'.join(paragraphs)))
+
+
+def write_docx(path: Path, entries):
+    from docx import Document
+
+    doc = Document()
+
+    for heading, paragraphs in entries:
+        doc.add_heading(heading, level=1)
+
+        for paragraph in paragraphs:
+            doc.add_paragraph(paragraph)
+
+    doc.save(path)
+
+
+def best_of(runs: int, parser, path: Path):
+    """
+    Parses the journal at `path` `runs` times, and returns the entries and the
+    fastest time in seconds.
+    """
+
+    times = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        entries = list(parser(path))
+        times.append(time.perf_counter() - start)
+
+    return entries, min(times)
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--megabytes', type=float, default=2,
+                        help='The size of the text of the journals in megabytes')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='The number of times to read each journal')
+    parser.add_argument('--target', type=float, default=TARGET_SECONDS,
+                        help='The target for the fastest read of the Markdown journal in seconds')
+    args = parser.parse_args(argv)
+
+    entries = journal_entries(args.megabytes)
+    megabytes = sum(len(p) for _, paragraphs in entries for p in paragraphs) / 1e6
+
+    results = dict()
+    parsed_entries = dict()
+
+    with tempfile.TemporaryDirectory() as folder:
+        md_path = Path(folder).joinpath('journal.md')
+        docx_path = Path(folder).joinpath('journal.docx')
+
+        write_markdown(md_path, entries)
+        write_docx(docx_path, entries)
+
+        for name, read, path in [('markdown', parse_md.iter_entries, md_path),
+                                 ('docx', parse_docx.iter_entries, docx_path)]:
+            parsed, seconds = best_of(args.runs, read, path)
+            results[name] = {'file_megabytes': path.stat().st_size / 1e6, 'seconds': seconds,
+                             'megabytes_per_second': megabytes / seconds,
+                             'entries_per_second': len(parsed) / seconds}
+            parsed_entries[name] = parsed
+
+    same = parsed_entries['markdown'] == parsed_entries['docx']
+
+    for name in ['markdown', 'docx']:
+        print('{:<8}: {:.1f} MB of text, {} entries in {:.3f} s ({:.1f} MB/s, {:.0f} entries/s)'.format(
+            name, megabytes, len(entries), results[name]['seconds'],
+            results[name]['megabytes_per_second'], results[name]['entries_per_second']))
+
+    print('Markdown is {:.1f}x the throughput of docx, target {:.1f} s{}'.format(
+        results['docx']['seconds'] / results['markdown']['seconds'], args.target,
+        '' if same else '; the parsers read different entries'))
+
+    return dict(results, megabytes=megabytes, entries=len(entries), same_entries=same,
+                target_seconds=args.target,
+                ok=same and results['markdown']['seconds'] <= args.target)
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main()['ok'] else 1)
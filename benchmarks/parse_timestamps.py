@@ -0,0 +1,84 @@
+"""
+Measures how `timelog.parse_timestamps` scales with the number of recorded
+activities, from a thousand to ten million, and fails if the largest takes
+longer than the target.
+
+The activities are generated deterministically, up to ten minutes apart (so
+that ten million of them still fit in the range of pandas timestamps), in the
+same form as `DatabaseWrapper.get_timestamps` returns them.
+
+Run from the root of the repository:
+
+    python benchmarks/parse_timestamps.py [--max-events N] [--target S]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from DailyData.time_management.timelog import parse_timestamps  # noqa: E402
+
+TARGET_SECONDS = 30
+
+ACTIVITIES = ['sleep', 'work', 'eat', 'read', 'exercise', 'commute',
+              'study', 'cook', 'clean', 'shop']
+
+
+def synthetic_timestamps(events: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Returns a DataFrame of `events` activities like `get_timestamps` does.
+    """
+
+    rand = np.random.default_rng(seed)
+
+    gaps = rand.integers(1, 10 * 60, size=events) * 10**9
+    times = np.datetime64('1970-01-01', 'ns') + np.cumsum(gaps)
+
+    codes = rand.integers(0, len(ACTIVITIES), size=events)
+
+    return pd.DataFrame({
+        'time': pd.DatetimeIndex(times).tz_localize('UTC'),
+        'activity': pd.Categorical.from_codes(codes, categories=ACTIVITIES)
+    })
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--max-events', type=int, default=10**7,
+                        help='The largest number of activities to parse')
+    parser.add_argument('--target', type=float, default=TARGET_SECONDS,
+                        help='The target for the largest number of activities in seconds')
+    args = parser.parse_args(argv)
+
+    results = []
+    events = 10**3
+
+    while events <= args.max_events:
+        time_table = synthetic_timestamps(events)
+
+        start = time.perf_counter()
+        parse_timestamps(time_table)
+        seconds = time.perf_counter() - start
+
+        print('parse_timestamps: {:>10} events in {:8.3f} s ({:.0f} events/s)'.format(
+            events, seconds, events / seconds))
+        results.append({'events': events, 'seconds': seconds})
+
+        events *= 10
+
+    largest = results[-1]['seconds']
+
+    print('Largest: {:.3f} s (target {:.1f} s)'.format(largest, args.target))
+
+    return {'results': results, 'target_seconds': args.target,
+            'ok': largest <= args.target}
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main()['ok'] else 1)
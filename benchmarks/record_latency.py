@@ -0,0 +1,126 @@
+"""
+Measures the end-to-end latency of `timelog doing`, from starting the
+interpreter to printing how long the last activity lasted, and fails if it
+takes longer than the floor by more than the target.
+
+Each run records an activity in a fresh process against a scratch data folder,
+exactly as the `timelog` console script would.
+
+Most of the latency is starting the interpreter and importing the standard
+library modules that recording an activity can't do without, which alone
+takes 60 to 80 ms on a fast machine, and more on a slow one. Rather than a
+fixed target, which fails on slow machines however little the command does,
+the floor is measured by starting the interpreter with just those
+modules, and the target is what the command may add to it: importing
+DailyData, reading the configuration, and recording the activity.
+
+Run from the root of the repository:
+
+    python benchmarks/record_latency.py [--target MS] [--runs N]
+"""
+
+import argparse
+import compileall
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# How much longer than the floor the median run may take
+TARGET_MS = 50
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# What the `timelog` console script installed by pip runs, which doesn't
+# import runpy the way `python -m` does
+CONSOLE_SCRIPT = '''import sys
+from DailyData.time_management.client import client_entry_point
+sys.exit(client_entry_point())
+'''
+
+# Starts the interpreter with the modules recording an activity needs, and
+# does nothing else but create an argument parser, which imports more of the
+# standard library on newer versions of Python
+FLOOR = '''import argparse, dataclasses, json, sqlite3
+from dateutil import tz
+argparse.ArgumentParser()
+'''
+
+
+def run(folder: Path, code: str, *argv: str) -> float:
+    """
+    Runs `code` in a new interpreter in `folder`, with `argv` as its
+    arguments, and returns how long it took in milliseconds.
+    """
+
+    # Never forward to a timelog daemon the user has running, so that their
+    # data isn't touched and the command runs directly
+    env = dict(os.environ, PYTHONPATH=str(ROOT),
+               DAILYDATA_TIMELOG_SOCKET=str(folder.joinpath('timelog.sock')))
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code, *argv],
+                   cwd=str(folder), env=env, stdout=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def timelog(folder: Path, *argv: str) -> float:
+    """
+    Runs the timelog command with the given arguments in `folder`, and returns
+    how long it took in milliseconds.
+    """
+
+    return run(folder, CONSOLE_SCRIPT, *argv)
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--target', type=float, default=TARGET_MS,
+                        help='The target for how much longer than the floor the median run takes, in milliseconds')
+    parser.add_argument('--runs', type=int, default=20,
+                        help='The number of activities to record')
+    args = parser.parse_args(argv)
+
+    # pip compiles the package when installing it, so that the command doesn't
+    # have to, which it otherwise would on every run if Python isn't allowed
+    # to write the bytecode itself
+    compileall.compile_dir(str(ROOT.joinpath('DailyData')), quiet=1)
+
+    with tempfile.TemporaryDirectory() as folder:
+        folder = Path(folder)
+
+        # Use a configuration in the working directory, so that the user's
+        # configuration and data aren't touched
+        with open(folder.joinpath('config.json'), mode='w') as cfg:
+            json.dump({'configured': True, 'data_folder': str(folder)}, cfg)
+
+        # Create the database and activities before timing anything
+        timelog(folder, 'doing', 'foo', '--new')
+        timelog(folder, 'doing', 'bar', '--new')
+
+        # Alternate with the floor, so that both see the machine equally busy
+        latencies, floors = [], []
+
+        for i in range(args.runs):
+            latencies.append(timelog(folder, 'doing', ['foo', 'bar'][i % 2]))
+            floors.append(run(folder, FLOOR))
+
+    median = statistics.median(latencies)
+    floor = statistics.median(floors)
+
+    print('timelog doing: median {:.1f} ms, min {:.1f} ms, max {:.1f} ms over {} runs'.format(
+        median, min(latencies), max(latencies), len(latencies)))
+    print('floor: median {:.1f} ms, timelog doing takes {:.1f} ms longer (target {:.1f} ms)'.format(
+        floor, median - floor, args.target))
+
+    return {'median_ms': median, 'min_ms': min(latencies), 'max_ms': max(latencies),
+            'floor_ms': floor, 'overhead_ms': median - floor, 'runs': len(latencies),
+            'target_ms': args.target, 'ok': median - floor <= args.target}
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main()['ok'] else 1)
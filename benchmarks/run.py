@@ -0,0 +1,233 @@
+"""
+Runs the benchmark suite for the timelog against generated histories of
+several sizes, and writes the results to a JSON file, so that they can be
+compared between commits.
+
+For each size, a database and a folder of monthly activity files are
+generated with `generate.py`, and the following are timed:
+
+- `record_time`: recording one activity after the last one, per call
+- `get_last_record`: looking up the activity before a random time, per call
+- `get_timestamps`: reading every activity from the database
+- `parse_timestamps`: totalling the time spent on each activity
+- `summary`: totalling it in the database, as `timelog summary` does
+- `time_series`: splitting it into days in the database
+- `text_get_timestamps`: reading every activity from the monthly files
+
+Each is run several times, and the fastest run is kept. Given the results of
+an earlier run with `--compare`, the benchmark fails if anything got slower
+by more than the tolerance.
+
+Run from the root of the repository:
+
+    python benchmarks/run.py [--sizes N [N ...]] [--output FILE] [--compare FILE]
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+from dateutil import tz
+
+ROOT = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from DailyData.io.db import from_epoch_us  # noqa: E402
+from DailyData.io.text import TextIO  # noqa: E402
+from DailyData.time_management import timelog  # noqa: E402
+from generate import write_database, write_text  # noqa: E402
+
+SIZES = [10**3, 10**4, 10**5]
+
+# How much slower than the compared results a benchmark can be before failing
+TOLERANCE = 1.25
+
+
+def best_of(runs: int, function) -> float:
+    """
+    Calls `function` `runs` times, and returns the fastest time in seconds.
+    """
+
+    times = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def median_per_call(calls, function) -> float:
+    """
+    Calls `function` with each of `calls`, and returns the median time per
+    call in seconds.
+    """
+
+    times = []
+
+    for args in calls:
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+
+def run_size(folder: Path, events: int, runs: int, calls: int, seed: int):
+    """
+    Generates `events` activities in `folder`, and returns the time taken by
+    each benchmark against them.
+    """
+
+    results = dict()
+
+    start = time.perf_counter()
+    db = write_database(folder.joinpath('dailydata.db'), events, seed)
+    results['generate_database'] = time.perf_counter() - start
+
+    text_folder = folder.joinpath('activities')
+    text_folder.mkdir()
+
+    start = time.perf_counter()
+    write_text(text_folder, events, seed)
+    results['generate_text'] = time.perf_counter() - start
+
+    first, last = [from_epoch_us(t) for t in db.db.execute(
+        'SELECT MIN(time), MAX(time) FROM timelog').fetchone()]
+
+    rand = random.Random(seed)
+    befores = [((first + (last - first) * rand.random()).replace(tzinfo=tz.UTC),)
+               for _ in range(calls)]
+    results['get_last_record'] = median_per_call(befores, db.get_last_record)
+
+    frame = db.get_timestamps(datetime.min, datetime.max)
+    results['get_timestamps'] = best_of(
+        runs, lambda: db.get_timestamps(datetime.min, datetime.max))
+    results['parse_timestamps'] = best_of(
+        runs, lambda: timelog.parse_timestamps(frame))
+    results['summary'] = best_of(runs, lambda: timelog.summarize_durations(
+        db.summarize(datetime.min, datetime.max)))
+    results['time_series'] = best_of(
+        runs, lambda: db.time_series(datetime.min, datetime.max))
+
+    text_io = TextIO(text_folder)
+    results['text_get_timestamps'] = best_of(
+        runs, lambda: text_io.get_timestamps(pd.Timestamp.min, pd.Timestamp.max))
+
+    # Record last, since it adds to the history
+    records = [('work', 'default_usr', (last + timedelta(minutes=i + 1)).replace(tzinfo=tz.UTC))
+               for i in range(calls)]
+    results['record_time'] = median_per_call(records, db.record_time)
+
+    db.db.close()
+
+    return results
+
+
+def git_commit() -> str:
+    """
+    Returns the commit the repository is at, or `None` if it can't be found.
+    """
+
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=str(ROOT), stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, universal_newlines=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, old_results, tolerance: float):
+    """
+    Prints how much faster or slower each benchmark is than in `old_results`,
+    and returns the benchmarks that are slower by more than `tolerance`.
+    """
+
+    old = {(r['benchmark'], r['events']): r['seconds'] for r in old_results}
+    regressions = []
+
+    for result in results:
+        key = (result['benchmark'], result['events'])
+
+        if key not in old or key[0].startswith('generate_'):
+            continue
+
+        ratio = result['seconds'] / old[key]
+        slower = ratio > tolerance
+
+        print('{:<20} {:>10} {:6.2f}x{}'.format(
+            key[0], key[1], ratio, '  SLOWER' if slower else ''))
+
+        if slower:
+            regressions.append(result)
+
+    return regressions
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+                        help='The numbers of activities to generate')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='The number of times to run each benchmark')
+    parser.add_argument('--calls', type=int, default=100,
+                        help='The number of calls to time for per-call benchmarks')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='The seed to generate activities from')
+    parser.add_argument('--output', type=Path, default=Path('benchmark-results.json'),
+                        help='The file to write the results to')
+    parser.add_argument('--compare', type=Path,
+                        help='The results of an earlier run to compare with')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help='How many times slower a benchmark can be than the compared results')
+    args = parser.parse_args(argv)
+
+    results = []
+
+    for events in args.sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            timings = run_size(Path(folder), events, args.runs, args.calls, args.seed)
+
+        for benchmark, seconds in timings.items():
+            print('{:<20} {:>10} {:12.6f} s'.format(benchmark, events, seconds))
+            results.append({'benchmark': benchmark, 'events': events, 'seconds': seconds})
+
+    report = {
+        'commit': git_commit(),
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'seed': args.seed,
+        'runs': args.runs,
+        'results': results,
+    }
+
+    with open(args.output, mode='w') as output:
+        json.dump(report, output, indent='\t')
+
+    print('Wrote results to {}'.format(args.output))
+
+    regressions = []
+    if args.compare is not None:
+        with open(args.compare) as old:
+            regressions = compare(results, json.load(old)['results'], args.tolerance)
+
+    return dict(report, regressions=regressions, ok=not regressions)
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main()['ok'] else 1)
@@ -0,0 +1,103 @@
+"""
+Measures how long `TextIO.get_timestamps` takes to read every monthly activity
+file in a folder covering more than ten years, and fails if it is over the
+target.
+
+The files are generated deterministically in a scratch folder, with about as
+many activities per day as a busy user would record, written the way
+`TextIO.record_time` writes them: in local time with a UTC offset, which
+changes with daylight saving time.
+
+Run from the root of the repository:
+
+    python benchmarks/text_io.py [--years N] [--per-day N] [--target S]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+from dateutil import tz
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from DailyData.io.text import TextIO, format_time, month_after  # noqa: E402
+
+TARGET_SECONDS = 5
+
+ZONE = tz.gettz('America/Los_Angeles')
+
+
+def write_months(folder: Path, years: int, per_day: int, seed: int = 0) -> int:
+    """
+    Writes a file of activities for each month of `years` years in the format
+    of TextIO, and returns how many activities were written.
+    """
+
+    rand = random.Random(seed)
+    activities = ['sleep', 'work', 'eat', 'read', 'exercise', 'commute']
+
+    with open(folder.joinpath('list.txt'), mode='w') as act_list:
+        act_list.write('\n'.join(activities) + '\n')
+
+    month = datetime(2010, 1, 1)
+    count = 0
+
+    for _ in range(years * 12):
+        end = month_after(month)
+        step = timedelta(days=1) / per_day
+        t = month
+
+        with open(folder.joinpath(month.strftime('%Y-%m') + '.csv'), mode='w') as file:
+            while t < end:
+                file.write(','.join([rand.choice(activities), format_time(t.replace(tzinfo=ZONE)), '\n']))
+                t += step * rand.uniform(0.5, 1.5)
+                count += 1
+
+        month = end
+
+    return count
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--years', type=int, default=12,
+                        help='The number of years of monthly files')
+    parser.add_argument('--per-day', type=int, default=30,
+                        help='The average number of activities per day')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='The number of times to read the files')
+    parser.add_argument('--target', type=float, default=TARGET_SECONDS,
+                        help='The target for the fastest run in seconds')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as folder:
+        folder = Path(folder)
+        count = write_months(folder, args.years, args.per_day)
+
+        text_io = TextIO(folder)
+
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            data = text_io.get_timestamps(pd.Timestamp.min, pd.Timestamp.max)
+            times.append(time.perf_counter() - start)
+
+    assert len(data) == count
+
+    best = min(times)
+
+    print('TextIO.get_timestamps: {} files, {} rows in {:.3f} s (target {:.1f} s)'.format(
+        args.years * 12, count, best, args.target))
+
+    return {'files': args.years * 12, 'rows': count, 'seconds': best,
+            'target_seconds': args.target, 'ok': best <= args.target}
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main()['ok'] else 1)
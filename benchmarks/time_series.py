@@ -0,0 +1,89 @@
+"""
+Measures how long `timelog.parse_time_series` takes to split years of recorded
+activities into days and weeks, and fails if it is over the target.
+
+The activities are generated deterministically, about fifty a day, in a
+timezone with daylight saving time, in the same form as
+`DatabaseWrapper.get_timestamps` returns them.
+
+Run from the root of the repository:
+
+    python benchmarks/time_series.py [--years N] [--target S]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from DailyData.time_management.timelog import parse_time_series  # noqa: E402
+
+TARGET_SECONDS = 0.5
+
+ACTIVITIES = ['sleep', 'work', 'eat', 'read', 'exercise', 'commute',
+              'study', 'cook', 'clean', 'shop']
+
+
+def synthetic_timestamps(years: float, per_day: int = 50, seed: int = 0) -> pd.DataFrame:
+    """
+    Returns a DataFrame of `years` of activities like `get_timestamps` does.
+    """
+
+    rand = np.random.default_rng(seed)
+
+    events = int(years * 365 * per_day)
+    mean_gap = 24 * 60 * 60 // per_day
+
+    gaps = rand.integers(1, 2 * mean_gap, size=events) * 10**9
+    times = np.datetime64('2000-01-01', 'ns') + np.cumsum(gaps)
+
+    codes = rand.integers(0, len(ACTIVITIES), size=events)
+
+    return pd.DataFrame({
+        'time': pd.DatetimeIndex(times).tz_localize('UTC').tz_convert('US/Pacific'),
+        'activity': pd.Categorical.from_codes(codes, categories=ACTIVITIES)
+    })
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--years', type=float, default=10,
+                        help='The number of years of activities to split')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='The number of times to split the activities')
+    parser.add_argument('--target', type=float, default=TARGET_SECONDS,
+                        help='The target for the slowest frequency in seconds')
+    args = parser.parse_args(argv)
+
+    time_table = synthetic_timestamps(args.years)
+
+    results = []
+
+    for freq in ['D', 'W']:
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            periods = parse_time_series(time_table, freq=freq)
+            times.append(time.perf_counter() - start)
+
+        best = min(times)
+
+        print('parse_time_series({!r}): {} events into {} periods in {:.3f} s'.format(
+            freq, len(time_table), len(periods), best))
+        results.append({'freq': freq, 'periods': len(periods), 'seconds': best})
+
+    slowest = max(result['seconds'] for result in results)
+
+    print('Slowest: {:.3f} s (target {:.1f} s)'.format(slowest, args.target))
+
+    return {'events': len(time_table), 'results': results, 'target_seconds': args.target,
+            'ok': slowest <= args.target}
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main()['ok'] else 1)
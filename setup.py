@@ -20,10 +20,11 @@ setup(
                       'python-docx', 'pandas', 'numpy'],
     entry_points={
         'console_scripts': [
-            'timelog=DailyData.time_management.timelog:timelog_entry_point',
+            'timelog=DailyData.time_management.client:client_entry_point',
+            'timelogd=DailyData.time_management.daemon:daemon_entry_point',
             'dailydata=DailyData.__main__:take_args'
         ]
     },
     include_package_data=True,
-    python_requires='>=3.6'
+    python_requires='>=3.7'
 )
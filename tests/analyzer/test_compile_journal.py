@@ -3,6 +3,158 @@ from DailyData.analyzer import compile_journal
 import unittest
 
 import json
+import os
+import tempfile
+from pathlib import Path
+
+from docx import Document
+
+
+class TestCountWords(unittest.TestCase):
+    def test_word_count(self):
+        lines = ['c c b b a a a a', 'b']
+
+        order, counts = compile_journal.count_words(lines)
+
+        self.assertSequenceEqual(order, ['a', 'b', 'c'])
+        self.assertDictEqual(counts, {'c': 2, 'b': 3, 'a': 4})
+
+    def test_single_line_word_count(self):
+        order, counts = compile_journal.count_words('a b c c d e')
+
+        self.assertEqual(order[0], 'c')
+        self.assertSetEqual(set(order), {'a', 'b', 'c', 'd', 'e'})
+
+    def test_ties_ordered_by_last_appearance(self):
+        order, counts = compile_journal.count_words(['a b c', 'b a'])
+
+        self.assertSequenceEqual(order, ['b', 'a', 'c'])
+
+    def test_no_lines(self):
+        self.assertEqual(compile_journal.count_words([]), ([], {}))
+
+
+class TestLoadJournalFolder(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp.name)
+
+        self.write_journal('2021-01', {'2021-01-01': 'New year', '2021-01-02': 'Another day'})
+        self.write_journal('2021-02', {'2021-02-01': 'February already'})
+        self.write_journal('2020-12', {'2020-12-31': 'The end of the year'})
+
+        # Not a monthly journal
+        Document().save(self.folder.joinpath('notes.docx'))
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def write_journal(self, month, entries):
+        doc = Document()
+
+        for heading, entry in entries.items():
+            doc.add_heading(heading, level=1)
+            doc.add_paragraph(entry)
+
+        doc.save(self.folder.joinpath(month + '.docx'))
+
+    def compile(self, journal_suffix='.docx', **kwargs):
+        outputs = []
+
+        compile_journal.load_journal_folder(
+            self.folder, journal_suffix=journal_suffix,
+            pd_output=lambda data, path: outputs.append((data, path)),
+            max_workers=2, **kwargs)
+
+        return outputs[0]
+
+    def test_compile(self):
+        data, path = self.compile()
+
+        self.assertEqual(path, self.folder.joinpath('output.xlsx'))
+        self.assertListEqual(list(data.columns), ['date', 'entry'])
+        self.assertListEqual(list(data['date'].dt.strftime('%Y-%m-%d')),
+                             ['2020-12-31', '2021-01-01', '2021-01-02', '2021-02-01'])
+        self.assertListEqual(list(data['entry']), [
+            'the end of the year', 'new year', 'another day', 'february already'])
+
+        with open(self.folder.joinpath('counts.json')) as file:
+            counts = json.load(file)
+
+        self.assertEqual(counts['year'], {'count': 2, 'include': False})
+
+    def test_same_as_one_journal(self):
+        outputs = []
+
+        compile_journal.load_journal_entries(
+            str(self.folder.joinpath('2021-01.docx')),
+            pd_output=lambda data, path: outputs.append(data))
+
+        data, _ = self.compile()
+
+        self.assertTrue(data[data['date'].dt.month == 1].reset_index(drop=True).equals(outputs[0]))
+
+    def test_cached(self):
+        self.compile()
+
+        cache_path = self.folder.joinpath('.parse_cache.json')
+
+        with open(cache_path) as file:
+            cache = json.load(file)
+
+        self.assertEqual(len(cache), 3)
+
+        # Change the cached entries, which are used as long as the journal is
+        # unchanged
+        key = str(self.folder.joinpath('2021-02.docx').resolve())
+        cache[key]['entries'] = [['2021-02-01', 'from the cache']]
+
+        with open(cache_path, mode='w') as file:
+            json.dump(cache, file)
+
+        data, _ = self.compile()
+
+        self.assertEqual(data['entry'].iloc[-1], 'from the cache')
+
+        # ...until the journal is changed
+        self.write_journal('2021-02', {'2021-02-01': 'February already', '2021-02-02': 'More'})
+
+        data, _ = self.compile()
+
+        self.assertListEqual(list(data['entry'].iloc[-2:]), ['february already', 'more'])
+
+    def test_markdown(self):
+        for month, text in [('2021-01', '# 2021-01-01\nNew Year\n'), ('2021-02', '# 2021-02-01\nFebruary\n')]:
+            self.folder.joinpath(month + '.md').write_text(text)
+
+        # The tracker writes Markdown journals by default
+        outputs = []
+        compile_journal.load_journal_folder(
+            self.folder, pd_output=lambda data, path: outputs.append(data))
+
+        self.assertListEqual(list(outputs[0]['entry']), ['new year', 'february'])
+
+        outputs = []
+        compile_journal.load_journal_entries(
+            str(self.folder.joinpath('2021-02.md')),
+            pd_output=lambda data, path: outputs.append(data))
+
+        self.assertListEqual(list(outputs[0]['entry']), ['february'])
+
+    def test_markdown_after_docx(self):
+        # Journals used to be written as docx files, even when named .md
+        Document(self.folder.joinpath('2021-01.docx')).save(self.folder.joinpath('2021-01.md'))
+        self.folder.joinpath('2021-02.md').write_text('# 2021-02-01\nFebruary\n')
+
+        data, _ = self.compile(journal_suffix='.md')
+
+        self.assertListEqual(list(data['entry']), ['new year', 'another day', 'february'])
+
+    def test_no_cache(self):
+        data, _ = self.compile(cache=None)
+
+        self.assertEqual(len(data), 4)
+        self.assertFalse(os.path.exists(self.folder.joinpath('.parse_cache.json')))
 
 
 # Disabled for now, because running it can't find test files, and creates other
@@ -1,6 +1,12 @@
+import tempfile
 import unittest
+import zipfile
+from pathlib import Path
 
 from DailyData.analyzer import parse_docx
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_BREAK
 
 # Disabled for now, because running it can't find test files, and creates other
 # random test files
@@ -22,5 +28,140 @@ class TestParseDocx():
             entry, 'Hello there\nGeneral Kenobi\nYou are a bold one')
 
 
+class TestIterEntries(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = Path(self.folder.name).joinpath('journal.docx')
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def assertSameEntries(self, doc, expected):
+        doc.save(self.path)
+
+        entries = list(parse_docx.iter_entries(self.path))
+
+        self.assertEqual(entries, expected)
+        self.assertEqual(entries, list(parse_docx.get_lines(self.path)))
+
+    def test_entries(self):
+        doc = Document()
+        doc.add_heading('That scene in the hangar', level=1)
+        doc.add_paragraph('Hello there')
+        doc.add_paragraph('General Kenobi')
+        doc.add_paragraph('You are a BOLD one')
+        doc.add_heading('Second Day', level=2)
+        doc.add_paragraph()
+
+        self.assertSameEntries(doc, [
+            ('That scene in the hangar', 'hello there\ngeneral kenobi\nyou are a bold one'),
+            ('Second Day', ''),
+        ])
+
+    def test_consecutive_headings(self):
+        doc = Document()
+        doc.add_heading('One', level=1)
+        doc.add_heading('Two', level=1)
+        doc.add_paragraph('text')
+
+        self.assertSameEntries(doc, [('One', ''), ('Two', 'text')])
+
+    def test_trailing_heading(self):
+        doc = Document()
+        doc.add_heading('One', level=1)
+        doc.add_paragraph('text')
+        doc.add_heading('Two', level=1)
+
+        self.assertSameEntries(doc, [('One', 'text')])
+
+    def test_run_text(self):
+        doc = Document()
+        doc.add_heading('One', level=1)
+
+        p = doc.add_paragraph('a\tb')
+        p.add_run().add_break()
+        p.add_run('c')
+        p.add_run().add_break(WD_BREAK.PAGE)
+        p.add_run('d')
+
+        self.assertSameEntries(doc, [('One', 'a\tb\ncd')])
+
+    def test_tables_left_out(self):
+        doc = Document()
+        doc.add_heading('One', level=1)
+        doc.add_paragraph('before')
+        doc.add_table(rows=1, cols=1).cell(0, 0).text = 'in a table'
+        doc.add_paragraph('after')
+
+        self.assertSameEntries(doc, [('One', 'before\nafter')])
+
+    def test_custom_styles(self):
+        doc = Document()
+        doc.styles.add_style('HeadingCustom', WD_STYLE_TYPE.PARAGRAPH)
+        doc.styles.add_style('Entry', WD_STYLE_TYPE.PARAGRAPH)
+
+        doc.add_paragraph('One', style='HeadingCustom')
+        doc.add_paragraph('text', style='Entry')
+        doc.add_paragraph('Two', style='Heading 3')
+        doc.add_paragraph('more', style='Title')
+
+        self.assertSameEntries(doc, [('One', 'text'), ('Two', 'more')])
+
+
+class TestAddHeader(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = Path(self.folder.name).joinpath('journal.docx')
+        self.expected_path = Path(self.folder.name).joinpath('expected.docx')
+
+        for path in (self.path, self.expected_path):
+            parse_docx.new_doc(path)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def add_header(self, header, entry=None):
+        parse_docx.add_header(self.path, header)
+        parse_docx._add_header_with_document(self.expected_path, header)
+
+        if entry is not None:
+            for path in (self.path, self.expected_path):
+                doc = Document(path)
+                doc.paragraphs[-1].add_run(entry)
+                doc.save(path)
+
+    def paragraphs(self, path):
+        return [(p.style.style_id, p.text) for p in Document(path).paragraphs]
+
+    def test_same_as_python_docx(self):
+        self.add_header('2021-01-01', 'Hello there')
+        self.add_header('2021-01-02', 'General Kenobi')
+        self.add_header('Fish & <chips>')
+
+        self.assertEqual(self.paragraphs(self.path), [
+            ('Heading1', '2021-01-01'), ('Normal', 'Hello there'),
+            ('Heading1', '2021-01-02'), ('Normal', 'General Kenobi'),
+            ('Heading1', 'Fish & <chips>'), ('Normal', ''),
+        ])
+        self.assertEqual(self.paragraphs(self.path), self.paragraphs(self.expected_path))
+
+        # The section properties are still at the end of the body
+        body = Document(self.path).element.body
+        self.assertTrue(body[-1].tag.endswith('sectPr'))
+
+    def test_other_parts_copied(self):
+        with zipfile.ZipFile(self.path) as docx:
+            before = {info.filename: docx.read(info) for info in docx.infolist()}
+
+        parse_docx.add_header(self.path, '2021-01-01')
+
+        with zipfile.ZipFile(self.path) as docx:
+            after = {info.filename: docx.read(info) for info in docx.infolist()}
+
+        self.assertEqual(list(before), list(after))
+        self.assertNotEqual(before.pop('word/document.xml'), after.pop('word/document.xml'))
+        self.assertEqual(before, after)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,115 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from DailyData.analyzer import journal_format, parse_docx, parse_md
+
+
+class TestAddHeader(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = Path(self.folder.name).joinpath('2021-01.md')
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_add_header(self):
+        parse_md.new_doc(self.path)
+        parse_md.add_header(self.path, '2021-01-01')
+
+        with open(self.path, mode='a') as file:
+            file.write('Hello there\nGeneral Kenobi')
+
+        parse_md.add_header(self.path, '2021-01-02')
+
+        self.assertEqual(self.path.read_text(),
+                         '# 2021-01-01\n\nHello there\nGeneral Kenobi\n# 2021-01-02\n\n')
+
+    def test_new_doc_exists(self):
+        parse_md.new_doc(self.path)
+
+        with self.assertRaises(FileExistsError):
+            parse_md.new_doc(self.path)
+
+
+class TestIterEntries(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = Path(self.folder.name).joinpath('2021-01.md')
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def entries(self, text):
+        self.path.write_bytes(text.encode('utf-8'))
+
+        return list(parse_md.iter_entries(self.path))
+
+    def test_entries(self):
+        parse_md.new_doc(self.path)
+        parse_md.add_header(self.path, '2021-01-01')
+
+        with open(self.path, mode='a') as file:
+            file.write('Hello There\n\nGeneral Kenobi\n')
+
+        parse_md.add_header(self.path, '2021-01-02')
+
+        self.assertEqual(list(parse_md.iter_entries(self.path)), [
+            ('2021-01-01', 'hello there\n\ngeneral kenobi'),
+            ('2021-01-02', ''),
+        ])
+
+    def test_headings(self):
+        self.assertEqual(self.entries(
+            'Before the first heading\n'
+            '# One\n'
+            'a\n'
+            '### Two ###\n'
+            '#hashtag\n'
+            '   # C#\n'
+            '#\n'
+            'b\n'), [('One', 'a'), ('Two', '#hashtag'), ('C#', ''), ('', 'b')])
+
+    def test_fenced_code(self):
+        self.assertEqual(self.entries(
+            '# One\n'
+            '```sh\n'
+            '# a comment\n'
+            '```\n'
+            '# Two\n'), [('One', '```sh\n# a comment\n```'), ('Two', '')])
+
+    def test_line_endings(self):
+        self.assertEqual(self.entries('\ufeff# One\r\nA\r\nB'), [('One', 'a\nb')])
+
+    def test_empty(self):
+        self.path.touch()
+
+        self.assertEqual(list(parse_md.iter_entries(self.path)), [])
+
+
+class TestJournalFormat(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = Path(self.folder.name).joinpath('2021-01.md')
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_by_suffix(self):
+        self.assertIs(journal_format(self.path), parse_md)
+        self.assertIs(journal_format(self.path.with_suffix('.txt')), parse_md)
+        self.assertIs(journal_format(self.path.with_suffix('.DOCX')), parse_docx)
+
+    def test_docx_named_md(self):
+        # Journals used to be written as docx files, even when named .md
+        parse_docx.new_doc(self.path)
+
+        journal = journal_format(self.path)
+        journal.add_header(self.path, '2021-01-01')
+
+        self.assertIs(journal, parse_docx)
+        self.assertEqual(list(journal.iter_entries(self.path)), [('2021-01-01', '')])
+
+
+if __name__ == '__main__':
+    unittest.main()
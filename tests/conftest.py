@@ -1,6 +1,8 @@
 import os
+import sqlite3
 
 import pytest
+from DailyData.io import migrations
 from DailyData.io.db import DatabaseWrapper
 from DailyData.time_management.config import TimeManagementConfig
 
@@ -12,6 +14,26 @@ with open(os.path.join(os.path.dirname(__file__), 'test_data.sql'), 'rb') as f:
     _test_data = f.read().decode('utf8')
 
 
+# The test data is written for the last schema version that saved times as text
+LEGACY_VERSION = 4
+
+
+def _legacy_data_db(script: str) -> DatabaseWrapper:
+    '''
+    Create a DatabaseWrapper with data written for an older schema, by loading
+    it into a database with that schema and then migrating it.
+    '''
+
+    legacy = sqlite3.connect(':memory:')
+    migrations.migrate(legacy, target=LEGACY_VERSION)
+    legacy.executescript(script)
+
+    wrapper = DatabaseWrapper.from_snapshot(legacy)
+    legacy.close()
+
+    return wrapper
+
+
 @pytest.fixture
 def test_config(tmp_path):
     cfg = TimeManagementConfig()
@@ -20,30 +42,53 @@ def test_config(tmp_path):
     return cfg
 
 
+@pytest.fixture(scope='session')
+def _real_data_template():
+    '''
+    The database copied for each test using `real_data_db`, which is only
+    loaded and migrated once.
+    '''
+
+    template = _legacy_data_db(_real_data)
+    yield template
+
+    template.db.close()
+
+
+@pytest.fixture(scope='session')
+def _staged_template():
+    '''
+    The database copied for each test using `staged_db`.
+    '''
+
+    template = _legacy_data_db(_test_data)
+    yield template
+
+    template.db.close()
+
+
 @pytest.fixture
-def real_data_db():
+def real_data_db(_real_data_template):
     '''
     Create a DatabaseWrapper initialized with mock real-world data.
 
-    Note: There are about 3000 rows in the timelog table, this may take
-    some time to set-up for each unit test.
+    There are about 3000 rows in the timelog table, so they are loaded once
+    and copied for each test.
     '''
 
-    wrapper = DatabaseWrapper()
-    wrapper.db.executescript(_real_data)
+    wrapper = _real_data_template.snapshot()
     yield wrapper
 
     wrapper.db.close()
 
 
 @pytest.fixture
-def staged_db():
+def staged_db(_staged_template):
     '''
     Create a DatabaseWrapper initialized with easy-to-use data for testing.
     '''
 
-    wrapper = DatabaseWrapper()
-    wrapper.db.executescript(_test_data)
+    wrapper = _staged_template.snapshot()
     yield wrapper
 
     wrapper.db.close()
@@ -0,0 +1,80 @@
+import multiprocessing
+from datetime import datetime, timedelta
+
+import pytest
+from DailyData.io.config import DatabaseConfig
+from DailyData.io.db import DatabaseWrapper
+from dateutil import tz
+
+START = datetime(2021, 1, 1, tzinfo=tz.UTC)
+
+
+def record(path, worker: int, workers: int, events: int):
+    """
+    Records `events` activities, interleaved in time with those recorded by
+    the other workers.
+    """
+
+    db = DatabaseWrapper(path)
+
+    for i in range(events):
+        # The gaps are long enough that the summary is split across days
+        time = START + timedelta(minutes=15) * (i * workers + worker)
+        db.record_time(['foo', 'bar'][(i + worker) % 2], 'user{}'.format(worker), time)
+
+    db.db.close()
+
+
+@pytest.mark.parametrize('workers, events', [(8, 100)])
+def test_concurrent_recorders(tmp_path, workers, events):
+    path = tmp_path.joinpath('dailydata.db')
+
+    db = DatabaseWrapper(path)
+    db.new_activity('foo')
+    db.new_activity('bar')
+
+    processes = [multiprocessing.Process(target=record, args=(path, worker, workers, events))
+                 for worker in range(workers)]
+
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert [process.exitcode for process in processes] == [0] * workers
+
+    # No activities were lost
+    assert db.db.execute('SELECT COUNT(*) FROM timelog').fetchone()[0] == workers * events
+    assert db.db.execute('SELECT COUNT(*) FROM user').fetchone()[0] == workers
+
+    # ...and the summary, which each recorder updated around its own records,
+    # is the same as one computed from all of them at once
+    query = 'SELECT * FROM activity_day_summary WHERE duration != 0 ORDER BY day, activity_id'
+    summary = [tuple(row) for row in db.db.execute(query)]
+
+    db.rebuild_summary()
+
+    assert summary == [tuple(row) for row in db.db.execute(query)]
+
+    db.db.close()
+
+
+def test_connection_settings(tmp_path):
+    config = DatabaseConfig(journal_mode='wal', synchronous='normal',
+                            busy_timeout=2.5, cache_size=-1024)
+    db = DatabaseWrapper(tmp_path.joinpath('dailydata.db'), config)
+
+    assert db.db.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert db.db.execute('PRAGMA synchronous').fetchone()[0] == 1
+    assert db.db.execute('PRAGMA cache_size').fetchone()[0] == -1024
+    assert config.busy_timeout == timedelta(seconds=2.5)
+
+    db.db.close()
+
+
+def test_unknown_settings():
+    with pytest.raises(ValueError):
+        DatabaseConfig(journal_mode='WAL; DROP TABLE timelog')
+
+    with pytest.raises(ValueError):
+        DatabaseConfig(synchronous='sometimes')
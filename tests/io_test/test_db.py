@@ -8,6 +8,8 @@ import dateutil
 import numpy as np
 import pandas as pd
 from DailyData.io import DatabaseWrapper, timelog_io
+from DailyData.io.db import SELECT_RECORD, convert_text_folder, from_epoch_us, to_epoch_us
+from DailyData.io.text import TextIO
 from dateutil import tz
 
 
@@ -54,6 +56,33 @@ class DBTests(unittest.TestCase):
             # TimelogIO
             self.db_wrapper.new_activity('hug_red_panda')
 
+    def test_add_alias_of_alias(self):
+        self.db_wrapper.new_activity('history')
+        self.db_wrapper.new_activity('hist', parent='history', is_alias=True)
+        self.db_wrapper.new_activity('h', parent='hist', is_alias=True)
+
+        self.assertEqual(
+            'history', self.db_wrapper.get_activity_or_parent('h'))
+
+        # Make sure the same is true when loading activities from the database
+        self.db_wrapper.clear_activity_cache()
+        self.assertEqual(
+            'history', self.db_wrapper.get_activity_or_parent('h'))
+
+    def test_activity_cache(self):
+        self.db_wrapper.new_activity('f', parent='foo', is_alias=True)
+
+        statements = []
+        self.db_wrapper.db.set_trace_callback(statements.append)
+
+        self.assertEqual('foo', self.db_wrapper.get_activity_or_parent('f'))
+        self.assertEqual('bar', self.db_wrapper.get_activity_or_parent('bar'))
+        self.assertIsNone(self.db_wrapper.get_activity_or_parent('baz'))
+
+        self.db_wrapper.db.set_trace_callback(None)
+
+        self.assertEqual([], statements)
+
     def test_add_timestamp(self):
         act = 'set_phasors_to_stun'
         user = 'spock'
@@ -65,16 +94,37 @@ class DBTests(unittest.TestCase):
 
         self.db_wrapper.record_time(act, user, time)
 
-        record = self.db_wrapper.db.execute('SELECT * FROM timelog').fetchone()
+        record = self.db_wrapper.db.execute(SELECT_RECORD).fetchone()
 
         self.assertEqual(1, self.db_wrapper.db.execute(
             'SELECT COUNT(*) FROM timelog').fetchone()[0])
         self.assertEqual(act, record['activity'])
-        self.assertEqual(time.replace(tzinfo=None), record['time'])
+        self.assertEqual(time.replace(tzinfo=None),
+                         from_epoch_us(record['time']))
         self.assertEqual(time.tzinfo.utcoffset(
             time).total_seconds(), record['timezone_offset'])
         self.assertEqual(False, record['backdated'])
 
+    def test_record_whole_second(self):
+        time = datetime(2021, 1, 1, 10, 59, tzinfo=tz.tzoffset('PST', -8 * 3600))
+
+        self.db_wrapper.record_time('foo', None, time)
+        last = self.db_wrapper.get_last_record(time + timedelta(minutes=1))
+
+        self.assertEqual(time, last.time)
+        self.assertEqual(time.utcoffset(), last.time.utcoffset())
+        self.assertEqual(timedelta(minutes=1), last.duration)
+
+    def test_record_new_user(self):
+        time = datetime.now(tz=tz.tzlocal())
+
+        self.db_wrapper.record_time('foo', 'nobody', time)
+        self.db_wrapper.record_time('bar', 'nobody', time)
+
+        self.assertEqual(['nobody'], [row['username'] for row in self.db_wrapper.db.execute(
+            'SELECT username FROM user')])
+        self.assertEqual('nobody', self.db_wrapper.get_last_record(time).user)
+
     def test_add_aliased_timestamp(self):
         self.db_wrapper.new_activity('f', parent='foo', is_alias=True)
 
@@ -83,7 +133,7 @@ class DBTests(unittest.TestCase):
         self.db_wrapper.record_time('f', 'bar', datetime.now(tz=tz.tzlocal()))
 
         self.assertEqual('foo', self.db_wrapper.db.execute(
-            'SELECT activity FROM timelog').fetchone()[0])
+            SELECT_RECORD).fetchone()['activity'])
 
     def test_preserve_timezone(self):
 
@@ -95,7 +145,7 @@ class DBTests(unittest.TestCase):
         row = self.db_wrapper.db.execute('SELECT * FROM timelog').fetchone()
 
         tz_inst = tz.tzoffset(row['timezone_name'], row['timezone_offset'])
-        fetched_date = row['time'].astimezone(tz_inst)
+        fetched_date = from_epoch_us(row['time']).astimezone(tz_inst)
 
         self.assertEqual(test_date.replace(tzinfo=None),
                          tz_inst.fromutc(fetched_date).replace(tzinfo=None))
@@ -119,7 +169,7 @@ class DBTests(unittest.TestCase):
         self.db_wrapper.update_last_record('bar')
 
         last_act_name = self.db_wrapper.db.execute(
-            'SELECT * FROM timelog').fetchone()['activity']
+            SELECT_RECORD).fetchone()['activity']
         row_count = self.db_wrapper.db.execute(
             'SELECT COUNT(*) FROM timelog').fetchone()[0]
 
@@ -134,9 +184,180 @@ class DBTests(unittest.TestCase):
         self.assertEqual(True, self.db_wrapper.db.execute(
             'SELECT backdated FROM timelog').fetchone()[0])
 
+    def test_record_many(self):
+        self.db_wrapper.new_activity('f', parent='foo', is_alias=True)
+
+        time = datetime(2021, 1, 1, microsecond=1, tzinfo=tz.UTC)
+
+        n_recorded = self.db_wrapper.record_many([
+            ('foo', 'bar', time),
+            ('f', 'bar', time + timedelta(minutes=5)),
+            ('bash', None, time + timedelta(minutes=10), True)
+        ])
+
+        rows = self.db_wrapper.db.execute(
+            SELECT_RECORD + 'ORDER BY time').fetchall()
+
+        self.assertEqual(3, n_recorded)
+        self.assertEqual(['foo', 'foo', 'bash'],
+                         [row['activity'] for row in rows])
+        self.assertEqual(time.replace(tzinfo=None),
+                         from_epoch_us(rows[0]['time']))
+        self.assertEqual([False, False, True],
+                         [row['backdated'] for row in rows])
+
+    def test_record_many_unknown_activity(self):
+        time = datetime.now(tz=tz.tzlocal())
+
+        with self.assertRaises(ValueError):
+            self.db_wrapper.record_many([
+                ('foo', None, time),
+                ('not_an_activity', None, time)
+            ])
+
+        # Nothing in the batch should be recorded
+        self.assertEqual(0, self.db_wrapper.db.execute(
+            'SELECT COUNT(*) FROM timelog').fetchone()[0])
+
+    def test_summary_kept_up_to_date(self):
+        time = datetime(2021, 1, 1, 23, microsecond=1, tzinfo=tz.UTC)
+
+        self.db_wrapper.record_time('foo', None, time)
+        self.db_wrapper.record_time('bar', None, time + timedelta(hours=2))
+        # Record before the last activity, and across midnight
+        self.db_wrapper.record_time('bash', None, time + timedelta(hours=1))
+        self.db_wrapper.record_time('foo', None, time + timedelta(hours=20))
+        self.db_wrapper.update_last_record('bash', search_by_id=True)
+        self.db_wrapper.record_many([
+            ('bar', None, time + timedelta(minutes=30)),
+            ('foo', None, time + timedelta(hours=21))
+        ])
+
+        def summary():
+            return self.db_wrapper.db.execute(
+                'SELECT * FROM activity_day_summary WHERE duration != 0 ORDER BY day, activity_id').fetchall()
+
+        incremental = summary()
+        self.db_wrapper.rebuild_summary()
+
+        self.assertEqual([tuple(row) for row in summary()],
+                         [tuple(row) for row in incremental])
+
+        durations = self.db_wrapper.summarize(time, time + timedelta(days=1))
+        self.assertEqual(timedelta(minutes=30), durations['duration']['foo'])
+        self.assertEqual(timedelta(minutes=30), durations['duration']['bar'])
+        self.assertEqual(timedelta(hours=2), durations['duration']['bash'])
+        self.assertEqual(3, len(durations))
+
     def tearDown(self) -> None:
         self.db_wrapper.db.close()
 
 
+def _query_plans(db: sqlite3.Connection, func, *args, **kwargs):
+    """
+    Call `func` and return the query plan of each SELECT and UPDATE statement
+    it executed on `db`.
+    """
+
+    statements = []
+    db.set_trace_callback(statements.append)
+
+    try:
+        func(*args, **kwargs)
+    finally:
+        db.set_trace_callback(None)
+
+    return {stmt: [row[-1] for row in db.execute('EXPLAIN QUERY PLAN ' + stmt)]
+            for stmt in statements
+            if stmt.lstrip().upper().startswith(('SELECT', 'UPDATE'))}
+
+
+def test_timelog_queries_use_indexes(real_data_db):
+    # Looking up records by id (`as_entered` and `search_by_id`) is left out on
+    # purpose, since those are served by the rowid rather than an index.
+    calls = [
+        (real_data_db.get_timestamps, datetime(2021, 1, 1), datetime(2021, 3, 1)),
+        (real_data_db.get_last_record, datetime(2021, 3, 1, tzinfo=tz.UTC)),
+        (real_data_db.update_last_record, 'foo'),
+        (real_data_db.summarize, datetime(2021, 1, 10, 5), datetime(2021, 3, 1)),
+    ]
+
+    for func, *args in calls:
+        for stmt, plan in _query_plans(real_data_db.db, func, *args).items():
+            if 'timelog' not in stmt:
+                continue
+
+            for detail in plan:
+                # Scanning the rows of a subquery is fine, since the subquery
+                # itself is checked
+                assert not (detail.startswith('SCAN') and 'USING' not in detail
+                            and 'subquery' not in detail), \
+                    'Full table scan in {}: {}'.format(func.__name__, stmt)
+                # ...as is grouping the results of a subquery
+                assert 'TEMP B-TREE' not in detail or 'GROUP BY' in detail, \
+                    'Unindexed sort in {}: {}'.format(func.__name__, stmt)
+
+
+def test_snapshot_is_independent(staged_db):
+    copy = staged_db.snapshot()
+
+    copy.new_activity('what_if')
+    copy.record_time('what_if', 'user1', datetime(2030, 1, 1, tzinfo=tz.UTC))
+
+    assert 'what_if' in copy.activities
+    assert 'what_if' not in staged_db.activities
+
+    count = 'SELECT COUNT(*) FROM timelog'
+    assert copy.db.execute(count).fetchone()[0] == \
+        staged_db.db.execute(count).fetchone()[0] + 1
+
+    copy.db.close()
+
+
+def test_snapshot_to_file(staged_db, tmp_path):
+    path = tmp_path.joinpath('copy.db')
+    staged_db.snapshot(path).db.close()
+
+    copy = DatabaseWrapper(path)
+
+    assert copy.activities == staged_db.activities
+    assert [tuple(row) for row in copy.db.execute('SELECT * FROM timelog ORDER BY id')] == \
+        [tuple(row) for row in staged_db.db.execute('SELECT * FROM timelog ORDER BY id')]
+
+    copy.db.close()
+
+
+
+def test_convert_text_folder(tmp_path):
+    text_io = TextIO(tmp_path.joinpath('activities'))
+    text_io.new_activity('foo')
+    text_io.new_activity('bar')
+
+    # A month with two UTC offsets, read as a column of datetimes
+    eastern = tz.tzoffset(None, timedelta(hours=-5))
+    eastern_dst = tz.tzoffset(None, timedelta(hours=-4))
+    times = [datetime(2021, 3, 13, 9, 0, tzinfo=eastern),
+             datetime(2021, 3, 14, 9, 0, tzinfo=eastern_dst),
+             datetime(2021, 4, 1, 9, 0, tzinfo=eastern_dst)]
+
+    for activity, time in zip(['foo', 'bar', 'foo'], times):
+        text_io.record_time(activity, None, time)
+
+    # A month written before times had a timezone
+    text_io.activity_folder.joinpath('2021-02.csv').write_text(
+        'bar,2021-02-01 09:30:00,\n')
+    times.insert(0, datetime(2021, 2, 1, 9, 30, tzinfo=tz.tzlocal()))
+
+    db = convert_text_folder(tmp_path)
+
+    recorded = [(row['activity'], row['time'])
+                for row in db.db.execute(SELECT_RECORD + 'ORDER BY time')]
+
+    assert recorded == [(activity, to_epoch_us(time))
+                        for activity, time in zip(['bar', 'foo', 'bar', 'foo'], times)]
+
+    db.db.close()
+
+
 if __name__ == '__main__':
     unittest.main(exit=False)
@@ -0,0 +1,147 @@
+import sqlite3
+from datetime import date, datetime
+from unittest.mock import patch
+
+import pytest
+from DailyData.io import migrations
+from DailyData.io.db import DatabaseWrapper, from_epoch_us
+
+# The schema created by schema.sql, before the migrations replaced it
+LEGACY_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS metadata (version TEXT);
+CREATE TABLE IF NOT EXISTS user (username TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS activity (
+    name TEXT PRIMARY KEY,
+    parent TEXT,
+    alias INT,
+    FOREIGN KEY (parent) REFERENCES activity (name)
+);
+CREATE TABLE IF NOT EXISTS timelog (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    time TIMESTAMP NOT NULL,
+    timezone_offset FLOAT,
+    timezone_name TEXT,
+    activity TEXT NOT NULL,
+    user TEXT,
+    backdated BOOLEAN,
+    FOREIGN KEY (user) REFERENCES user (username) FOREIGN KEY (activity) REFERENCES activity (name)
+);
+ALTER TABLE timelog
+ADD device_name TEXT;
+INSERT INTO metadata VALUES ('0.1');
+INSERT INTO activity VALUES ('foo', NULL, NULL), ('bar', NULL, NULL);
+INSERT INTO timelog VALUES
+    (1, '2021-01-01 10:00:00.000001+00:00', 0, 'UTC', 'foo', NULL, 0, NULL),
+    (2, '2021-01-01 11:30:00.000001+00:00', 0, 'UTC', 'bar', NULL, 0, NULL);
+'''
+
+
+def test_new_database_is_up_to_date():
+    wrapper = DatabaseWrapper()
+
+    assert migrations.schema_version(wrapper.db) == migrations.LATEST_VERSION
+
+
+def test_open_up_to_date_database(tmp_path):
+    path = tmp_path.joinpath('dailydata.db')
+    DatabaseWrapper(path).db.close()
+
+    with patch.object(DatabaseWrapper, 'run_schema') as run_schema:
+        wrapper = DatabaseWrapper(path)
+
+        run_schema.assert_not_called()
+
+    wrapper.db.close()
+
+
+def test_migrate_legacy_database(tmp_path):
+    path = tmp_path.joinpath('dailydata.db')
+
+    with sqlite3.connect(path) as legacy:
+        legacy.executescript(LEGACY_SCHEMA)
+    legacy.close()
+
+    wrapper = DatabaseWrapper(path)
+
+    assert migrations.schema_version(wrapper.db) == migrations.LATEST_VERSION
+
+    indexes = {row['name'] for row in wrapper.db.execute(
+        'SELECT name FROM sqlite_master WHERE type="index" AND tbl_name="timelog"')}
+    assert {'timelog_time_idx', 'timelog_user_time_idx',
+            'timelog_activity_idx'} <= indexes
+
+    # The times recorded before upgrading should be converted to integers
+    times = wrapper.db.execute(
+        'SELECT time, timezone_offset FROM timelog ORDER BY id').fetchall()
+    assert [(from_epoch_us(time), offset) for time, offset in times] == [
+        (datetime(2021, 1, 1, 10, 0, 0, 1), 0),
+        (datetime(2021, 1, 1, 11, 30, 0, 1), 0)]
+
+    # ...and summarized
+    summary = wrapper.db.execute(
+        '''SELECT day, name, duration
+        FROM activity_day_summary JOIN activity ON activity.id = activity_id''').fetchall()
+    assert [tuple(row) for row in summary] == [
+        ((date(2021, 1, 1) - date(1970, 1, 1)).days, 'foo', 90 * 60 * 10**6)]
+
+
+def test_migrate_names_to_ids(tmp_path):
+    path = tmp_path.joinpath('dailydata.db')
+
+    with sqlite3.connect(path) as legacy:
+        legacy.executescript(LEGACY_SCHEMA)
+        legacy.executescript('''
+        INSERT INTO activity VALUES ('f', 'foo', 1);
+        INSERT INTO user VALUES ('alice');
+        INSERT INTO timelog VALUES
+            (3, '2021-01-01 12:00:00.000001+00:00', NULL, NULL, 'baz', 'alice', 0, NULL),
+            (4, '2021-01-01 12:30:00.000001+00:00', NULL, NULL, 'foo', 'default_usr', 0, NULL);
+        ''')
+    legacy.close()
+
+    wrapper = DatabaseWrapper(path)
+
+    # Activities and users that were recorded without being added are added
+    assert wrapper.activities == {'foo': (None, False), 'bar': (None, False),
+                                  'f': ('foo', True), 'baz': (None, False)}
+    assert [row[0] for row in wrapper.db.execute(
+        'SELECT username FROM user ORDER BY id')] == ['alice', 'default_usr']
+
+    last = wrapper.get_last_record(datetime(2021, 1, 1, 13))
+    assert (last.name, last.user, last.id) == ('foo', 'default_usr', 4)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2021-01-03 19:51:14.215445-08:00', datetime(2021, 1, 3, 19, 51, 14, 215445)),
+    ('2021-01-01 10:00:00.000001+00:00', datetime(2021, 1, 1, 10, 0, 0, 1)),
+    ('2021-01-01 00:00:00.0', datetime(2021, 1, 1)),
+    ('1969-12-31 23:59:59', datetime(1969, 12, 31, 23, 59, 59)),
+])
+def test_text_to_epoch_us(text, expected):
+    # Offsets are ignored, the same as the sqlite3 timestamp converter
+    assert from_epoch_us(migrations._text_to_epoch_us(text)) == expected
+
+
+def test_migrations_run_once():
+    db = sqlite3.connect(':memory:')
+
+    assert migrations.migrate(db, target=2) == (0, 2)
+    assert migrations.migrate(db) == (2, migrations.LATEST_VERSION)
+    assert migrations.migrate(db) == (migrations.LATEST_VERSION,
+                                      migrations.LATEST_VERSION)
+
+
+def test_failed_migration_rolls_back():
+    db = sqlite3.connect(':memory:')
+
+    def fail(db):
+        db.execute('CREATE TABLE half_done (id INTEGER)')
+        raise RuntimeError()
+
+    with patch.object(migrations, 'MIGRATIONS', [migrations._create_tables, fail]):
+        with pytest.raises(RuntimeError):
+            migrations.migrate(db, target=2)
+
+    assert migrations.schema_version(db) == 1
+    assert db.execute(
+        'SELECT * FROM sqlite_master WHERE name="half_done"').fetchone() is None
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from DailyData.io.text import TextIO, month_after
+
+
+@pytest.fixture
+def text_io(tmp_path):
+    text_io = TextIO(tmp_path)
+    text_io.new_activity('foo')
+    text_io.new_activity('bar')
+
+    text_io.record_time('foo', None, datetime(2020, 12, 31, 23, 0, 0, 1))
+    text_io.record_time('bar', None, datetime(2021, 1, 1, 9, 30))
+    text_io.record_time('foo', None, datetime(2021, 1, 15, 12, 0, 0, 500))
+    text_io.record_time('bar', None, datetime(2021, 2, 1, 8, 0, 0, 1))
+
+    return text_io
+
+
+def test_month_after():
+    assert month_after(datetime(2021, 1, 31)) == datetime(2021, 2, 1)
+    assert month_after(datetime(2020, 12, 1)) == datetime(2021, 1, 1)
+    assert month_after(datetime(2020, 2, 29)) == datetime(2020, 3, 1)
+
+
+def test_new_activity(tmp_path):
+    text_io = TextIO(tmp_path.joinpath('activities'))
+    text_io.new_activity('foo')
+
+    assert text_io.act_list_path.read_text() == 'foo\n'
+    assert text_io.activities == {'foo'}
+
+    with pytest.raises(ValueError):
+        text_io.new_activity('foo')
+
+    with pytest.raises(NotImplementedError):
+        text_io.new_activity('bar', parent='foo')
+
+
+def test_record_unknown_activity(text_io):
+    with pytest.raises(ValueError):
+        text_io.record_time('baz', None, datetime(2021, 1, 1))
+
+
+def test_record_without_rereading_list(text_io):
+    text_io.activities
+
+    with patch('builtins.open', wraps=open) as opened:
+        text_io.record_time('foo', None, datetime(2021, 1, 2))
+
+    assert [c.args[0] for c in opened.call_args_list] == [
+        text_io.activity_folder.joinpath('2021-01.csv')]
+
+
+def test_reload_edited_list(text_io):
+    assert 'baz' not in text_io.activities
+
+    # Edit the list by hand, without going through new_activity
+    with open(text_io.act_list_path, mode='a') as act_list:
+        act_list.write('baz\n')
+
+    text_io.record_time('baz', None, datetime(2021, 1, 2))
+
+
+def test_get_all_timestamps(text_io):
+    data = text_io.get_timestamps(pd.Timestamp.min, pd.Timestamp.max)
+
+    assert list(data['activity']) == ['foo', 'bar', 'foo', 'bar']
+    assert list(data['time']) == [datetime(2020, 12, 31, 23, 0, 0, 1),
+                                  datetime(2021, 1, 1, 9, 30),
+                                  datetime(2021, 1, 15, 12, 0, 0, 500),
+                                  datetime(2021, 2, 1, 8, 0, 0, 1)]
+    assert data.index.is_monotonic_increasing
+
+
+def test_get_timestamps_within_month(text_io):
+    # The first file of the range starts before the earliest time, but must
+    # still be read
+    data = text_io.get_timestamps(datetime(2021, 1, 10), datetime(2021, 2, 1))
+
+    assert list(data['activity']) == ['foo']
+    assert list(data['time']) == [datetime(2021, 1, 15, 12, 0, 0, 500)]
+
+
+def test_aware_times_round_trip(tmp_path):
+    text_io = TextIO(tmp_path)
+    text_io.new_activity('foo')
+
+    eastern = timezone(timedelta(hours=-5))
+    times = [
+        # Backdated times are on a whole second
+        datetime(2021, 1, 1, 9, 30, tzinfo=eastern),
+        datetime(2021, 1, 1, 10, 0, 0, 5123, tzinfo=eastern),
+        datetime(2021, 1, 2, 8, 0, tzinfo=timezone(timedelta(hours=-4))),
+    ]
+
+    for time in times:
+        text_io.record_time('foo', None, time)
+
+    data = text_io.get_timestamps(pd.Timestamp.min, pd.Timestamp.max)
+
+    assert list(data['time']) == times
+    assert [t.utcoffset() for t in data['time']] == [t.utcoffset() for t in times]
+
+    # Aware times are compared in UTC
+    data = text_io.get_timestamps(datetime(2021, 1, 1, 14, 30), datetime(2021, 1, 1, 15, 0))
+
+    assert list(data['time']) == times[:1]
+
+
+def test_read_old_files(text_io):
+    # Times written with str(), without microseconds on a whole second
+    text_io.activity_folder.joinpath('2021-03.csv').write_text(
+        'foo,2021-03-01 09:30:00,\nbar,2021-03-01 10:00:00.005123,\n')
+
+    data = text_io.get_timestamps(datetime(2021, 3, 1), datetime(2021, 4, 1))
+
+    assert list(data['time']) == [datetime(2021, 3, 1, 9, 30),
+                                  datetime(2021, 3, 1, 10, 0, 0, 5123)]
+
+
+def test_skip_other_files(text_io):
+    text_io.activity_folder.joinpath('notes.csv').write_text('not,a,time\n')
+
+    data = text_io.get_timestamps(pd.Timestamp.min, pd.Timestamp.max)
+
+    assert len(data) == 4
+
+
+def test_no_timestamps(tmp_path):
+    data = TextIO(tmp_path).get_timestamps(pd.Timestamp.min, pd.Timestamp.max)
+
+    assert data.empty
+    assert list(data.columns) == ['activity', 'time']
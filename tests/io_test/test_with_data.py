@@ -3,7 +3,7 @@ from unittest.mock import MagicMock
 from datetime import datetime, timedelta
 import pandas as pd
 from DailyData.time_management import timelog
-from DailyData.io.db import DatabaseWrapper
+from DailyData.io.db import DatabaseWrapper, apply_tz, apply_tz_vectorized
 
 import pytest
 
@@ -15,6 +15,23 @@ def test_parse_timestamps(real_data_db):
         real_data_db.get_timestamps(datetime.min, datetime.max))
 
 
+def test_activity_categories(real_data_db):
+    data = real_data_db.get_timestamps(datetime.min, datetime.max)
+    chunks = list(real_data_db.iter_timestamps(
+        datetime.min, datetime.max, chunk_rows=1000))
+
+    assert isinstance(data['activity'].dtype, pd.CategoricalDtype)
+    assert set(data['activity'].cat.categories) == set(real_data_db.activities)
+
+    # Every chunk has the same categories, so they can be combined cheaply
+    assert all(chunk['activity'].dtype == data['activity'].dtype
+               for chunk in chunks)
+
+    names = [row[0] for row in real_data_db.db.execute(
+        'SELECT name FROM timelog JOIN activity ON activity.id = activity_id')]
+    assert sorted(data['activity'].astype(str)) == sorted(names)
+
+
 def test_custom_backdate(test_config, real_data_db):
     time = datetime.now(tz=tz.tzlocal()) - timedelta(seconds=1)
 
@@ -26,5 +43,115 @@ def test_custom_backdate(test_config, real_data_db):
         real_data_db.get_timestamps(datetime.min, datetime.max))
 
 
+def test_vectorized_tz_matches_apply(real_data_db):
+    cmd = 'SELECT time, timezone_offset, timezone_name, activity_id FROM timelog'
+    frame = pd.DataFrame(
+        real_data_db.db.execute(cmd).fetchall(),
+        columns=['time', 'timezone_offset', 'timezone_name', 'activity_id'])
+    frame['time'] = pd.to_datetime(frame['time'], unit='us')
+
+    # Include some rows without timezone information
+    frame.loc[::7, ['timezone_offset', 'timezone_name']] = None
+
+    expected = frame.apply(apply_tz, axis=1)
+    actual = apply_tz_vectorized(frame)
+
+    pd.testing.assert_series_equal(expected, actual)
+    assert all(a.tzinfo == e.tzinfo for a, e in zip(actual, expected))
+
+
+@pytest.mark.parametrize('earliest, latest, max_time', [
+    (datetime.min, datetime.max, timedelta(hours=12)),
+    # Partial days at either end, with the middle read from the summary
+    (datetime(2021, 2, 3, 17, 26), datetime(2021, 4, 20, 6, 1), timedelta(hours=12)),
+    # Too short to use the summary
+    (datetime(2021, 3, 1, 8), datetime(2021, 3, 2, 15), timedelta(hours=12)),
+    (datetime(2021, 2, 3, 17, 26), datetime(2021, 4, 20, 6, 1), timedelta(hours=1)),
+    (datetime.min, datetime.max, timedelta(days=2)),
+])
+def test_summary_matches_parse_timestamps(real_data_db, earliest, latest, max_time):
+    expected = timelog.parse_timestamps(
+        real_data_db.get_timestamps(earliest, latest), max_time=max_time)
+    actual = timelog.summarize_durations(
+        real_data_db.summarize(earliest, latest, max_time=max_time))
+
+    pd.testing.assert_series_equal(expected['duration'].sort_index(),
+                                   actual['duration'].sort_index(),
+                                   check_dtype=False)
+
+
+@pytest.mark.parametrize('gap', [timedelta(days=14), None])
+def test_summary_lists_last_activity_on_summarized_day(gap):
+    db = DatabaseWrapper()
+    db.new_activity('foo')
+    db.new_activity('bar')
+
+    start = datetime(2021, 1, 1, tzinfo=tz.UTC)
+    for hour in range(4 * 24):
+        db.record_time('foo', None, start + timedelta(hours=hour))
+
+    # The last activity before `latest` is on a day read from the summary,
+    # where it has no time, since the next activity is long after, or there
+    # is none
+    db.record_time('bar', None, start + timedelta(days=4, hours=1))
+    if gap is not None:
+        db.record_time('foo', None, start + timedelta(days=4, hours=1) + gap)
+
+    earliest, latest = datetime(2021, 1, 1), datetime(2021, 1, 11)
+
+    expected = timelog.parse_timestamps(db.get_timestamps(earliest, latest))
+    actual = timelog.summarize_durations(db.summarize(earliest, latest))
+
+    assert 'bar' in expected.index
+    pd.testing.assert_series_equal(expected['duration'].sort_index(),
+                                   actual['duration'].sort_index(),
+                                   check_dtype=False)
+
+    db.db.close()
+
+
+def test_summary_of_empty_range():
+    db = DatabaseWrapper()
+    db.new_activity('old')
+
+    # Recorded before the range, so nothing is done during it
+    db.record_time('old', None, datetime(2021, 1, 1, tzinfo=tz.UTC))
+
+    earliest, latest = datetime(2021, 3, 1), datetime(2021, 3, 10)
+
+    assert len(timelog.parse_timestamps(db.get_timestamps(earliest, latest))) == 0
+    assert len(db.summarize(earliest, latest)) == 0
+
+    db.db.close()
+
+
+@pytest.mark.parametrize('earliest, latest', [
+    (datetime.min, datetime.max),
+    (datetime(2021, 2, 3, 17, 26), datetime(2021, 4, 20, 6, 1)),
+])
+@pytest.mark.parametrize('freq', ['D', 'W'])
+def test_time_series_matches_parse_time_series(real_data_db, earliest, latest, freq):
+    expected = timelog.parse_time_series(
+        real_data_db.get_timestamps(earliest, latest), freq=freq)
+    actual = real_data_db.time_series(earliest, latest, freq=freq)
+
+    assert len(actual) > 1
+    pd.testing.assert_frame_equal(expected, actual)
+
+
+@pytest.mark.parametrize('chunk_rows', [250, 1000, 10000])
+def test_parse_timestamp_chunks(real_data_db, chunk_rows):
+    expected = timelog.parse_timestamps(
+        real_data_db.get_timestamps(datetime.min, datetime.max))
+
+    chunks = list(real_data_db.iter_timestamps(
+        datetime.min, datetime.max, chunk_rows=chunk_rows))
+    actual = timelog.parse_timestamp_chunks(chunks)
+
+    assert all(len(chunk) <= chunk_rows for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) == 3317
+    pd.testing.assert_frame_equal(expected, actual)
+
+
 if __name__ == '__main__':
     unittest.main()
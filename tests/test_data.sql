@@ -71,7 +71,7 @@ VALUES (
     ),
     (
         6,
-        '2021-01-01 13:00:00.0-8:00',
+        '2021-01-01 13:00:00.000000-08:00',
         -28800,
         'Pacific Standard Time',
         'tz_activity',
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def imported_after(statement: str, modules):
+    """
+    Runs `statement` in a new interpreter, and returns which of `modules` it
+    imported.
+    """
+
+    check = '{}\nimport sys\nprint(",".join(m for m in {!r} if m in sys.modules))'.format(
+        statement, list(modules))
+
+    result = subprocess.run([sys.executable, '-c', check],
+                            env=dict(os.environ, PYTHONPATH=str(ROOT)),
+                            stdout=subprocess.PIPE, universal_newlines=True, check=True)
+
+    # Only look at the last line, in case the statement prints anything
+    return [m for m in result.stdout.splitlines()[-1].split(',') if m]
+
+
+class TestImports(unittest.TestCase):
+    def test_timelog_skips_heavy_imports(self):
+        heavy = ['pandas', 'numpy', 'docx', 'ConsoleQuestionPrompts',
+                 'ssl', 'urllib.request', 'DailyData.analyzer.parse_docx']
+
+        self.assertEqual(
+            [], imported_after('import DailyData.time_management.timelog', heavy))
+
+    def test_record_skips_heavy_imports(self):
+        record = '''
+from DailyData.io.db import DatabaseWrapper
+from DailyData.time_management import timelog
+from DailyData.time_management.config import TimeManagementConfig
+
+db = DatabaseWrapper()
+timelog.take_args(TimeManagementConfig(), db, argv=['doing', 'foo', '--new'])
+timelog.take_args(TimeManagementConfig(), db, argv=['doing', 'bar', '--new', '-b', '5m'])
+timelog.take_args(TimeManagementConfig(), db, argv=['doing', 'foo', '--update'])
+'''
+
+        self.assertEqual([], imported_after(
+            record, ['pandas', 'numpy', 'dateutil.parser', 'importlib.resources']))
+
+    def test_client_skips_timelog(self):
+        self.assertEqual([], imported_after(
+            'import DailyData.time_management.client',
+            ['DailyData.time_management.timelog', 'DailyData.config', 'sqlite3', 'argparse']))
+
+    def test_client_without_daemon_skips_socket(self):
+        self.assertEqual([], imported_after(
+            'from DailyData.time_management import client\n'
+            'client.forward(["doing", "foo"], "does-not-exist.sock")',
+            ['socket']))
+
+    def test_package_is_lazy(self):
+        self.assertEqual([], imported_after(
+            'import DailyData', ['DailyData.config', 'DailyData._version']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import socket
+import stat
+import threading
+
+import pytest
+from DailyData.io.db import DatabaseWrapper
+from DailyData.time_management import client
+from DailyData.time_management.daemon import TimelogDaemon
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'),
+                                reason='Unix domain sockets are not available')
+
+
+@pytest.fixture
+def daemon_socket(tmp_path, test_config):
+    """
+    Runs a daemon for a new database in a background thread, and returns the
+    path of its socket.
+    """
+
+    path = tmp_path.joinpath('timelog.sock')
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def start():
+        # The database has to be opened in the thread that uses it
+        daemon = TimelogDaemon(test_config, DatabaseWrapper(tmp_path.joinpath('dailydata.db')))
+        return daemon, await daemon.start(path)
+
+    daemon, server = asyncio.run_coroutine_threadsafe(start(), loop).result()
+
+    yield path
+
+    async def stop():
+        server.close()
+        await server.wait_closed()
+        daemon.io.db.close()
+
+    asyncio.run_coroutine_threadsafe(stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def test_forward_commands(daemon_socket):
+    response = client.forward(['doing', 'foo', '--new'], daemon_socket)
+    assert response['status'] == 0
+    assert response['stdout'].startswith('Recorded doing foo at ')
+
+    response = client.forward(['doing', 'bar', '--new'], daemon_socket)
+    assert 'Finished doing foo for ' in response['stdout']
+
+    response = client.forward(['summary'], daemon_socket)
+    assert response['status'] == 0
+    assert 'foo' in response['stdout']
+
+
+def test_forward_usage_error(daemon_socket):
+    response = client.forward(['doing'], daemon_socket)
+
+    # The same as argparse exiting, but the daemon keeps running
+    assert response['status'] == 2
+    assert 'error' in response['stderr']
+    assert client.forward(['doing', 'foo', '--new'], daemon_socket)['status'] == 0
+
+
+def test_forward_sees_other_connections(daemon_socket, tmp_path):
+    client.forward(['doing', 'foo', '--new'], daemon_socket)
+
+    # Add an activity without going through the daemon
+    other = DatabaseWrapper(tmp_path.joinpath('dailydata.db'))
+    other.new_activity('bar')
+    other.db.close()
+
+    response = client.forward(['doing', 'bar'], daemon_socket)
+    assert response['stdout'].startswith('Recorded doing bar at ')
+
+
+def test_no_daemon(tmp_path):
+    assert client.forward(['doing', 'foo'], tmp_path.joinpath('timelog.sock')) is None
+
+
+def test_socket_private(tmp_path, test_config, monkeypatch):
+    path = tmp_path.joinpath('timelog.sock')
+    umask = os.umask(0o022)
+
+    # Permissions changed after the socket is created would leave a moment
+    # when others could connect
+    monkeypatch.setattr(os, 'chmod', lambda *args, **kwargs: None)
+
+    async def start():
+        server = await TimelogDaemon(test_config, DatabaseWrapper()).start(path)
+
+        # Only the user can connect
+        assert stat.S_IMODE(path.stat().st_mode) & 0o077 == 0
+
+        server.close()
+        await server.wait_closed()
+
+    try:
+        asyncio.run(start())
+
+        # ...without changing the umask of anything else
+        assert os.umask(0o022) == 0o022
+    finally:
+        os.umask(umask)
+
+
+def test_stale_socket(tmp_path, test_config):
+    path = tmp_path.joinpath('timelog.sock')
+
+    # Leave a socket behind without anything listening on it
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(str(path))
+
+    assert client.forward(['doing', 'foo'], path) is None
+
+    async def restart():
+        daemon = TimelogDaemon(test_config, DatabaseWrapper())
+        server = await daemon.start(path)
+
+        # A second daemon can't take over the socket
+        with pytest.raises(RuntimeError):
+            await TimelogDaemon(test_config, DatabaseWrapper()).start(path)
+
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(restart())
@@ -4,6 +4,7 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pandas as pd
+import pytest
 from DailyData.io.db import DatabaseWrapper
 from DailyData.io.timelog_io import DebugTimelogIO
 from DailyData.time_management import timelog
@@ -117,8 +118,7 @@ class TestTimeManagement(unittest.TestCase):
         db.new_activity('bar')
         db.new_activity('bash')
 
-        db.record_time('foo', 'none', first)
-        db.record_time('bar', 'none', mid)
+        db.record_many([('foo', 'none', first), ('bar', 'none', mid)])
 
         timelog.take_args(self.config, db, argv=['doing', 'bash'])
 
@@ -133,10 +133,8 @@ class TestTimeManagement(unittest.TestCase):
         timelog.take_args(self.config, self.io_debug, argv=[
                           'doing', 'foo', '-t', time])
 
-        # See take_args in timelog (approx. line 119) for why 1 microsecond is
-        # necessary
         self.io_debug.record_time.assert_called_once_with('foo', 'default_usr', timestamp=datetime.now(
-        ).replace(hour=10, minute=59, second=0, microsecond=1, tzinfo=tz.tzlocal()))
+        ).replace(hour=10, minute=59, second=0, microsecond=0, tzinfo=tz.tzlocal()))
 
 
 def test_last_act_before_most_recent(staged_db: DatabaseWrapper):
@@ -161,5 +159,57 @@ def test_show_summary(test_config, staged_db: DatabaseWrapper):
     timelog.take_args(test_config, staged_db, argv=['summary'])
 
 
+@pytest.mark.parametrize('by', ['day', 'week'])
+def test_show_summary_by_period(test_config, staged_db: DatabaseWrapper, by):
+    timelog.take_args(test_config, staged_db, argv=['summary', '--by', by])
+
+
+def test_parse_timestamp_durations():
+    start = datetime(2021, 1, 1, tzinfo=tz.UTC)
+    time_table = pd.DataFrame({
+        'time': [start + timedelta(hours=h) for h in [0, 1, 3, 20, 21, 21.5]],
+        'activity': ['foo', 'bar', 'bash', 'foo', 'baz', 'bar']
+    })
+    original = time_table.copy()
+
+    durations = timelog.parse_timestamps(time_table)
+
+    # bash lasted 17 hours, so it is left out. The last activity, bar, has no
+    # duration.
+    assert durations['duration'].to_dict() == {
+        'foo': timedelta(hours=2), 'bar': timedelta(hours=2), 'baz': timedelta(minutes=30)}
+    assert durations['per_day'].to_dict() == {
+        'foo': timedelta(hours=10, minutes=40),
+        'bar': timedelta(hours=10, minutes=40),
+        'baz': timedelta(hours=2, minutes=40)}
+    assert durations['duration'].is_monotonic_decreasing
+
+    # The caller's DataFrame shouldn't be changed
+    pd.testing.assert_frame_equal(original, time_table)
+
+
+def test_parse_categorical_timestamps():
+    start = datetime(2021, 1, 1)
+    time_table = pd.DataFrame({
+        'time': [start, start + timedelta(minutes=5), start + timedelta(minutes=20)],
+        'activity': pd.Categorical(['foo', 'bar', 'foo'], categories=['bar', 'bash', 'foo'])
+    })
+
+    durations = timelog.parse_timestamps(time_table)
+
+    # Activities that weren't recorded aren't listed
+    assert list(durations.index) == ['bar', 'foo']
+    assert list(durations['duration']) == [
+        timedelta(minutes=15), timedelta(minutes=5)]
+
+
+def test_parse_no_timestamps():
+    durations = timelog.parse_timestamps(
+        pd.DataFrame(columns=['time', 'activity']))
+
+    assert durations.empty
+    assert list(durations.columns) == ['duration', 'percent', 'per_day']
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from DailyData.time_management import time_series, timelog
+from dateutil import tz
+
+PACIFIC = tz.tzoffset(None, -8 * 60 * 60)
+
+
+def test_split_at_local_midnight():
+    time_table = pd.DataFrame({
+        'time': [datetime(2021, 1, 1, 22, tzinfo=PACIFIC),
+                 datetime(2021, 1, 2, 2, tzinfo=PACIFIC),
+                 datetime(2021, 1, 2, 3, tzinfo=PACIFIC)],
+        'activity': ['sleep', 'read', 'sleep']
+    })
+
+    days = timelog.parse_time_series(time_table)
+
+    # The days are split at midnight in Pacific time, not in UTC
+    assert list(days.index) == [pd.Timestamp(2021, 1, 1), pd.Timestamp(2021, 1, 2)]
+    assert days.to_dict() == {
+        'read': {pd.Timestamp(2021, 1, 1): timedelta(0),
+                 pd.Timestamp(2021, 1, 2): timedelta(hours=1)},
+        'sleep': {pd.Timestamp(2021, 1, 1): timedelta(hours=2),
+                  pd.Timestamp(2021, 1, 2): timedelta(hours=2)},
+    }
+
+
+def test_split_by_week():
+    # 2021-01-03 was a Sunday
+    time_table = pd.DataFrame({
+        'time': [datetime(2021, 1, 3, 20), datetime(2021, 1, 4, 6),
+                 datetime(2021, 1, 4, 7)],
+        'activity': ['sleep', 'eat', 'sleep']
+    })
+
+    weeks = timelog.parse_time_series(time_table, freq='W')
+
+    assert list(weeks.index) == [pd.Timestamp(2020, 12, 28), pd.Timestamp(2021, 1, 4)]
+    assert list(weeks['sleep']) == [timedelta(hours=4), timedelta(hours=6)]
+    assert list(weeks['eat']) == [timedelta(0), timedelta(hours=1)]
+
+
+def test_long_activities_ignored():
+    time_table = pd.DataFrame({
+        'time': [datetime(2021, 1, 1), datetime(2021, 1, 3), datetime(2021, 1, 3, 1)],
+        'activity': ['away', 'read', 'sleep']
+    })
+
+    days = timelog.parse_time_series(time_table)
+
+    # Only the days with activities that were included are listed
+    assert list(days.index) == [pd.Timestamp(2021, 1, 3)]
+    assert list(days.sum()) == [timedelta(0), timedelta(hours=1), timedelta(0)]
+
+    days = timelog.parse_time_series(time_table, max_time=timedelta(days=3))
+
+    assert list(days['away']) == [timedelta(days=1), timedelta(days=1), timedelta(0)]
+
+
+def test_empty_time_series():
+    days = timelog.parse_time_series(pd.DataFrame(columns=['time', 'activity']))
+
+    assert days.empty
+
+
+def test_unknown_frequency():
+    with pytest.raises(ValueError):
+        time_series.split_by_period(np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64),
+                                    np.zeros(1, dtype=np.int64), ['foo'], freq='M')
+
+
+def test_time_series_adds_up_to_totals():
+    rand = np.random.default_rng(0)
+    times = np.cumsum(rand.integers(1, 4 * 60 * 60 * 10**9, size=5000))
+    time_table = pd.DataFrame({
+        'time': pd.to_datetime(times).tz_localize('UTC').tz_convert('US/Pacific'),
+        'activity': rand.choice(['foo', 'bar', 'baz'], size=len(times))
+    })
+
+    expected = timelog.parse_timestamps(time_table)['duration'].sort_index()
+
+    for freq in ['D', 'W']:
+        periods = timelog.parse_time_series(time_table, freq=freq)
+
+        # Add up the periods as integers, since pandas sums timedeltas as
+        # floats
+        totals = periods.to_numpy().view(np.int64).sum(axis=0)
+
+        assert dict(zip(periods.columns, totals)) == {
+            activity: duration.value for activity, duration in expected.items()}
+
+
+def test_exact_bincount():
+    values = np.array([2**62, 2**62 - 1, 12345, 2**40 + 7], dtype=np.int64)
+    codes = np.array([0, 1, 1, 0])
+
+    assert list(time_series.exact_bincount(codes, values, 3)) == [
+        2**62 + 2**40 + 7, 2**62 - 1 + 12345, 0]